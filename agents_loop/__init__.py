@@ -1,3 +1,10 @@
-from agents_loop.agent import root_agent
-
+# google.adk の読み込みは重いため、root_agent を参照したときに読み込む
 __all__ = ["root_agent"]
+
+
+def __getattr__(name):
+    if name == "root_agent":
+        from agents_loop.agent import root_agent
+
+        return root_agent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
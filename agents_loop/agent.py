@@ -5,8 +5,14 @@ from google.adk.agents import Agent, LoopAgent, SequentialAgent
 from google.adk.tools import ToolContext
 
 from llmmj.llmmj import calculate_score_with_json
-from prompts.parts import cot_str, required_json_format_str, rule_str, tile_notation_str
-from tools.calculation import calculate_mahjong_score
+from prompts.parts import COT, REQUIRED_JSON_FORMAT, RULE, TILE_NOTATION
+from prompts.registry import PROMPTS
+from tools.calculation import (
+    analyze_hand_waits,
+    calculate_mahjong_score,
+    check_han_fu_feasibility,
+    sweep_hand_conditions,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -37,7 +43,9 @@ mahjong_score_question_generator_agent = Agent(
     model=MODEL,
     name="mahjong_score_question_generator_agent",
     description="Sub-Agent: This agent is responsible for generating mahjong score calculation question.",
-    instruction="""
+    instruction=PROMPTS.compose(
+        "agents_loop.mahjong_score_question_generator_agent",
+        """
     Generate a mahjong score calculation problem that results in the specified han and fu.
 
     ## User Requirements
@@ -45,10 +53,10 @@ mahjong_score_question_generator_agent = Agent(
 
     ## Acknowledgement
     ### Mahjong Rules
-    """
-    + rule_str
-    + tile_notation_str
-    + """
+    """,
+        RULE,
+        TILE_NOTATION,
+        """
     
     ## Critical Requirements
     - The generated problem MUST result in exactly the han and fu specified by the user
@@ -61,7 +69,10 @@ mahjong_score_question_generator_agent = Agent(
     - Closed hand ron adds 10 fu (menzen ron)
     - Tsumo always adds 2 fu
     - Fu is rounded UP to nearest 10 (e.g., 32→40, 44→50)
-    - Some combinations are impossible (e.g., 1 han 20 fu is impossible due to minimum fu rules)
+    - Some combinations are impossible (e.g., 1 han 20 fu is impossible due to minimum fu rules).
+      Call 'check_han_fu_feasibility' with the target han and fu first. If it is not feasible, say so instead of generating a problem.
+      If it is feasible, start from the returned example hand and add dora indicators to reach the target han.
+      To adjust fu through the wait, call 'analyze_hand_waits' with the 13 tiles before the winning tile.
     
     ## Fu Calculation Tips
     - Base fu: 20
@@ -85,8 +96,10 @@ mahjong_score_question_generator_agent = Agent(
     - 70+ fu: Often requires kan (especially closed kan)
 
     ### Chain of Thought Example
-    """
-    + cot_str,
+    """,
+        COT,
+    ),
+    tools=[check_han_fu_feasibility, analyze_hand_waits],
     output_key="current_question",
 )
 
@@ -153,7 +166,9 @@ refining_agent = Agent(
     model=MODEL,
     name="refining_agent",
     description="Sub-Agent: This agent is responsible for refining the mahjong score calculation question.",
-    instruction="""
+    instruction=PROMPTS.compose(
+        "agents_loop.refining_agent",
+        """
     Refine the mahjong score calculation question based on validation errors.
     
     ## **Current Question**
@@ -163,6 +178,8 @@ refining_agent = Agent(
     {validation_errors}
     
     ## Refinement Strategy
+    Before changing tiles, call 'sweep_hand_conditions' with the current tiles, the target han and fu and a few candidate dora indicator sets. If it returns a match, only change riichi, tsumo, winds and dora indicators accordingly.
+
     Based on the error type, apply these fixes:
     
     ### For Han/Fu Mismatch:
@@ -199,10 +216,12 @@ refining_agent = Agent(
     - Verify the refinement will produce target han/fu
     
     ### Mahjong Rules
-    """
-    + rule_str
-    + tile_notation_str
-    + cot_str,
+    """,
+        RULE,
+        TILE_NOTATION,
+        COT,
+    ),
+    tools=[sweep_hand_conditions],
     output_key="current_question",
 )
 
@@ -211,7 +230,9 @@ output_json_formatter_agent = Agent(
     model=MODEL,
     name="output_json_formatter_agent",
     description="Sub-Agent: This agent is responsible for formatting the output json string.",
-    instruction="""
+    instruction=PROMPTS.compose(
+        "agents_loop.output_json_formatter_agent",
+        """
     Convert the mahjong score calculation question into a valid JSON string following the exact schema.
     
     ## Current Question
@@ -240,13 +261,14 @@ output_json_formatter_agent = Agent(
     - "open kan/pon/chii" → "is_open": true
     - Note: Pon and Chii are ALWAYS open (is_open: true), only Kan can be closed
 
-    """
-    + required_json_format_str
-    + """
+    """,
+        REQUIRED_JSON_FORMAT,
+        """
     
     ## Example Output Format (DO NOT include backticks):
     {"tiles": ["1m", "2m", "3m", "4m", "4m", "5p", "5p", "5p", "7s", "8s", "9s", "1z", "1z", "2z"], "melds": [], "win_tile": "2z", "dora_indicators": ["3m"], "is_riichi": true, "is_tsumo": false, "player_wind": "east", "round_wind": "east"}
     """,
+    ),
     output_key="current_output_json",
 )
 
@@ -322,7 +344,9 @@ output_json_refining_agent = Agent(
     model=MODEL,
     name="output_json_refining_agent",
     description="Sub-Agent: This agent is responsible for refining the output json string.",
-    instruction="""
+    instruction=PROMPTS.compose(
+        "agents_loop.output_json_refining_agent",
+        """
     Fix the JSON string based on validation errors to ensure schema compliance.
     
     ## **Current Output JSON String**
@@ -370,9 +394,9 @@ output_json_refining_agent = Agent(
     - Ensure valid JSON syntax
     - Maintain all data from original that wasn't errored
     
-    """
-    + required_json_format_str
-    + """
+    """,
+        REQUIRED_JSON_FORMAT,
+        """
     
     ## Example Fix:
     Error: "JSON Error: Boolean 'True' should be lowercase 'true'"
@@ -383,6 +407,7 @@ output_json_refining_agent = Agent(
     Original: {"tiles": ["1m", "2m", ...], "melds": [{"tiles": ["1z", "1z", "1z"], "is_open": true}], ...}
     Fixed: {"tiles": ["1m", "2m", ..., "1z", "1z", "1z"], "melds": [{"tiles": ["1z", "1z", "1z"], "is_open": true}], ...}
     """,
+    ),
     output_key="current_output_json",
 )
 
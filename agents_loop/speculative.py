@@ -0,0 +1,210 @@
+"""
+投機的な並列生成のエージェント
+
+mahjong_loop_agent は生成した問題を検証・修正のループで1回ずつ直し、LLMの往復を
+直列に重ねる。mahjong_speculative_agent は temperature を変えた k 個の候補
+（問題の生成 → JSONへの変換）を ParallelAgent で同時に実行し、JSONが届いた候補から
+validate_hand / calculate_score でローカルに採点する。目標の (飜, 符) に一致した
+候補が届いた時点で残りの候補をキャンセルし、その候補のJSONを最終応答にする。
+一致する候補がなければ目標に最も近い候補を返す (generator.speculative)。
+"""
+
+import asyncio
+import logging
+import time
+from typing import AsyncGenerator, Dict, List, Optional
+
+from google.adk.agents import Agent, ParallelAgent, SequentialAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.genai import types
+
+from agents_loop.agent import MODEL
+from generator.speculative import (
+    STATUS_CANCELLED,
+    STATUS_ERROR,
+    STATUS_MATCHED,
+    CandidateOutcome,
+    check_candidate,
+    parse_target,
+    sampling_temperatures,
+    summarize,
+)
+from prompts.registry import PROMPTS
+from tools.calculation import analyze_hand_waits, check_han_fu_feasibility
+
+logger = logging.getLogger(__name__)
+
+# 同時に生成する候補の数
+SPECULATIVE_CANDIDATES = 4
+
+
+def _strip_code_fence(text: str) -> str:
+    return text.replace("```json", "").replace("```", "").strip()
+
+
+def _user_text(ctx: InvocationContext) -> str:
+    content = ctx.user_content
+    if content and content.parts and content.parts[0].text:
+        return content.parts[0].text
+    return ""
+
+
+def _branch_context(
+    agent: ParallelAgent, sub_agent, ctx: InvocationContext
+) -> InvocationContext:
+    """ParallelAgent と同じく、候補ごとに別の branch で実行する"""
+    branch_ctx = ctx.model_copy()
+    suffix = f"{agent.name}.{sub_agent.name}"
+    branch_ctx.branch = f"{ctx.branch}.{suffix}" if ctx.branch else suffix
+    return branch_ctx
+
+
+class FirstValidParallelAgent(ParallelAgent):
+    """
+    sub_agents を同時に実行し、最終応答のJSONが目標に一致した候補を採用する ParallelAgent
+
+    目標の (飜, 符) はユーザーの問題文 ("... 2 han 30 fu") から取り出す。
+    各候補のイベントは ParallelAgent と同じく、セッションに反映されてから
+    その候補の実行を再開するため、候補内の後続のエージェントは state を参照できる。
+    """
+
+    async def _run_async_impl(
+        self, ctx: InvocationContext
+    ) -> AsyncGenerator[Event, None]:
+        target = parse_target(_user_text(ctx))
+        queue: asyncio.Queue = asyncio.Queue()
+
+        async def run_candidate(index: int, sub_agent) -> None:
+            error = None
+            try:
+                async for event in sub_agent.run_async(
+                    _branch_context(self, sub_agent, ctx)
+                ):
+                    resume = asyncio.Event()
+                    queue.put_nowait((index, event, resume))
+                    await resume.wait()
+            except Exception as e:
+                error = e
+            queue.put_nowait((index, None, error))
+
+        start = time.perf_counter()
+        tasks = [
+            asyncio.create_task(run_candidate(index, sub_agent))
+            for index, sub_agent in enumerate(self.sub_agents)
+        ]
+        texts: Dict[int, str] = {}
+        outcomes: List[CandidateOutcome] = []
+        try:
+            while len(outcomes) < len(tasks):
+                index, event, payload = await queue.get()
+                if event is not None:
+                    yield event
+                    # payload はイベントがセッションに反映されたことを候補に伝える
+                    payload.set()
+                    if (
+                        event.is_final_response()
+                        and event.content
+                        and event.content.parts
+                    ):
+                        texts[index] = _strip_code_fence(
+                            event.content.parts[0].text or ""
+                        )
+                    continue
+
+                now = time.perf_counter() - start
+                # 候補の実行が終わった。payload は候補で発生した例外
+                if payload is not None:
+                    outcome = CandidateOutcome(
+                        index,
+                        STATUS_ERROR,
+                        now,
+                        payload,
+                        error=f"{type(payload).__name__}: {payload!s}",
+                    )
+                else:
+                    outcome = check_candidate(index, texts.get(index), target, now)
+                outcomes.append(outcome)
+                if outcome.status == STATUS_MATCHED:
+                    break
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        elapsed = time.perf_counter() - start
+        finished = {outcome.index for outcome in outcomes}
+        outcomes.extend(
+            CandidateOutcome(index, STATUS_CANCELLED, elapsed)
+            for index in range(len(tasks))
+            if index not in finished
+        )
+        result = summarize(outcomes, target, elapsed)
+        logger.info(
+            f"Speculative agent: winner={result.winner}, {result.elapsed:.1f}s "
+            f"(serial {result.serial_seconds:.1f}s, saved {result.saved_seconds:.1f}s)"
+        )
+
+        selected: Optional[CandidateOutcome] = result.selected
+        text = selected.result if selected is not None else ""
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            content=types.Content(role="model", parts=[types.Part(text=text)]),
+            actions=EventActions(
+                state_delta={
+                    "current_output_json": text,
+                    "speculative_winner": result.winner,
+                    "speculative_saved_seconds": result.saved_seconds,
+                }
+            ),
+        )
+
+
+def _candidate_agent(index: int, temperature: Optional[float]) -> SequentialAgent:
+    """問題を生成してJSONに変換する候補1つ分のエージェント"""
+    question_key = f"candidate_question_{index}"
+    config = (
+        types.GenerateContentConfig(temperature=temperature)
+        if temperature is not None
+        else None
+    )
+    # mahjong_loop_agent と同じ指示。候補ごとに別の state のキーを使う
+    generator = Agent(
+        model=MODEL,
+        name=f"candidate_question_generator_agent_{index}",
+        description="Sub-Agent: This agent is responsible for generating one candidate mahjong score calculation question.",
+        instruction=PROMPTS.template(
+            "agents_loop.mahjong_score_question_generator_agent"
+        ),
+        tools=[check_han_fu_feasibility, analyze_hand_waits],
+        generate_content_config=config,
+        output_key=question_key,
+    )
+    formatter = Agent(
+        model=MODEL,
+        name=f"candidate_json_formatter_agent_{index}",
+        description="Sub-Agent: This agent is responsible for formatting one candidate as a json string.",
+        instruction=PROMPTS.template("agents_loop.output_json_formatter_agent").replace(
+            "{current_question}", "{" + question_key + "}"
+        ),
+        output_key=f"candidate_json_{index}",
+    )
+    return SequentialAgent(
+        name=f"speculative_candidate_{index}",
+        description="This agent generates one candidate and converts it to json.",
+        sub_agents=[generator, formatter],
+    )
+
+
+mahjong_speculative_agent = FirstValidParallelAgent(
+    name="mahjong_speculative_agent",
+    description="This agent generates several candidates in parallel and returns the first one that scores the target han and fu.",
+    sub_agents=[
+        _candidate_agent(index, temperature)
+        for index, temperature in enumerate(
+            sampling_temperatures(SPECULATIVE_CANDIDATES)
+        )
+    ],
+)
@@ -1,25 +1,24 @@
-import os
-
 from google.adk.agents import Agent, SequentialAgent
 
-from tools.calculation import calculate_mahjong_score, final_output_message_check
+from prompts.parts import COT, RULE, TILE_NOTATION
+from prompts.registry import PROMPTS
+from tools.calculation import (
+    analyze_hand_waits,
+    calculate_mahjong_score,
+    check_han_fu_feasibility,
+    final_output_message_check,
+)
 
 MODEL = "gemini-2.5-flash"
 
 
-rule_path = os.path.join(os.path.dirname(__file__), "../sources/rule_en.md")
-with open(rule_path, "r") as f:
-    rule_str = f.read()
-cot_path = os.path.join(os.path.dirname(__file__), "../sources/cot_en.md")
-with open(cot_path, "r") as f:
-    cot_str = f.read()
-
-
 mahjong_score_question_generator_agent = Agent(
     model=MODEL,
     name="mahjong_score_question_generator_agent",
     description="Sub-Agent: This agent is responsible for generating mahjong score calculation problem.",
-    instruction="""
+    instruction=PROMPTS.compose(
+        "agents_seq.generator",
+        """
     Read state['current_score'] (if exists) and generate a mahjong score calculation problem.
     
     ## Steps
@@ -28,28 +27,25 @@ mahjong_score_question_generator_agent = Agent(
 
     ## Acknowledgement
     ### Mahjong Rules
-    """
-    + rule_str
-    + """
-    
-    ## Tile Notation
-    Mahjong hands are represented in 136 format. Man tiles are denoted by m, pin tiles by p, sou tiles by s, and honor tiles by z. Each tile has 4 copies.
-    1-man:1m, 2-man:2m, 3-man:3m, 4-man:4m, 5-man:5m, 6-man:6m, 7-man:7m, 8-man:8m, 9-man:9m
-    1-pin:1p, 2-pin:2p, 3-pin:3p, 4-pin:4p, 5-pin:5p, 6-pin:6p, 7-pin:7p, 8-pin:8p, 9-pin:9p
-    1-sou:1s, 2-sou:2s, 3-sou:3s, 4-sou:4s, 5-sou:5s, 6-sou:6s, 7-sou:7s, 8-sou:8s, 9-sou:9s
-    East:1z, South:2z, West:3z, North:4z, White:5z, Green:6z, Red:7z
-    
+    """,
+        RULE,
+        TILE_NOTATION,
+        """
     ## Requirements
     - reach info is required.
     
     ## Advices
     - When the required fu is large, a kan is often required.
+    - Call 'check_han_fu_feasibility' with the target han and fu first. If it is not feasible, say so instead of generating a problem. If it is feasible, start from the returned example hand and add dora indicators to reach the target han.
+    - To adjust fu through the wait, call 'analyze_hand_waits' with the 13 tiles before the winning tile. Kanchan, penchan and tanki waits add 2 fu; ryanmen and shanpon add 0 fu.
 
     ### Chain of Thought Example
-    """
-    + cot_str
-    + """
     """,
+        COT,
+        """
+    """,
+    ),
+    tools=[check_han_fu_feasibility, analyze_hand_waits],
     output_key="candidate_mahjong_score_calculation_problem",
 )
 
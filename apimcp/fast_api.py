@@ -1,61 +1,301 @@
+import asyncio
+import json
 import logging
-import sys
-from typing import Dict
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import ValidationError
 
+from apimcp.pool import ScoringPool, get_scoring_pool, shutdown_scoring_pool
+from apimcp.scoring import HandItem, score_chunk, validate_and_score
+from entity.codec import HAND_CODEC_MEDIA_TYPE, decode_hands
+from entity.decoding import decode_hand_array
 from entity.entity import ScoreRequest, ScoreResponse
-from llmmj.llmmj import calculate_score, validate_hand
-
-# ロギングの設定
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[logging.StreamHandler(sys.stdout), logging.FileHandler("api.log")],
+from exceptions import (
+    HandCodecError,
+    HandValidationError,
+    ScoreCalculationError,
+    ScoringPoolSaturatedError,
 )
+from llmmj import log, metrics
+from llmmj.log import setup_logging, shutdown_logging
+
 logger = logging.getLogger(__name__)
 
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/jsonl")
+
+# プールが一杯の場合にクライアントへ返す再試行までの秒数
+RETRY_AFTER_SECONDS = 1
+# イベントループの遅延を計測する間隔（秒）
+EVENT_LOOP_LAG_INTERVAL = 0.5
+
+PROMETHEUS_MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+async def _monitor_event_loop_lag(interval: float) -> None:
+    """一定間隔でスリープし、予定より起床が遅れた時間を記録する"""
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        lag = loop.time() - start - interval
+        metrics.EVENT_LOOP_LAG_SECONDS.observe(max(lag, 0.0))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # ログの書き込みはバックグラウンドスレッドで行う
+    setup_logging("api.log")
+    # リクエストを受け付ける前にワーカープロセスを起動しておく
+    await get_scoring_pool().warm_up()
+    lag_monitor = asyncio.create_task(_monitor_event_loop_lag(EVENT_LOOP_LAG_INTERVAL))
+    yield
+    lag_monitor.cancel()
+    shutdown_scoring_pool()
+    shutdown_logging()
+
+
+def _service_unavailable(e: ScoringPoolSaturatedError) -> HTTPException:
+    logger.warning(f"Rejected request: {e!s}")
+    return HTTPException(
+        status_code=503,
+        detail="Server is busy. Please retry later.",
+        headers={"Retry-After": str(RETRY_AFTER_SECONDS)},
+    )
+
+
 app = FastAPI(
     title="Mahjong Calculation Server",
     description="麻雀の点数計算を行うAPIサーバー",
     version="1.0.0",
     base_url="http://localhost:8000",
+    lifespan=lifespan,
 )
 
 
-@app.post("/calculate", operation_id="calculate", response_model=ScoreResponse)
-async def calculate(request: ScoreRequest) -> ScoreResponse:
+@app.exception_handler(RequestValidationError)
+async def validation_exception_handler(
+    request: Request, exc: RequestValidationError
+) -> JSONResponse:
+    """
+    FastAPI の既定のハンドラと同じく422を返す
+
+    バイナリ形式の手牌のボディは UTF-8 として読めないことがあり、
+    jsonable_encoder で500になるため、エラーの input から bytes を除く。
+    """
+    errors = [
+        {k: v for k, v in error.items() if not (k == "input" and isinstance(v, bytes))}
+        for error in exc.errors()
+    ]
+    return JSONResponse(status_code=422, content={"detail": jsonable_encoder(errors)})
+
+
+@app.middleware("http")
+async def record_http_metrics(request: Request, call_next):
+    """ルート・ステータスごとのリクエスト数と処理時間を記録する"""
+    start = time.perf_counter()
+    request.state.received_at = start
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        path = route.path if route is not None else "unmatched"
+        metrics.HTTP_REQUESTS.inc(route=path, status=status)
+        # ストリーミングレスポンスの場合はヘッダーを返すまでの時間
+        metrics.HTTP_REQUEST_SECONDS.observe(time.perf_counter() - start, route=path)
+
+
+@app.post(
+    "/calculate",
+    operation_id="calculate",
+    response_model=ScoreResponse,
+    # JSONの代わりにバイナリ形式の手牌も受け付ける (ScoreRequest でデコードする)
+    openapi_extra={
+        "requestBody": {
+            "content": {
+                HAND_CODEC_MEDIA_TYPE: {
+                    "schema": {"type": "string", "format": "binary"}
+                }
+            }
+        }
+    },
+)
+async def calculate(request: ScoreRequest, http_request: Request) -> ScoreResponse:
     """
     麻雀の点数を計算する
 
+    リクエストボディは ScoreRequest のJSON、またはバイナリ形式の手牌
+    (Content-Type: application/x-llmmj-hand, entity.codec を参照)。
+
     Args:
         request: 点数計算リクエスト
+        http_request: HTTPリクエスト（計測用）
 
     Returns:
         ScoreResponse: 点数計算結果
     """
-    logger.info(f"Received score calculation request: {request}")
+    # ボディの読み込みとパースにかかった時間
+    metrics.observe_stage(
+        "request_parsing", time.perf_counter() - http_request.state.received_at
+    )
+    logger.info(
+        "Received score calculation request",
+        extra={"route": "/calculate", "tiles": len(request.hand.tiles)},
+    )
+    if log.HOT_PATH_DEBUG:
+        logger.debug(f"Score calculation request: {request}")
 
-    # Use centralized validation
+    # 検証と点数計算はワーカープロセスで行う
     try:
-        validate_hand(request.hand)
-    except ValueError as e:
-        logger.error(f"Hand validation failed: {str(e)}")
+        result = await get_scoring_pool().run(validate_and_score, request.hand)
+    except ScoringPoolSaturatedError as e:
+        raise _service_unavailable(e)
+    except HandValidationError as e:
+        logger.error(f"Hand validation failed: {str(e)}", extra={"route": "/calculate"})
+        raise HTTPException(status_code=400, detail=str(e))
+    except ScoreCalculationError as e:
+        logger.error(
+            f"Error during score calculation: {str(e)}", extra={"route": "/calculate"}
+        )
         raise HTTPException(status_code=400, detail=str(e))
-
-    # 点数計算
-    result = calculate_score(request.hand)
 
     # エラーがある場合は400エラーを返す
     if result.error:
         logger.error(
-            f"Error during score calculation: {result.error}, result: {result}"
+            f"Error during score calculation: {result.error}, result: {result}",
+            extra={"route": "/calculate"},
         )
         raise HTTPException(status_code=400, detail=result.error)
 
     return result
 
 
+async def _stream_batch_scores(
+    pool: ScoringPool, hands: List[HandItem], chunk_size: int
+) -> AsyncIterator[str]:
+    """手牌をチャンク単位でワーカープールに投入し、入力順に結果を返す"""
+    # 同時にワーカーへ投入するチャンク数の上限（メモリ使用量を抑えるため）
+    max_in_flight = pool.max_workers * 2
+    pending: deque = deque()
+
+    try:
+        for start in range(0, len(hands), chunk_size):
+            chunk = hands[start : start + chunk_size]
+            # 開始済みのストリームは途中で503にできないため、キュー上限は無視する
+            pending.append(
+                asyncio.ensure_future(pool.run(score_chunk, chunk, bounded=False))
+            )
+            while len(pending) > max_in_flight:
+                yield "".join(await pending.popleft())
+
+        while pending:
+            yield "".join(await pending.popleft())
+    finally:
+        # クライアントが切断した場合は、まだ始まっていないチャンクを取り消す
+        for future in pending:
+            future.cancel()
+
+
+def _parse_json_array(body: bytes) -> List[Any]:
+    try:
+        hands = json.loads(body)
+    except json.JSONDecodeError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid JSON: {e!s}")
+    if not isinstance(hands, list):
+        raise HTTPException(
+            status_code=400, detail="Request body must be a JSON array of hands"
+        )
+    return hands
+
+
+@app.post("/calculate/batch", operation_id="calculate_batch")
+async def calculate_batch(
+    request: Request,
+    chunk_size: int = Query(
+        64, ge=1, le=1024, description="ワーカーに渡すチャンクサイズ"
+    ),
+) -> StreamingResponse:
+    """
+    複数の手牌の点数をまとめて計算する
+
+    リクエストボディは Hand のJSON配列、1行1手牌のNDJSON
+    (Content-Type: application/x-ndjson)、またはバイナリ形式の手牌を連結したもの
+    (Content-Type: application/x-llmmj-hand)。
+    結果は ScoreResponse のNDJSONとして入力順にストリーミングで返す。
+    個々の手牌のエラーは該当行の error に入る。
+
+    Args:
+        request: バッチ点数計算リクエスト
+        chunk_size: ワーカーに渡すチャンクサイズ
+
+    Returns:
+        StreamingResponse: ScoreResponse のNDJSON
+    """
+    # StreamingResponse は応答中に receive() を横取りするため、ボディは先に読み切る
+    body = await request.body()
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith(NDJSON_MEDIA_TYPES):
+        # 各行のパースはワーカー側で行う
+        hands: List[Any] = [line for line in body.splitlines() if line.strip()]
+    elif content_type.startswith(HAND_CODEC_MEDIA_TYPE):
+        # 連結されたバイナリは途中から読み直せないため、不正な場合は全体をエラーにする
+        try:
+            hands = list(decode_hands(body))
+        except HandCodecError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid hand data: {e!s}")
+    else:
+        try:
+            # 全件が正しい手牌であれば pydantic-core で一括してパース・検証する
+            hands = decode_hand_array(body)
+        except ValidationError:
+            # 不正な手牌は該当行にエラーを返すため、ワーカーで1件ずつ検証する
+            hands = _parse_json_array(body)
+
+    logger.info(
+        "Received batch score calculation request",
+        extra={
+            "route": "/calculate/batch",
+            "hands": len(hands),
+            "chunk_size": chunk_size,
+        },
+    )
+
+    pool = get_scoring_pool()
+    if pool.is_saturated():
+        raise _service_unavailable(
+            ScoringPoolSaturatedError(
+                f"Scoring pool is saturated: {pool.pending} tasks pending"
+            )
+        )
+
+    return StreamingResponse(
+        _stream_batch_scores(pool, hands, chunk_size),
+        media_type=NDJSON_MEDIA_TYPES[0],
+    )
+
+
+@app.get("/metrics", operation_id="metrics", response_class=PlainTextResponse)
+async def metrics_endpoint() -> PlainTextResponse:
+    """
+    メトリクスを Prometheus のテキスト形式で返す
+
+    Returns:
+        PlainTextResponse: メトリクス
+    """
+    return PlainTextResponse(
+        metrics.REGISTRY.render(), media_type=PROMETHEUS_MEDIA_TYPE
+    )
+
+
 @app.get("/health", operation_id="health")
 async def health_check() -> Dict[str, str]:
     """
@@ -0,0 +1,119 @@
+"""
+複数ワーカーでAPIサーバーを起動するランチャー
+
+親プロセスでソケットのbind・アプリのimport・ウォームアップを済ませてから
+ワーカーをforkするため、各ワーカーは起動直後からリクエストを処理できる。
+ワーカーが異常終了した場合は再起動する。
+
+Usage:
+    python -m apimcp.launcher --workers 4 --port 8000
+"""
+
+import argparse
+import logging
+import os
+import signal
+import socket
+import sys
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+
+def _bind_socket(host: str, port: int, backlog: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _serve(app_path: str, sock: socket.socket) -> None:
+    """ワーカープロセスで uvicorn を起動する"""
+    import uvicorn
+
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    config = uvicorn.Config(app_path, log_level="info")
+    server = uvicorn.Server(config)
+    server.run(sockets=[sock])
+
+
+def _spawn_worker(app_path: str, sock: socket.socket) -> int:
+    pid = os.fork()
+    if pid == 0:
+        try:
+            _serve(app_path, sock)
+        finally:
+            os._exit(0)
+    logger.info(f"Started worker: pid={pid}")
+    return pid
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run preforked API server workers")
+    parser.add_argument("--app", default="main:app", help="ASGI app (module:attr)")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--backlog", type=int, default=2048)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    # 各ワーカーのプロセスプールの合計がCPUコア数になるように分配する
+    os.environ.setdefault(
+        "LLMMJ_SCORING_WORKERS",
+        str(max(1, (os.cpu_count() or 1) // args.workers)),
+    )
+
+    # fork前にアプリとmahjongライブラリを読み込み、初回計算を済ませておく
+    from uvicorn.importer import import_from_string
+
+    from apimcp.scoring import warm_up
+
+    import_from_string(args.app)
+    warm_up()
+
+    sock = _bind_socket(args.host, args.port, args.backlog)
+    logger.info(f"Listening on {args.host}:{args.port} with {args.workers} workers")
+
+    workers: Dict[int, int] = {}
+    for i in range(args.workers):
+        workers[_spawn_worker(args.app, sock)] = i
+
+    shutting_down = False
+
+    def _shutdown(signum, frame):
+        nonlocal shutting_down
+        shutting_down = True
+        for pid in workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, _shutdown)
+    signal.signal(signal.SIGTERM, _shutdown)
+
+    while workers:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        index = workers.pop(pid, None)
+        if index is None:
+            continue
+        if not shutting_down:
+            logger.warning(f"Worker {pid} exited with status {status}, restarting")
+            workers[_spawn_worker(args.app, sock)] = index
+
+    sock.close()
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
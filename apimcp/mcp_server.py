@@ -0,0 +1,67 @@
+"""
+点数計算ツールを直接公開するMCPサーバー
+
+main.py の FastApiMCP は MCP → HTTP → FastAPI を経由して点数計算を呼び出すが、
+このサーバーは tools.calculation の関数をそのままMCPツールとして登録する。
+ローカルのデスクトップエージェントからは mcp-remote を経由せず stdio で接続できる。
+
+Usage:
+    python -m apimcp.mcp_server                                # stdio
+    python -m apimcp.mcp_server --transport streamable-http --port 8001
+"""
+
+import argparse
+import logging
+import sys
+
+from mcp.server.fastmcp import FastMCP
+
+from tools.calculation import (
+    analyze_hand_waits,
+    calculate_mahjong_score,
+    check_hand_validity,
+    final_output_message_check,
+)
+
+logger = logging.getLogger(__name__)
+
+SERVER_NAME = "Mahjong Calculation Protocol (MCP) Server"
+TRANSPORTS = ("stdio", "streamable-http")
+
+
+def create_server() -> FastMCP:
+    """点数計算ツールを登録したMCPサーバーを生成する"""
+    server = FastMCP(
+        SERVER_NAME,
+        instructions="麻雀の点数計算と手牌のチェックを行うツール。",
+    )
+    server.add_tool(calculate_mahjong_score)
+    server.add_tool(check_hand_validity)
+    server.add_tool(analyze_hand_waits)
+    server.add_tool(final_output_message_check)
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=SERVER_NAME)
+    parser.add_argument("--transport", choices=TRANSPORTS, default="stdio")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    args = parser.parse_args()
+
+    # stdio では標準出力がプロトコルに使われるため、ログは標準エラー出力に出す
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+
+    server = create_server()
+    if args.transport == "stdio":
+        server.run("stdio")
+        return
+
+    import uvicorn
+
+    logger.info(f"Starting MCP server on http://{args.host}:{args.port}/mcp")
+    uvicorn.run(server.streamable_http_app(), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+点数計算用のプロセスプール
+
+点数計算はCPUバウンドなため、イベントループをブロックしないよう
+ワーカープロセスで実行する。実行待ちの件数には上限を設け、
+上限に達した場合は ScoringPoolSaturatedError を送出する。
+"""
+
+import asyncio
+import logging
+import os
+from typing import Any, Callable, Optional
+
+from apimcp.scoring import warm_up
+from exceptions import ScoringPoolSaturatedError
+from llmmj import metrics
+from llmmj.workers import forkserver_executor
+
+logger = logging.getLogger(__name__)
+
+# ワーカープロセス数（デフォルトはCPUコア数）
+SCORING_WORKERS = int(os.environ.get("LLMMJ_SCORING_WORKERS", os.cpu_count() or 1))
+# 実行中 + 実行待ちのタスク数の上限
+SCORING_QUEUE_SIZE = int(
+    os.environ.get("LLMMJ_SCORING_QUEUE_SIZE", SCORING_WORKERS * 8)
+)
+
+
+class ScoringPool:
+    def __init__(self, max_workers: int, max_pending: int):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._pending = 0
+        # forkserver には点数計算モジュールを事前に読み込ませておく
+        self._executor = forkserver_executor(
+            max_workers, ["apimcp.scoring"], initializer=warm_up
+        )
+
+    @property
+    def pending(self) -> int:
+        """実行中 + 実行待ちのタスク数"""
+        return self._pending
+
+    def is_saturated(self) -> bool:
+        return self._pending >= self.max_pending
+
+    async def run(self, fn: Callable[..., Any], *args: Any, bounded: bool = True):
+        """
+        ワーカープロセスで関数を実行する
+
+        Args:
+            fn: 実行する関数（pickle可能なモジュールレベル関数）
+            *args: 関数の引数
+            bounded: Trueの場合、キューが一杯なら実行せずにエラーにする
+
+        Raises:
+            ScoringPoolSaturatedError: キューが一杯の場合
+        """
+        if bounded and self.is_saturated():
+            error = ScoringPoolSaturatedError(
+                f"Scoring pool is saturated: {self._pending} tasks pending"
+            )
+            metrics.record_error(error)
+            raise error
+
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            # ワーカーで記録されたメトリクスを親プロセスに集約する
+            result, snapshot = await loop.run_in_executor(
+                self._executor, metrics.call_with_metrics, fn, *args
+            )
+        except Exception as e:
+            metrics.REGISTRY.merge(getattr(e, "metrics", None) or {})
+            raise
+        finally:
+            self._pending -= 1
+        metrics.REGISTRY.merge(snapshot)
+        return result
+
+    async def warm_up(self) -> None:
+        """全ワーカープロセスを起動し、ウォームアップを済ませる"""
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(
+            *(
+                loop.run_in_executor(self._executor, warm_up)
+                for _ in range(self.max_workers)
+            )
+        )
+        logger.info(f"Scoring pool is ready: {self.max_workers} workers")
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(cancel_futures=True)
+
+
+_scoring_pool: Optional[ScoringPool] = None
+
+
+def get_scoring_pool() -> ScoringPool:
+    """点数計算用のプロセスプールを取得する（初回呼び出し時に生成）"""
+    global _scoring_pool
+    if _scoring_pool is None:
+        _scoring_pool = ScoringPool(SCORING_WORKERS, SCORING_QUEUE_SIZE)
+    return _scoring_pool
+
+
+def shutdown_scoring_pool() -> None:
+    global _scoring_pool
+    if _scoring_pool is not None:
+        _scoring_pool.shutdown()
+        _scoring_pool = None
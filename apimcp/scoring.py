@@ -0,0 +1,103 @@
+"""
+ワーカープロセスで実行する点数計算処理
+
+ProcessPoolExecutor から呼び出されるため、FastAPI アプリには依存しない。
+"""
+
+from typing import Any, Dict, List, Union
+
+from pydantic import ValidationError
+
+from entity.entity import Hand, ScoreResponse
+from entity.hand_key import HandKey
+from exceptions import HandValidationError, ScoreCalculationError
+from llmmj import metrics
+from llmmj.llmmj import calculate_score, validate_hand
+
+HandItem = Union[str, bytes, Dict[str, Any], Hand]
+
+# ワーカー起動時のウォームアップに使う手牌
+_WARM_UP_HAND = {
+    "tiles": [
+        "1m",
+        "2m",
+        "3m",
+        "4m",
+        "5m",
+        "6m",
+        "7m",
+        "8m",
+        "9m",
+        "1p",
+        "1p",
+        "1p",
+        "2s",
+        "2s",
+    ],
+    "melds": [{"tiles": ["1p", "1p", "1p"], "is_open": True}],
+    "win_tile": "2s",
+    "dora_indicators": ["1m"],
+    "is_tsumo": True,
+}
+
+
+def warm_up() -> None:
+    """
+    mahjongライブラリの読み込みと初回計算を済ませておく
+
+    ワーカープロセスの initializer として、またはサーバー起動前に呼び出す。
+    """
+    score_hand_item(_WARM_UP_HAND)
+    # ウォームアップ時の計測値は捨てる
+    metrics.REGISTRY.drain()
+
+
+def validate_and_score(hand: Union[Hand, HandKey]) -> ScoreResponse:
+    """
+    手牌を検証して点数計算する
+
+    Raises:
+        HandValidationError: 手牌が不正な場合
+        ScoreCalculationError: 点数計算に失敗した場合
+    """
+    validate_hand(hand)
+    return calculate_score(hand)
+
+
+def score_hand_item(item: HandItem) -> ScoreResponse:
+    """
+    1件の手牌をパース・検証して点数計算する
+
+    Args:
+        item: 手牌のJSON文字列、dict、またはデコード済みの Hand
+
+    Returns:
+        ScoreResponse: 点数計算結果。失敗した場合は error に理由が入る
+    """
+    try:
+        if isinstance(item, (str, bytes)):
+            hand = Hand.model_validate_json(item)
+        else:
+            hand = Hand.model_validate(item)
+    except ValidationError as e:
+        metrics.record_error(e)
+        return ScoreResponse(error=f"Invalid hand format: {e!s}")
+
+    try:
+        validate_hand(hand)
+        return calculate_score(hand)
+    except (HandValidationError, ScoreCalculationError) as e:
+        return ScoreResponse(error=str(e))
+
+
+def score_chunk(items: List[HandItem]) -> List[str]:
+    """
+    手牌のチャンクを点数計算し、NDJSONの各行を返す
+
+    Args:
+        items: 手牌のJSON文字列、またはdictのリスト
+
+    Returns:
+        List[str]: ScoreResponse をJSONにした行のリスト（入力と同じ順序）
+    """
+    return [score_hand_item(item).model_dump_json() + "\n" for item in items]
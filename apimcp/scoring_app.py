@@ -0,0 +1,169 @@
+"""
+点数計算だけを行う軽量なAPIサーバー
+
+FastAPI・fastapi_mcp・pandas・LangChain を読み込まず、mahjong ライブラリと
+pydantic だけで起動する ASGI アプリ。起動が速いため、ワーカー数の多い構成や
+短時間だけ使う用途に向く。点数計算はプロセスプールを使わずにリクエストを
+受けたプロセスで行うため、並列化は launcher のワーカー数で行う。
+点数計算は asyncio.to_thread で行い、大きなバッチの計算中も /health などの
+リクエストに応答できるようにする（GIL があるため計算自体は並列にならない）。
+
+エンドポイント (apimcp.fast_api と同じ形式):
+
+- POST /calculate: ScoreRequest のJSON、またはバイナリ形式の手牌
+  (Content-Type: application/x-llmmj-hand) → ScoreResponse。不正な手牌は400
+- POST /calculate/batch: Hand のJSON配列、1行1手牌のNDJSON、またはバイナリ形式の
+  手牌を連結したもの → ScoreResponse のNDJSON（個々の手牌のエラーは該当行の error に入る）
+- GET /health
+
+Usage:
+    python -m apimcp.scoring_app --port 8000
+    python -m apimcp.launcher --app apimcp.scoring_app:app --workers 4
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+
+from apimcp.scoring import score_chunk, validate_and_score
+from entity.codec import HAND_CODEC_MEDIA_TYPE, decode_hands
+from entity.entity import ScoreRequest
+from exceptions import HandCodecError, HandValidationError, ScoreCalculationError
+
+logger = logging.getLogger(__name__)
+
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/jsonl")
+JSON_MEDIA_TYPE = "application/json"
+
+Scope = Dict[str, Any]
+Receive = Callable[[], Awaitable[Dict[str, Any]]]
+Send = Callable[[Dict[str, Any]], Awaitable[None]]
+# (ステータスコード, Content-Type, ボディ)
+Response = Tuple[int, str, bytes]
+
+
+def _json(status: int, content: Any) -> Response:
+    return status, JSON_MEDIA_TYPE, json.dumps(content, ensure_ascii=False).encode()
+
+
+def _error(status: int, detail: Any) -> Response:
+    return _json(status, {"detail": detail})
+
+
+def calculate(body: bytes, content_type: str) -> Response:
+    """POST /calculate"""
+    try:
+        if content_type.startswith(HAND_CODEC_MEDIA_TYPE):
+            request = ScoreRequest.model_validate(body)
+        else:
+            request = ScoreRequest.model_validate_json(body)
+    except ValidationError as e:
+        # バイナリのボディは JSON にできないため input を含めない
+        return _error(422, e.errors(include_url=False, include_input=False))
+
+    try:
+        result = validate_and_score(request.hand)
+    except (HandValidationError, ScoreCalculationError) as e:
+        logger.error(f"Score calculation failed: {e!s}", extra={"route": "/calculate"})
+        return _error(400, str(e))
+    if result.error:
+        return _error(400, result.error)
+    return 200, JSON_MEDIA_TYPE, result.model_dump_json().encode()
+
+
+def calculate_batch(body: bytes, content_type: str) -> Response:
+    """POST /calculate/batch"""
+    if content_type.startswith(NDJSON_MEDIA_TYPES):
+        hands: List[Any] = [line for line in body.splitlines() if line.strip()]
+    elif content_type.startswith(HAND_CODEC_MEDIA_TYPE):
+        # 連結されたバイナリは途中から読み直せないため、不正な場合は全体をエラーにする
+        try:
+            hands = list(decode_hands(body))
+        except HandCodecError as e:
+            return _error(400, f"Invalid hand data: {e!s}")
+    else:
+        try:
+            hands = json.loads(body)
+        except json.JSONDecodeError as e:
+            return _error(400, f"Invalid JSON: {e!s}")
+        if not isinstance(hands, list):
+            return _error(400, "Request body must be a JSON array of hands")
+    return 200, NDJSON_MEDIA_TYPES[0], "".join(score_chunk(hands)).encode()
+
+
+ROUTES: Dict[Tuple[str, str], Callable[[bytes, str], Response]] = {
+    ("POST", "/calculate"): calculate,
+    ("POST", "/calculate/batch"): calculate_batch,
+    ("GET", "/health"): lambda body, content_type: _json(200, {"status": "ok"}),
+}
+
+
+async def _read_body(receive: Receive) -> bytes:
+    chunks = []
+    while True:
+        message = await receive()
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body"):
+            return b"".join(chunks)
+
+
+def _header(scope: Scope, name: bytes) -> Optional[str]:
+    for key, value in scope.get("headers", ()):
+        if key.lower() == name:
+            return value.decode("latin-1")
+    return None
+
+
+async def app(scope: Scope, receive: Receive, send: Send) -> None:
+    """ASGI アプリ"""
+    if scope["type"] == "lifespan":
+        while (await receive())["type"] != "lifespan.shutdown":
+            await send({"type": "lifespan.startup.complete"})
+        await send({"type": "lifespan.shutdown.complete"})
+        return
+    if scope["type"] != "http":
+        return
+
+    handler = ROUTES.get((scope["method"], scope["path"]))
+    if handler is None:
+        if any(path == scope["path"] for _, path in ROUTES):
+            status, content_type, body = _error(405, "Method Not Allowed")
+        else:
+            status, content_type, body = _error(404, "Not Found")
+    else:
+        request_body = await _read_body(receive)
+        # 点数計算でイベントループをブロックしないよう、スレッドで実行する
+        status, content_type, body = await asyncio.to_thread(
+            handler, request_body, _header(scope, b"content-type") or JSON_MEDIA_TYPE
+        )
+
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", content_type.encode()),
+                (b"content-length", str(len(body)).encode()),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the scoring-only API server")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+
+    import uvicorn
+
+    uvicorn.run("apimcp.scoring_app:app", host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
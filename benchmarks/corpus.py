@@ -0,0 +1,301 @@
+"""ベンチマーク用の手牌コーパス
+
+- SAMPLE_HANDS: 代表的な和了形
+- load_test_hands: tests/ 内のテストケースの手牌
+- load_eval_hands: 過去の評価結果 (dist/ 内のCSV) の手牌
+- synthetic_hands: ランダムに生成した手牌
+"""
+
+import ast
+import glob
+import json
+import random
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from entity.entity import Hand
+from generator.synthetic import random_hand
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# 代表的な和了形 (門前/副露/暗槓/七対子/ツモ/ロン)
+SAMPLE_HANDS: List[Dict[str, Any]] = [
+    {
+        "tiles": [
+            "2m",
+            "3m",
+            "4m",
+            "5m",
+            "6m",
+            "7m",
+            "2p",
+            "3p",
+            "4p",
+            "5p",
+            "6p",
+            "7p",
+            "8p",
+            "8p",
+        ],
+        "win_tile": "8p",
+        "dora_indicators": ["1s"],
+        "is_tsumo": True,
+        "player_wind": "east",
+        "round_wind": "east",
+    },
+    {
+        "tiles": [
+            "4m",
+            "4m",
+            "4m",
+            "4m",
+            "4z",
+            "4z",
+            "4z",
+            "1p",
+            "1p",
+            "2s",
+            "3s",
+            "4s",
+            "6s",
+            "7s",
+            "8s",
+        ],
+        "melds": [{"tiles": ["4m", "4m", "4m", "4m"], "is_open": False}],
+        "win_tile": "7s",
+        "dora_indicators": ["6s"],
+        "is_riichi": True,
+        "player_wind": "south",
+        "round_wind": "east",
+    },
+    {
+        "tiles": [
+            "1m",
+            "2m",
+            "3m",
+            "4m",
+            "5m",
+            "6m",
+            "7p",
+            "8p",
+            "9p",
+            "1s",
+            "1s",
+            "5p",
+            "5p",
+            "5p",
+        ],
+        "melds": [{"tiles": ["5p", "5p", "5p"], "is_open": True}],
+        "win_tile": "1s",
+        "dora_indicators": ["2s"],
+        "player_wind": "south",
+        "round_wind": "east",
+    },
+    {
+        "tiles": [
+            "1m",
+            "1m",
+            "3p",
+            "3p",
+            "5s",
+            "5s",
+            "7m",
+            "7m",
+            "9p",
+            "9p",
+            "2z",
+            "2z",
+            "6z",
+            "6z",
+        ],
+        "win_tile": "6z",
+        "dora_indicators": ["8m"],
+        "is_riichi": True,
+        "player_wind": "west",
+        "round_wind": "east",
+    },
+    {
+        "tiles": [
+            "1m",
+            "2m",
+            "3m",
+            "4m",
+            "5m",
+            "6m",
+            "7m",
+            "8m",
+            "9m",
+            "1p",
+            "1p",
+            "1p",
+            "2s",
+            "2s",
+        ],
+        "win_tile": "2s",
+        "dora_indicators": ["1m"],
+        "is_riichi": True,
+        "is_tsumo": True,
+        "player_wind": "east",
+        "round_wind": "east",
+    },
+    {
+        "tiles": [
+            "5z",
+            "5z",
+            "5z",
+            "2m",
+            "3m",
+            "4m",
+            "6p",
+            "7p",
+            "8p",
+            "3s",
+            "3s",
+            "3s",
+            "9m",
+            "9m",
+        ],
+        "win_tile": "9m",
+        "dora_indicators": ["2s"],
+        "is_riichi": True,
+        "player_wind": "south",
+        "round_wind": "east",
+    },
+    {
+        "tiles": [
+            "2p",
+            "3p",
+            "4p",
+            "6p",
+            "7p",
+            "8p",
+            "2s",
+            "3s",
+            "4s",
+            "6m",
+            "6m",
+            "6z",
+            "6z",
+            "6z",
+        ],
+        "melds": [{"tiles": ["6z", "6z", "6z"], "is_open": True}],
+        "win_tile": "4p",
+        "dora_indicators": ["5m"],
+        "is_tsumo": True,
+        "player_wind": "north",
+        "round_wind": "south",
+    },
+    {
+        "tiles": [
+            "1z",
+            "1z",
+            "1z",
+            "1z",
+            "7p",
+            "7p",
+            "7p",
+            "7p",
+            "1m",
+            "2m",
+            "3m",
+            "7s",
+            "8s",
+            "9s",
+            "9p",
+            "9p",
+        ],
+        "melds": [
+            {"tiles": ["1z", "1z", "1z", "1z"], "is_open": False},
+            {"tiles": ["7p", "7p", "7p", "7p"], "is_open": True},
+        ],
+        "win_tile": "9p",
+        "dora_indicators": ["6p"],
+        "player_wind": "east",
+        "round_wind": "east",
+    },
+]
+
+
+def sample_hands() -> List[Hand]:
+    """Return SAMPLE_HANDS as Hand objects."""
+    return [Hand(**hand) for hand in SAMPLE_HANDS]
+
+
+def _literal_hand(fields: Dict[str, ast.expr]) -> Optional[Dict[str, Any]]:
+    hand = {}
+    for name, node in fields.items():
+        if name not in Hand.model_fields:
+            continue
+        try:
+            hand[name] = ast.literal_eval(node)
+        except ValueError:
+            return None
+    return hand
+
+
+def _iter_literal_hands(tree: ast.AST) -> Iterator[Dict[str, Any]]:
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Call):
+            fields = {kw.arg: kw.value for kw in node.keywords if kw.arg}
+        elif isinstance(node, ast.Dict):
+            fields = {
+                key.value: value
+                for key, value in zip(node.keys, node.values)
+                if isinstance(key, ast.Constant) and isinstance(key.value, str)
+            }
+        else:
+            continue
+        if "tiles" not in fields or "win_tile" not in fields:
+            continue
+        hand = _literal_hand(fields)
+        if hand is not None:
+            yield hand
+
+
+def load_test_hands(tests_dir: Optional[Path] = None) -> List[Dict[str, Any]]:
+    """Collect literal hands passed to the scoring functions in tests/.
+
+    Both valid and invalid hands are returned so that error paths are
+    exercised as well.
+    """
+    tests_dir = tests_dir or PROJECT_ROOT / "tests"
+    hands = {}
+    for path in sorted(tests_dir.glob("test_*.py")):
+        tree = ast.parse(path.read_text())
+        for hand in _iter_literal_hands(tree):
+            try:
+                Hand(**hand)
+            except Exception:
+                continue
+            hands[json.dumps(hand, sort_keys=True)] = hand
+    return list(hands.values())
+
+
+def load_eval_hands(pattern: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Collect hands from evaluation result CSVs (dist/**/*.csv by default)."""
+    import pandas as pd
+
+    from evaluator.libs import hand_from_record
+
+    pattern = pattern or str(PROJECT_ROOT / "dist" / "**" / "*.csv")
+    hands = []
+    for path in sorted(glob.glob(pattern, recursive=True)):
+        for record in pd.read_csv(path).to_dict("records"):
+            try:
+                hand = hand_from_record(record)
+            except Exception:
+                continue
+            if hand.tiles:
+                hands.append(hand.model_dump(exclude_defaults=True))
+    return hands
+
+
+def synthetic_hands(n: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Generate n random complete hands, reproducible by seed.
+
+    Hands come from generator.synthetic.random_hand (4 groups + a pair or
+    seven pairs, possibly with melds and a kan) and are not guaranteed to
+    have a yaku.
+    """
+    rng = random.Random(seed)
+    return [random_hand(rng) for _ in range(n)]
@@ -0,0 +1,125 @@
+"""
+インポート時間のベンチマーク
+
+新しいインタプリタで `python -X importtime -c "import <module>"` を実行し、
+モジュールの累積インポート時間（中央値）を予算 (BUDGETS) と比較する。
+点数計算だけを使うモジュールが重い依存 (HEAVY_MODULES) を読み込んでいないかも
+確認する。ワーカープロセスやCLIの起動時間はほぼインポート時間で決まる。
+
+Usage:
+    python -m benchmarks.importtime [--module apimcp.scoring_app] [--repeat 5]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from benchmarks.corpus import PROJECT_ROOT
+
+REPEAT = 5
+
+# エントリポイント → 累積インポート時間の予算 (ms)
+BUDGETS: Dict[str, float] = {
+    "llmmj.llmmj": 300,
+    "tools.calculation": 400,
+    "apimcp.scoring": 400,
+    "apimcp.scoring_app": 400,
+    "prompts.prompts": 100,
+    "evaluator.libs": 500,
+    "generator.synthetic": 500,
+    "apimcp.mcp_server": 1500,
+}
+# エントリポイントが読み込んではいけないパッケージ
+HEAVY_MODULES = (
+    "pandas",
+    "numpy",
+    "langchain",
+    "langchain_core",
+    "fastapi",
+    "fastapi_mcp",
+    "google.adk",
+)
+
+
+class ImportTime(NamedTuple):
+    module: str
+    median_ms: float
+    budget_ms: Optional[float]
+    heavy: Tuple[str, ...]
+
+    @property
+    def ok(self) -> bool:
+        over_budget = self.budget_ms is not None and self.median_ms > self.budget_ms
+        return not over_budget and not self.heavy
+
+
+def parse_importtime(stderr: str) -> Dict[str, int]:
+    """-X importtime の出力をモジュール名 → 累積インポート時間 (us) にする"""
+    cumulative = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative_us, name = line[len("import time:") :].split("|")
+        # 見出し行 (self [us] | cumulative | imported package) は読み飛ばす
+        if cumulative_us.strip().isdigit():
+            cumulative[name.strip()] = int(cumulative_us)
+    return cumulative
+
+
+def import_profile(module: str) -> Dict[str, int]:
+    """新しいインタプリタで module をインポートし、読み込まれたモジュールの累積時間を返す"""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(
+            f"Cannot import {module}: {completed.stderr.strip().splitlines()[-1]}"
+        )
+    return parse_importtime(completed.stderr)
+
+
+def heavy_imports(profile: Dict[str, int]) -> Tuple[str, ...]:
+    """読み込まれた HEAVY_MODULES"""
+    return tuple(name for name in HEAVY_MODULES if name in profile)
+
+
+def measure(module: str, repeat: int = REPEAT) -> ImportTime:
+    profiles = [import_profile(module) for _ in range(repeat)]
+    return ImportTime(
+        module=module,
+        median_ms=statistics.median(profile[module] for profile in profiles) / 1000,
+        budget_ms=BUDGETS.get(module),
+        heavy=heavy_imports(profiles[0]),
+    )
+
+
+def _print_results(results: List[ImportTime]) -> None:
+    print(f"{'module':<24}{'median ms':>11}{'budget ms':>11}  heavy imports")
+    for r in results:
+        budget = f"{r.budget_ms:.0f}" if r.budget_ms is not None else "-"
+        mark = "" if r.ok else "  OVER BUDGET / HEAVY"
+        print(
+            f"{r.module:<24}{r.median_ms:>11.1f}{budget:>11}  "
+            f"{', '.join(r.heavy) or '-'}{mark}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time benchmark with budgets")
+    parser.add_argument("--module", nargs="+", default=list(BUDGETS))
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    args = parser.parse_args()
+
+    results = [measure(module, args.repeat) for module in args.module]
+    _print_results(results)
+    if not all(r.ok for r in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
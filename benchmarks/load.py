@@ -0,0 +1,318 @@
+"""
+点数計算APIの負荷テスト
+
+POST /calculate に手牌コーパスを流し込み、同時接続数ごとに
+RPS・レイテンシ (p50/p95/p99)・1リクエストあたりのCPU時間を計測する。
+
+- asgi: プロセス内のASGIクライアント経由（ネットワークを介さない）
+- uvicorn: ローカルで起動した uvicorn 経由
+
+Usage:
+    python -m benchmarks.load --targets asgi uvicorn --corpora tests synthetic
+    python -m benchmarks.load --compare benchmarks/results/load-20250101-000000.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import socket
+import subprocess
+import sys
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+
+from benchmarks.corpus import (
+    PROJECT_ROOT,
+    load_eval_hands,
+    load_test_hands,
+    synthetic_hands,
+)
+
+RESULTS_DIR = PROJECT_ROOT / "benchmarks" / "results"
+
+CORPORA: Dict[str, Callable[[], List[Dict[str, Any]]]] = {
+    "tests": load_test_hands,
+    "evals": load_eval_hands,
+    "synthetic": lambda: synthetic_hands(1000),
+}
+
+DEFAULT_CONCURRENCY = [1, 4, 16, 64]
+WARM_UP_REQUESTS = 20
+
+
+def _percentile(sorted_values: List[float], percentile: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * percentile / 100))
+    return sorted_values[index]
+
+
+def _process_tree_cpu_seconds(pid: int) -> Optional[float]:
+    """プロセスとその子孫のCPU時間 (user + system) を /proc から取得する"""
+    clock_ticks = os.sysconf("SC_CLK_TCK")
+    total = 0.0
+    stack = [pid]
+    while stack:
+        current = stack.pop()
+        try:
+            with open(f"/proc/{current}/stat") as f:
+                # comm に空白が含まれる場合があるため ")" 以降をパースする
+                fields = f.read().rsplit(")", 1)[1].split()
+            total += (int(fields[11]) + int(fields[12])) / clock_ticks
+            for task in os.listdir(f"/proc/{current}/task"):
+                with open(f"/proc/{current}/task/{task}/children") as f:
+                    stack.extend(int(child) for child in f.read().split())
+        except (FileNotFoundError, ProcessLookupError):
+            if current == pid:
+                return None
+    return total
+
+
+async def _drive(
+    client: httpx.AsyncClient,
+    hands: List[Dict[str, Any]],
+    concurrency: int,
+    total_requests: int,
+    cpu_pid: int,
+) -> Dict[str, Any]:
+    """同時接続数 concurrency で total_requests 件のリクエストを送る"""
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    next_index = 0
+
+    async def worker():
+        nonlocal next_index
+        while next_index < total_requests:
+            hand = hands[next_index % len(hands)]
+            next_index += 1
+            start = time.perf_counter()
+            try:
+                response = await client.post("/calculate", json={"hand": hand})
+                statuses[str(response.status_code)] += 1
+            except httpx.HTTPError as e:
+                statuses[type(e).__name__] += 1
+            latencies.append(time.perf_counter() - start)
+
+    cpu_before = _process_tree_cpu_seconds(cpu_pid)
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    cpu_after = _process_tree_cpu_seconds(cpu_pid)
+
+    latencies.sort()
+    cpu_ms_per_request = None
+    if cpu_before is not None and cpu_after is not None:
+        cpu_ms_per_request = (cpu_after - cpu_before) * 1000 / len(latencies)
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "rps": len(latencies) / elapsed,
+        "p50_ms": _percentile(latencies, 50) * 1000,
+        "p95_ms": _percentile(latencies, 95) * 1000,
+        "p99_ms": _percentile(latencies, 99) * 1000,
+        "cpu_ms_per_request": cpu_ms_per_request,
+        "status_counts": dict(statuses),
+    }
+
+
+async def _run_levels(
+    client: httpx.AsyncClient,
+    hands: List[Dict[str, Any]],
+    levels: List[int],
+    requests: int,
+    cpu_pid: int,
+) -> List[Dict[str, Any]]:
+    await _drive(client, hands, 1, WARM_UP_REQUESTS, cpu_pid)
+    return [
+        await _drive(client, hands, concurrency, requests, cpu_pid)
+        for concurrency in levels
+    ]
+
+
+async def run_asgi(
+    hands: List[Dict[str, Any]], levels: List[int], requests: int
+) -> List[Dict[str, Any]]:
+    """プロセス内のASGIクライアントで負荷をかける
+
+    CPU時間にはクライアント側の処理も含まれる。
+    """
+    from apimcp.fast_api import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://asgi"
+        ) as client:
+            return await _run_levels(client, hands, levels, requests, os.getpid())
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _wait_for_health(client: httpx.AsyncClient, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(0.2)
+    raise TimeoutError("uvicorn did not become healthy")
+
+
+async def run_uvicorn(
+    hands: List[Dict[str, Any]], levels: List[int], requests: int, workers: int
+) -> List[Dict[str, Any]]:
+    """ローカルで起動した uvicorn (workers > 1 の場合はランチャー) で負荷をかける
+
+    CPU時間はサーバープロセスとその子プロセスの合計。
+    """
+    port = _free_port()
+    if workers > 1:
+        command = ["-m", "apimcp.launcher", "--workers", str(workers)]
+        command += ["--app", "apimcp.fast_api:app", "--port", str(port)]
+    else:
+        command = ["-m", "uvicorn", "apimcp.fast_api:app", "--port", str(port)]
+        command += ["--log-level", "warning"]
+    server = subprocess.Popen(
+        [sys.executable, *command],
+        cwd=PROJECT_ROOT,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        limits = httpx.Limits(max_connections=max(levels))
+        async with httpx.AsyncClient(
+            base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=30
+        ) as client:
+            await _wait_for_health(client, timeout=60)
+            return await _run_levels(client, hands, levels, requests, server.pid)
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _print_results(results: List[Dict[str, Any]]) -> None:
+    print(
+        f"{'target':<9}{'corpus':<11}{'conc':>5}{'rps':>10}{'p50ms':>8}"
+        f"{'p95ms':>8}{'p99ms':>8}{'cpu ms/req':>11}  statuses"
+    )
+    for r in results:
+        cpu = r["cpu_ms_per_request"]
+        print(
+            f"{r['target']:<9}{r['corpus']:<11}{r['concurrency']:>5}{r['rps']:>10.1f}"
+            f"{r['p50_ms']:>8.2f}{r['p95_ms']:>8.2f}{r['p99_ms']:>8.2f}"
+            f"{cpu if cpu is None else format(cpu, '.2f'):>11}  {r['status_counts']}"
+        )
+
+
+def _print_comparison(results: List[Dict[str, Any]], baseline: Dict[str, Any]) -> None:
+    def key(r):
+        return r["target"], r["corpus"], r["concurrency"]
+
+    previous = {key(r): r for r in baseline["results"]}
+    print(f"\ncompared with {baseline['meta'].get('commit')}:")
+    for r in results:
+        before = previous.get(key(r))
+        if before is None:
+            continue
+        rps = r["rps"] / before["rps"] - 1
+        p95 = r["p95_ms"] / before["p95_ms"] - 1 if before["p95_ms"] else 0.0
+        print(
+            f"{r['target']:<9}{r['corpus']:<11}{r['concurrency']:>5}"
+            f"  rps {rps:+.1%}  p95 {p95:+.1%}"
+        )
+
+
+async def _main(args) -> List[Dict[str, Any]]:
+    results = []
+    for corpus in args.corpora:
+        hands = CORPORA[corpus]()
+        if not hands:
+            print(f"skip corpus '{corpus}': no hands found", file=sys.stderr)
+            continue
+        for target in args.targets:
+            if target == "asgi":
+                levels = await run_asgi(hands, args.concurrency, args.requests)
+            else:
+                levels = await run_uvicorn(
+                    hands, args.concurrency, args.requests, args.workers
+                )
+            for level in levels:
+                results.append({"target": target, "corpus": corpus, **level})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test POST /calculate")
+    parser.add_argument(
+        "--targets", nargs="+", choices=["asgi", "uvicorn"], default=["asgi"]
+    )
+    parser.add_argument(
+        "--corpora", nargs="+", choices=list(CORPORA), default=["tests", "synthetic"]
+    )
+    parser.add_argument(
+        "--concurrency", nargs="+", type=int, default=DEFAULT_CONCURRENCY
+    )
+    parser.add_argument(
+        "--requests", type=int, default=500, help="Requests per concurrency level"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1, help="uvicorn workers (uses the launcher)"
+    )
+    parser.add_argument("--output", type=Path, help="Path of the result JSON")
+    parser.add_argument("--compare", type=Path, help="Baseline result JSON")
+    args = parser.parse_args()
+
+    # リクエストごとのログで計測結果が埋もれないようにする
+    os.environ.setdefault("LLMMJ_LOG_SAMPLE_RATES", "/calculate=0")
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    results = asyncio.run(_main(args))
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "cpu_count": os.cpu_count(),
+            "requests_per_level": args.requests,
+            "workers": args.workers,
+        },
+        "results": results,
+    }
+
+    output = args.output or RESULTS_DIR / (
+        f"load-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+
+    _print_results(results)
+    if args.compare:
+        _print_comparison(results, json.loads(args.compare.read_text()))
+    print(f"\nsaved to {output}")
+
+
+if __name__ == "__main__":
+    main()
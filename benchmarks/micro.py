@@ -0,0 +1,387 @@
+"""
+点数計算コアのマイクロベンチマーク
+
+牌の変換・バリデーション・鳴きの判定・点数計算・result_to_df・Hand の生成/パースの
+1操作あたりの処理時間を計測し、ベースライン (JSON) と比較する。
+
+Usage:
+    python -m benchmarks.micro run [--filter full_scoring] [--save]
+    python -m benchmarks.micro compare [--baseline PATH] [--threshold 0.1]
+    python -m benchmarks.micro compare --current results.json
+"""
+
+import argparse
+import importlib.metadata
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import timeit
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from benchmarks.corpus import PROJECT_ROOT, SAMPLE_HANDS, synthetic_hands
+from entity.entity import Hand
+from evaluator.libs import hand_2_result, result_to_df
+from llmmj import metrics
+from llmmj.batch_validation import validate_hands
+from llmmj.llmmj import (
+    calculate_score,
+    convert_melds_to_mahjong_format,
+    convert_tiles_to_136_array,
+    validate_hand,
+)
+
+# ベースラインのファイル形式のバージョン（形式を変えたら上げる）
+SCHEMA_VERSION = 1
+DEFAULT_BASELINE = PROJECT_ROOT / "benchmarks" / "baselines" / "micro.json"
+# 中央値がベースラインからこの割合以上遅くなったら回帰とみなす
+DEFAULT_THRESHOLD = 0.10
+# 計測結果に影響するため、ベースラインと一致しているか確認する実行環境の項目
+ENVIRONMENT_KEYS = ("python", "machine", "cpu", "cpu_count", "mahjong", "pydantic")
+
+REPEAT = 7
+WARM_UP_SECONDS = 0.2
+
+# (1回の呼び出しで実行する関数, 1回の呼び出しあたりの操作数)
+Benchmark = Tuple[Callable[[], Any], int]
+
+
+def _corpus() -> List[Dict[str, Any]]:
+    return SAMPLE_HANDS + synthetic_hands(64, seed=0)
+
+
+def _bench_tile_conversion() -> Benchmark:
+    tiles = [hand["tiles"] for hand in _corpus()]
+
+    def run():
+        for t in tiles:
+            convert_tiles_to_136_array(t)
+
+    return run, len(tiles)
+
+
+def _bench_validation() -> Benchmark:
+    hands = [Hand(**hand) for hand in _corpus()]
+
+    def run():
+        for hand in hands:
+            validate_hand(hand)
+
+    return run, len(hands)
+
+
+def _bench_batch_validation() -> Benchmark:
+    hands = [Hand(**hand) for hand in _corpus()]
+
+    def run():
+        validate_hands(hands)
+
+    return run, len(hands)
+
+
+def _bench_meld_detection() -> Benchmark:
+    melds = [Hand(**hand).melds for hand in _corpus() if hand.get("melds")]
+
+    def run():
+        for m in melds:
+            convert_melds_to_mahjong_format(m)
+
+    return run, len(melds)
+
+
+def _bench_full_scoring() -> Benchmark:
+    hands = [Hand(**hand) for hand in _corpus()]
+
+    def run():
+        for hand in hands:
+            calculate_score(hand)
+
+    return run, len(hands)
+
+
+def _bench_result_to_df() -> Benchmark:
+    results = []
+    for hand in map(Hand.model_validate, _corpus()):
+        score = calculate_score(hand)
+        # 役なしの手牌もあるため、期待値は計算結果（なければ0）とする
+        data = {"answer": {"han": score.han or 0, "fu": score.fu or 0}}
+        results.append(hand_2_result(hand, data, "benchmark"))
+
+    def run():
+        result_to_df(results)
+
+    return run, len(results)
+
+
+def _bench_hand_construction() -> Benchmark:
+    hands = _corpus()
+
+    def run():
+        for hand in hands:
+            Hand(**hand)
+
+    return run, len(hands)
+
+
+def _bench_hand_parsing() -> Benchmark:
+    payloads = [json.dumps(hand) for hand in _corpus()]
+
+    def run():
+        for payload in payloads:
+            Hand.model_validate_json(payload)
+
+    return run, len(payloads)
+
+
+BENCHMARKS: Dict[str, Callable[[], Benchmark]] = {
+    "tile_conversion": _bench_tile_conversion,
+    "validation": _bench_validation,
+    "batch_validation": _bench_batch_validation,
+    "meld_detection": _bench_meld_detection,
+    "full_scoring": _bench_full_scoring,
+    "result_to_df": _bench_result_to_df,
+    "hand_construction": _bench_hand_construction,
+    "hand_parsing": _bench_hand_parsing,
+}
+
+
+def measure(run: Callable[[], Any], ops: int, repeat: int = REPEAT) -> Dict[str, Any]:
+    """
+    ウォームアップ後に繰り返し計測し、1操作あたりの処理時間を返す
+
+    Returns:
+        Dict[str, Any]: median_ns / min_ns / stdev_ns (1操作あたり) と計測回数
+    """
+    timer = timeit.Timer(run)
+    # キャッシュやインポートの影響を除くため、一定時間空回しする
+    warm_up_end = timeit.default_timer() + WARM_UP_SECONDS
+    while timeit.default_timer() < warm_up_end:
+        run()
+    number, _ = timer.autorange()
+    samples = [t / number / ops * 1e9 for t in timer.repeat(repeat, number)]
+    return {
+        "median_ns": statistics.median(samples),
+        "min_ns": min(samples),
+        "stdev_ns": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "ops": ops,
+        "loops": number,
+        "repeat": repeat,
+    }
+
+
+def run_benchmarks(
+    names: Optional[List[str]] = None, repeat: int = REPEAT
+) -> Dict[str, Dict[str, Any]]:
+    results = {}
+    for name in names or BENCHMARKS:
+        run, ops = BENCHMARKS[name]()
+        results[name] = measure(run, ops, repeat)
+        # 計測中に記録されたメトリクスは不要なので捨てる
+        metrics.REGISTRY.drain()
+    return results
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _cpu_model() -> str:
+    # platform.processor() は Linux では空文字列を返すことが多い
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or platform.machine()
+
+
+def _package_version(name: str) -> Optional[str]:
+    try:
+        return importlib.metadata.version(name)
+    except importlib.metadata.PackageNotFoundError:
+        return None
+
+
+def make_report(results: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    return {
+        "version": SCHEMA_VERSION,
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "cpu": _cpu_model(),
+            "cpu_count": os.cpu_count(),
+            "mahjong": _package_version("mahjong"),
+            "pydantic": _package_version("pydantic"),
+        },
+        "benchmarks": results,
+    }
+
+
+def load_report(path: Path) -> Dict[str, Any]:
+    report = json.loads(Path(path).read_text())
+    if report.get("version") != SCHEMA_VERSION:
+        raise ValueError(
+            f"{path}: unsupported baseline version {report.get('version')!r}, "
+            f"expected {SCHEMA_VERSION}"
+        )
+    return report
+
+
+def environment_mismatches(
+    baseline: Dict[str, Any], current: Dict[str, Any]
+) -> Dict[str, Tuple[Any, Any]]:
+    """ベースラインと実行環境が異なる項目を (ベースライン, 現在) の組で返す"""
+    mismatches = {}
+    for key in ENVIRONMENT_KEYS:
+        before, after = baseline["meta"].get(key), current["meta"].get(key)
+        if before != after:
+            mismatches[key] = (before, after)
+    return mismatches
+
+
+def compare_reports(
+    baseline: Dict[str, Any], current: Dict[str, Any], threshold: float
+) -> List[Dict[str, Any]]:
+    """
+    ベンチマークごとに中央値を比較する
+
+    ベースラインにないベンチマークは missing=True の行として返す（比較できないため
+    change と baseline_ns は None）。
+
+    Returns:
+        List[Dict[str, Any]]: name / baseline_ns / current_ns / change / regression /
+            missing
+    """
+    rows = []
+    for name, result in current["benchmarks"].items():
+        before = baseline["benchmarks"].get(name)
+        if before is None:
+            rows.append(
+                {
+                    "name": name,
+                    "baseline_ns": None,
+                    "current_ns": result["median_ns"],
+                    "change": None,
+                    "regression": False,
+                    "missing": True,
+                }
+            )
+            continue
+        change = result["median_ns"] / before["median_ns"] - 1
+        rows.append(
+            {
+                "name": name,
+                "baseline_ns": before["median_ns"],
+                "current_ns": result["median_ns"],
+                "change": change,
+                "regression": change > threshold,
+                "missing": False,
+            }
+        )
+    return rows
+
+
+def _print_results(results: Dict[str, Dict[str, Any]]) -> None:
+    print(f"{'benchmark':<20}{'median us':>12}{'min us':>12}{'stdev us':>12}")
+    for name, r in results.items():
+        print(
+            f"{name:<20}{r['median_ns'] / 1000:>12.2f}{r['min_ns'] / 1000:>12.2f}"
+            f"{r['stdev_ns'] / 1000:>12.2f}"
+        )
+
+
+def _print_comparison(rows: List[Dict[str, Any]], threshold: float) -> None:
+    print(
+        f"{'benchmark':<20}{'baseline us':>13}{'current us':>13}{'change':>9}"
+        f"  (threshold {threshold:+.0%})"
+    )
+    for row in rows:
+        if row["missing"]:
+            print(
+                f"{row['name']:<20}{'-':>13}{row['current_ns'] / 1000:>13.2f}"
+                f"{'-':>9}  NOT IN BASELINE"
+            )
+            continue
+        mark = "  REGRESSION" if row["regression"] else ""
+        print(
+            f"{row['name']:<20}{row['baseline_ns'] / 1000:>13.2f}"
+            f"{row['current_ns'] / 1000:>13.2f}{row['change']:>+9.1%}{mark}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scoring core microbenchmarks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Run the benchmarks")
+    run_parser.add_argument("--filter", nargs="+", choices=list(BENCHMARKS))
+    run_parser.add_argument("--repeat", type=int, default=REPEAT)
+    run_parser.add_argument(
+        "--save",
+        nargs="?",
+        type=Path,
+        const=DEFAULT_BASELINE,
+        help=f"Save the results as a baseline (default: {DEFAULT_BASELINE})",
+    )
+
+    compare_parser = subparsers.add_parser(
+        "compare", help="Compare with a baseline and fail on regressions"
+    )
+    compare_parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    compare_parser.add_argument(
+        "--current", type=Path, help="Saved results to compare instead of running"
+    )
+    compare_parser.add_argument("--filter", nargs="+", choices=list(BENCHMARKS))
+    compare_parser.add_argument("--repeat", type=int, default=REPEAT)
+    compare_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args()
+
+    # バリデーションエラーのログで計測結果が埋もれないようにする
+    logging.basicConfig(level=logging.CRITICAL)
+
+    if args.command == "run":
+        report = make_report(run_benchmarks(args.filter, args.repeat))
+        _print_results(report["benchmarks"])
+        if args.save:
+            args.save.parent.mkdir(parents=True, exist_ok=True)
+            args.save.write_text(json.dumps(report, indent=2) + "\n")
+            print(f"\nsaved to {args.save}")
+        return
+
+    baseline = load_report(args.baseline)
+    if args.current:
+        current = load_report(args.current)
+    else:
+        current = make_report(run_benchmarks(args.filter, args.repeat))
+    rows = compare_reports(baseline, current, args.threshold)
+    print(f"baseline: {baseline['meta'].get('commit')} ({args.baseline})")
+    for key, (before, after) in environment_mismatches(baseline, current).items():
+        print(f"warning: {key} differs from the baseline: {before!r} -> {after!r}")
+    _print_comparison(rows, args.threshold)
+    missing = [row["name"] for row in rows if row["missing"]]
+    if missing:
+        print(
+            f"\n{', '.join(missing)} not in the baseline; "
+            "re-record it with `python -m benchmarks.micro run --save`"
+        )
+    if missing or any(row["regression"] for row in rows):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+ツール結果の詳細度ごとのトークン量を計測する
+
+Usage:
+    python -m benchmarks.tool_tokens [--json]
+"""
+
+import argparse
+import json
+import logging
+from typing import Any, Callable, Dict, List
+
+from benchmarks.corpus import SAMPLE_HANDS
+from llmmj.tools import CalculateMahjongScoreTool
+from tools.calculation import (
+    VERBOSITY_FULL,
+    VERBOSITY_LEVELS,
+    calculate_mahjong_score,
+    get_tool_verbosity,
+    set_tool_verbosity,
+)
+
+# トークン数の概算に使う1トークンあたりの文字数
+CHARS_PER_TOKEN = 4
+
+
+def _call_adk_tool(hand: Dict[str, Any], verbosity: str) -> Dict[str, Any]:
+    set_tool_verbosity(verbosity)
+    return calculate_mahjong_score(
+        tiles=hand["tiles"],
+        win_tile=hand["win_tile"],
+        melds=hand.get("melds"),
+        dora_indicators=hand.get("dora_indicators"),
+        is_riichi=hand.get("is_riichi", False),
+        is_tsumo=hand.get("is_tsumo", False),
+        player_wind=hand.get("player_wind"),
+        round_wind=hand.get("round_wind"),
+    )
+
+
+def _call_langchain_tool(hand: Dict[str, Any], verbosity: str) -> Dict[str, Any]:
+    return CalculateMahjongScoreTool(verbosity=verbosity)._run(**hand)
+
+
+# パイプラインごとのスコア計算ツールと、1回の実行で呼ばれる最大回数
+# - loop: agents_loop の candidate_loop_agent (max_iterations=5)
+# - sequential: agents_seq の checker agent (1回)
+# - react: MahjongQuestionGenerator の AgentExecutor (max_iterations=5)
+PIPELINES: Dict[str, Dict[str, Any]] = {
+    "loop": {"tool": _call_adk_tool, "turns": 5},
+    "sequential": {"tool": _call_adk_tool, "turns": 1},
+    "react": {"tool": _call_langchain_tool, "turns": 5},
+}
+
+
+def estimate_tokens(payload: Dict[str, Any]) -> int:
+    """Roughly estimate the number of tokens of a JSON-serialized payload."""
+    return -(-len(json.dumps(payload, ensure_ascii=False)) // CHARS_PER_TOKEN)
+
+
+def measure_pipeline(
+    tool: Callable[[Dict[str, Any], str], Dict[str, Any]],
+    turns: int,
+    hands: List[Dict[str, Any]],
+) -> Dict[str, Dict[str, float]]:
+    """Measure tool response tokens for each verbosity level.
+
+    Each tool response stays in the agent context, so the response of the k-th
+    call is re-sent in the remaining (turns - k + 1) turns.
+    """
+    context_multiplier = turns * (turns + 1) / 2
+    results = {}
+    for verbosity in VERBOSITY_LEVELS:
+        tokens = [estimate_tokens(tool(hand, verbosity)) for hand in hands]
+        per_call = sum(tokens) / len(tokens)
+        results[verbosity] = {
+            "tokens_per_call": per_call,
+            "context_tokens_per_run": per_call * context_multiplier,
+        }
+
+    full = results[VERBOSITY_FULL]["tokens_per_call"]
+    for result in results.values():
+        result["savings"] = 1 - result["tokens_per_call"] / full if full else 0.0
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--json", action="store_true", help="Output results as JSON")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    default_verbosity = get_tool_verbosity()
+    try:
+        report = {
+            name: measure_pipeline(pipeline["tool"], pipeline["turns"], SAMPLE_HANDS)
+            for name, pipeline in PIPELINES.items()
+        }
+    finally:
+        set_tool_verbosity(default_verbosity)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(
+        f"{'pipeline':<12}{'verbosity':<10}{'tokens/call':>12}{'ctx/run':>10}{'savings':>9}"
+    )
+    for name, results in report.items():
+        for verbosity, result in results.items():
+            print(
+                f"{name:<12}{verbosity:<10}{result['tokens_per_call']:>12.1f}"
+                f"{result['context_tokens_per_run']:>10.1f}{result['savings']:>9.1%}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+"""
+手牌の対称性による正規化
+
+点数（飜・符・点数・役の名前・符の内訳）を変えない牌の置き換えで移り合う手牌を
+同じ代表元 (canonical_key) にまとめる。点数計算のキャッシュ・データセットの
+重複排除・評価結果の集計のキーに使う。
+
+点数を変えない置き換え（calculate_score の既定のルール: 赤ドラなし・大車輪なし）:
+
+- 数牌の色の入れ替え (萬子・筒子・索子の6通り)
+- 数牌の数字の反転 (n → 10-n)。順子・么九牌・待ちの形（両面・嵌張・辺張）は
+  反転しても変わらない。三色同順・三色同刻は3色の同じ数字を要求するため、
+  3色すべてを含む手牌は3色を同時に反転する場合だけ、2色以下の手牌は色ごとに
+  独立に反転してよい
+- 自風・場風以外の風牌どうしの入れ替え（役牌にならないため）
+
+ドラは表示牌ではなくドラそのもの（表示牌の次の牌）を置き換えてから表示牌に戻す。
+表示牌の「次」は 9→1 で巡回するため、表示牌をそのまま反転するとドラがずれる。
+
+次の場合は置き換えない:
+
+- 緑一色の可能性がある手牌（1色の 2,3,4,6,8 と發だけからなる手牌）は、
+  数牌の色の入れ替えも反転もしない（索子以外に移す・反転すると緑一色でなくなる）
+- 三元牌は入れ替えない（役の名前 "Yakuhai (haku)" などが変わるため）
+"""
+
+from itertools import permutations, product
+from typing import Dict, Iterable, Iterator, List, Tuple, TypeVar, Union
+
+from entity.codec import WINDS
+from entity.entity import Hand
+from entity.hand_key import HandKey
+
+SUITS = 3
+SUIT_SIZE = 9
+_WIND_START = 27
+_DRAGON_START = 31
+# 緑一色に使える数牌の数字（0始まり: 2,3,4,6,8）と發のインデックス
+_GREEN_NUMBERS = frozenset((1, 2, 3, 5, 7))
+_GREEN_DRAGON = 32
+
+# 34種の牌のインデックスの置き換え
+Mapping = Tuple[int, ...]
+T = TypeVar("T")
+
+
+def _next_tile(index: int) -> int:
+    """ドラ表示牌からドラを求める"""
+    if index < _WIND_START:
+        return index - index % SUIT_SIZE + (index % SUIT_SIZE + 1) % SUIT_SIZE
+    if index < _DRAGON_START:
+        return _WIND_START + (index - _WIND_START + 1) % 4
+    return _DRAGON_START + (index - _DRAGON_START + 1) % 3
+
+
+def _previous_tile(index: int) -> int:
+    """ドラからドラ表示牌を求める"""
+    if index < _WIND_START:
+        return index - index % SUIT_SIZE + (index % SUIT_SIZE - 1) % SUIT_SIZE
+    if index < _DRAGON_START:
+        return _WIND_START + (index - _WIND_START - 1) % 4
+    return _DRAGON_START + (index - _DRAGON_START - 1) % 3
+
+
+def is_green_sensitive(key: HandKey) -> bool:
+    """緑一色の可能性がある（1色の 2,3,4,6,8 と發だけからなる）手牌か"""
+    suits = set()
+    for index, count in enumerate(key.counts):
+        if not count or index == _GREEN_DRAGON:
+            continue
+        if index >= _WIND_START or index % SUIT_SIZE not in _GREEN_NUMBERS:
+            return False
+        suits.add(index // SUIT_SIZE)
+    return len(suits) <= 1
+
+
+def _suit_transforms() -> List[Tuple[Tuple[int, ...], Tuple[bool, ...], Mapping]]:
+    # (移す先の色ごとの元の色, 元の色ごとの反転, 置き換え)
+    transforms = []
+    for order in permutations(range(SUITS)):
+        sources = tuple(sorted(range(SUITS), key=order.__getitem__))
+        for mirror in product((False, True), repeat=SUITS):
+            mapping = tuple(
+                order[suit] * SUIT_SIZE
+                + (SUIT_SIZE - 1 - number if mirror[suit] else number)
+                for suit in range(SUITS)
+                for number in range(SUIT_SIZE)
+            )
+            transforms.append((sources, mirror, mapping))
+    return transforms
+
+
+# 数牌の色の入れ替え (6通り) x 色ごとの反転 (8通り)
+_SUIT_TRANSFORMS = _suit_transforms()
+_IDENTITY = tuple(range(SUITS * SUIT_SIZE))
+
+
+def _suit_mappings(key: HandKey) -> List[Tuple[Mapping, Tuple[int, ...]]]:
+    """
+    数牌の色の入れ替えと反転の組み合わせ（数牌の27種分）
+
+    Returns:
+        List[Tuple[Mapping, Tuple[int, ...]]]: 置き換えと、置き換えた後の数牌の枚数
+    """
+    if is_green_sensitive(key):
+        return [(_IDENTITY, key.counts[:_WIND_START])]
+    blocks = [
+        key.counts[suit * SUIT_SIZE : (suit + 1) * SUIT_SIZE] for suit in range(SUITS)
+    ]
+    mirrored = [block[::-1] for block in blocks]
+    # 3色とも含む手牌は3色を同時に反転する場合だけ（三色同順・三色同刻が変わらない）
+    independent = not all(any(block) for block in blocks)
+
+    mappings = []
+    for sources, mirror, mapping in _SUIT_TRANSFORMS:
+        if not independent and len(set(mirror)) > 1:
+            continue
+        counts = ()
+        for suit in sources:
+            counts += mirrored[suit] if mirror[suit] else blocks[suit]
+        mappings.append((mapping, counts))
+    return mappings
+
+
+def _free_winds(key: HandKey) -> List[int]:
+    """役牌にならない（自風でも場風でもない）風牌のインデックス"""
+    value_winds = {
+        _WIND_START + WINDS.index(wind) - 1
+        for wind in (key.player_wind, key.round_wind)
+        if wind in WINDS[1:]
+    }
+    return [
+        index for index in range(_WIND_START, _DRAGON_START) if index not in value_winds
+    ]
+
+
+def _honor_mappings(key: HandKey) -> Iterator[Mapping]:
+    """字牌の置き換え（字牌の7種分）"""
+    free = _free_winds(key)
+    for targets in permutations(free):
+        mapping = dict(zip(free, targets))
+        yield tuple(
+            mapping.get(index, index) for index in range(_WIND_START, len(key.counts))
+        )
+
+
+def _canonical_honor_mapping(key: HandKey) -> Mapping:
+    """
+    風牌を使われ方の順に並べ替える置き換え
+
+    役牌でない風牌は、手牌の枚数・鳴き・和了牌・ドラでの使われ方が同じなら
+    入れ替えても同じ手牌になるため、使われ方の降順に若い牌へ割り当てれば
+    全ての並べ替えを試さずに代表元が決まる。
+    """
+    dora = [_next_tile(index) for index in key.dora_indicators or ()]
+
+    def usage(index: int) -> Tuple:
+        melds = sorted(
+            (len(tiles), is_open)
+            for tiles, is_open in key.melds or ()
+            if index in tiles
+        )
+        return (key.counts[index], melds, key.win_tile == index, dora.count(index))
+
+    free = _free_winds(key)
+    ranked = sorted(free, key=lambda index: (usage(index), -index), reverse=True)
+    mapping: Dict[int, int] = dict(zip(ranked, free))
+    return tuple(
+        mapping.get(index, index) for index in range(_WIND_START, len(key.counts))
+    )
+
+
+def apply_mapping(key: HandKey, mapping: Mapping) -> HandKey:
+    """
+    牌のインデックスを置き換えた手牌を返す
+
+    鳴きの牌・鳴き・ドラ表示牌は並べ替えて正規化する。
+    """
+    counts = [0] * len(key.counts)
+    for index, count in enumerate(key.counts):
+        counts[mapping[index]] = count
+    melds = None
+    if key.melds is not None:
+        melds = tuple(
+            sorted(
+                (tuple(sorted(mapping[index] for index in tiles)), is_open)
+                for tiles, is_open in key.melds
+            )
+        )
+    dora = None
+    if key.dora_indicators is not None:
+        dora = tuple(
+            sorted(
+                _previous_tile(mapping[_next_tile(index)])
+                for index in key.dora_indicators
+            )
+        )
+    return HandKey(
+        tuple(counts),
+        melds,
+        mapping[key.win_tile] if key.win_tile >= 0 else key.win_tile,
+        dora,
+        key.flags,
+        key.player_wind,
+        key.round_wind,
+        key.paarenchan,
+        key.kyoutaku_number,
+        key.tsumi_number,
+    )
+
+
+def _order(key: HandKey) -> Tuple:
+    return (key.counts, key.melds or (), key.win_tile, key.dora_indicators or ())
+
+
+def _as_key(hand: Union[Hand, HandKey]) -> HandKey:
+    return hand if isinstance(hand, HandKey) else HandKey.from_hand(hand)
+
+
+def canonical_key(hand: Union[Hand, HandKey]) -> HandKey:
+    """
+    点数を変えない置き換えで移り合う手牌の代表元を返す
+
+    置き換えた手牌のうち (counts, melds, win_tile, dora_indicators) が
+    最小のものを代表元とする。
+
+    Raises:
+        ValueError: 34種の牌の表記以外の牌を含む場合
+    """
+    key = _as_key(hand)
+    honors = _canonical_honor_mapping(key)
+    mappings = _suit_mappings(key)
+    # 数牌の枚数が最小になる置き換えだけを比べる
+    least = min(counts for _, counts in mappings)
+    return min(
+        (
+            apply_mapping(key, suits + honors)
+            for suits, counts in mappings
+            if counts == least
+        ),
+        key=_order,
+    )
+
+
+def canonicalize(hand: Union[Hand, HandKey]) -> Hand:
+    """代表元の手牌を Hand で返す（牌は萬子・筒子・索子・字牌の順に並ぶ）"""
+    return canonical_key(hand).to_hand()
+
+
+def symmetric_variants(hand: Union[Hand, HandKey]) -> List[HandKey]:
+    """点数を変えない置き換えで移り合う手牌を全て返す（元の手牌も含む）"""
+    key = _as_key(hand)
+    variants = {
+        apply_mapping(key, suits + honors)
+        for suits, _ in _suit_mappings(key)
+        for honors in _honor_mappings(key)
+    }
+    return sorted(variants, key=_order)
+
+
+def dedupe(items: Iterable[T], hand_of=_as_key) -> List[T]:
+    """
+    代表元が同じ手牌を重複とみなして最初の1件だけを残す
+
+    Args:
+        items: 手牌（Hand / HandKey）またはそれを含むレコード
+        hand_of: レコードから手牌を取り出す関数
+    """
+    seen = set()
+    unique = []
+    for item in items:
+        key = canonical_key(hand_of(item))
+        if key not in seen:
+            seen.add(key)
+            unique.append(item)
+    return unique
@@ -0,0 +1,278 @@
+"""
+手牌のコンパクトなバイナリ形式
+
+Hand をJSONの1/10以下のサイズにエンコードする。APIの入力
+(Content-Type: application/x-llmmj-hand) や評価結果の保存に使う。
+
+形式 (バージョン1, リトルエンディアン):
+
+    offset  size  内容
+    0       1     バージョン
+    1       2     フラグ (FLAG_FIELDS の順にビット0から。ビット14: melds あり, ビット15: dora_indicators あり)
+    3       1     自風 (下位4ビット) / 場風 (上位4ビット)。0: None, 1-4: east/south/west/north
+    4       17    牌の枚数 (34種 x 4ビット。偶数番目が下位4ビット)
+    21      1     和了牌のインデックス (0xFF: 空文字)
+    22      3     paarenchan / kyoutaku_number / tsumi_number
+    25      1     ドラ表示牌の数 n
+    26      n     ドラ表示牌のインデックス
+    26+n    1     鳴きの数 m
+    27+n    ...   鳴きの記述子 x m
+
+鳴きの記述子の先頭バイトは 下位2ビットが種類 (0: チー, 1: ポン, 2: カン, 3: その他)、
+ビット2が is_open、上位5ビットが「その他」の場合の枚数。チー・ポン・カンは
+先頭の牌のインデックス1バイトが続き、「その他」は各牌のインデックスが続く。
+
+手牌の並び順は保存されず、デコード時は萬子・筒子・索子・字牌の順に並ぶ。
+それ以外のフィールドは完全に復元される。
+"""
+
+import base64
+import struct
+from typing import Iterator, List, Optional, Tuple
+
+from entity.entity import Hand, MeldInfo
+from exceptions import HandCodecError
+
+HAND_CODEC_VERSION = 1
+HAND_CODEC_MEDIA_TYPE = "application/x-llmmj-hand"
+
+# 34種の牌の表記（インデックスは mahjong ライブラリの34形式と同じ）
+TILES_34: List[str] = [f"{n}{suit}" for suit in "mps" for n in range(1, 10)] + [
+    f"{n}z" for n in range(1, 8)
+]
+TILE_INDEX = {tile: index for index, tile in enumerate(TILES_34)}
+
+FLAG_FIELDS = (
+    "is_riichi",
+    "is_tsumo",
+    "is_ippatsu",
+    "is_rinshan",
+    "is_chankan",
+    "is_haitei",
+    "is_houtei",
+    "is_daburu_riichi",
+    "is_nagashi_mangan",
+    "is_tenhou",
+    "is_chiihou",
+    "is_renhou",
+    "is_open_riichi",
+)
+_MELDS_PRESENT = 1 << 14
+_DORA_PRESENT = 1 << 15
+
+WINDS = (None, "east", "south", "west", "north")
+_WIND_INDEX = {wind: index for index, wind in enumerate(WINDS)}
+
+_MELD_CHI = 0
+_MELD_PON = 1
+_MELD_KAN = 2
+_MELD_RAW = 3
+
+_NO_WIN_TILE = 0xFF
+_HEADER = struct.Struct("<BHB17sB3B")
+
+
+def _tile_index(tile: str, field: str) -> int:
+    try:
+        return TILE_INDEX[tile]
+    except (KeyError, TypeError):
+        raise HandCodecError(f"Cannot encode tile {tile!r} in {field}") from None
+
+
+def _wind_index(wind: Optional[str], field: str) -> int:
+    try:
+        return _WIND_INDEX[wind]
+    except KeyError:
+        raise HandCodecError(f"Cannot encode wind {wind!r} in {field}") from None
+
+
+def _byte(value: int, field: str) -> int:
+    if not 0 <= value <= 0xFF:
+        raise HandCodecError(f"{field} must be between 0 and 255: {value}")
+    return value
+
+
+def _encode_meld(meld: MeldInfo) -> bytes:
+    indices = [_tile_index(tile, "melds") for tile in meld.tiles]
+    open_bit = 0b100 if meld.is_open else 0
+    first = indices[0] if indices else 0
+    same_suit = first < 27 and first // 9 == (first + 2) // 9
+    if len(indices) == 3 and indices == [first] * 3:
+        return bytes((_MELD_PON | open_bit, first))
+    if len(indices) == 4 and indices == [first] * 4:
+        return bytes((_MELD_KAN | open_bit, first))
+    if len(indices) == 3 and same_suit and indices == [first, first + 1, first + 2]:
+        return bytes((_MELD_CHI | open_bit, first))
+    # 並びが不正な鳴きもそのまま保存する
+    if len(indices) > 31:
+        raise HandCodecError(f"Too many tiles in meld: {len(indices)}")
+    return bytes((_MELD_RAW | open_bit | len(indices) << 3, *indices))
+
+
+def encode_hand(hand: Hand) -> bytes:
+    """
+    手牌をバイナリ形式にエンコードする
+
+    Args:
+        hand: 手牌
+
+    Returns:
+        bytes: エンコードした手牌
+
+    Raises:
+        HandCodecError: 34種の牌の表記以外の牌や、範囲外の値を含む場合
+    """
+    counts = [0] * 34
+    for tile in hand.tiles:
+        counts[_tile_index(tile, "tiles")] += 1
+    if max(counts) > 15:
+        raise HandCodecError("Cannot encode more than 15 copies of a tile")
+    packed_counts = bytes(
+        counts[i] | counts[i + 1] << 4 for i in range(0, len(counts), 2)
+    )
+
+    flags = 0
+    for bit, field in enumerate(FLAG_FIELDS):
+        if getattr(hand, field):
+            flags |= 1 << bit
+    if hand.melds is not None:
+        flags |= _MELDS_PRESENT
+    if hand.dora_indicators is not None:
+        flags |= _DORA_PRESENT
+
+    winds = _wind_index(hand.player_wind, "player_wind") | (
+        _wind_index(hand.round_wind, "round_wind") << 4
+    )
+    win_tile = _tile_index(hand.win_tile, "win_tile") if hand.win_tile else _NO_WIN_TILE
+
+    dora = [_tile_index(tile, "dora_indicators") for tile in hand.dora_indicators or []]
+    melds = hand.melds or []
+    return b"".join(
+        (
+            _HEADER.pack(
+                HAND_CODEC_VERSION,
+                flags,
+                winds,
+                packed_counts,
+                win_tile,
+                _byte(hand.paarenchan, "paarenchan"),
+                _byte(hand.kyoutaku_number, "kyoutaku_number"),
+                _byte(hand.tsumi_number, "tsumi_number"),
+            ),
+            bytes((_byte(len(dora), "dora_indicators"), *dora)),
+            bytes((_byte(len(melds), "melds"),)),
+            *(_encode_meld(meld) for meld in melds),
+        )
+    )
+
+
+def _read_tiles(data: bytes, offset: int, n: int) -> Tuple[List[str], int]:
+    end = offset + n
+    if end > len(data):
+        raise HandCodecError("Truncated hand data")
+    try:
+        return [TILES_34[index] for index in data[offset:end]], end
+    except IndexError:
+        raise HandCodecError("Invalid tile index in hand data") from None
+
+
+def _decode_one(data: bytes, offset: int) -> Tuple[Hand, int]:
+    if len(data) - offset < _HEADER.size:
+        raise HandCodecError("Truncated hand data")
+    version, flags, winds, packed_counts, win_tile, *numbers = _HEADER.unpack_from(
+        data, offset
+    )
+    if version != HAND_CODEC_VERSION:
+        raise HandCodecError(f"Unsupported hand codec version: {version}")
+    offset += _HEADER.size
+
+    tiles = []
+    for i, byte in enumerate(packed_counts):
+        tiles.extend([TILES_34[i * 2]] * (byte & 0x0F))
+        tiles.extend([TILES_34[i * 2 + 1]] * (byte >> 4))
+
+    if offset >= len(data):
+        raise HandCodecError("Truncated hand data")
+    dora, offset = _read_tiles(data, offset + 1, data[offset])
+
+    if offset >= len(data):
+        raise HandCodecError("Truncated hand data")
+    melds = []
+    n_melds = data[offset]
+    offset += 1
+    for _ in range(n_melds):
+        if offset >= len(data):
+            raise HandCodecError("Truncated hand data")
+        header = data[offset]
+        kind = header & 0b11
+        is_open = bool(header & 0b100)
+        if kind == _MELD_RAW:
+            meld_tiles, offset = _read_tiles(data, offset + 1, header >> 3)
+        else:
+            (first,), offset = _read_tiles(data, offset + 1, 1)
+            index = TILE_INDEX[first]
+            if kind == _MELD_CHI:
+                if index >= 27 or index % 9 > 6:
+                    raise HandCodecError("Invalid chi in hand data")
+                meld_tiles = TILES_34[index : index + 3]
+            else:
+                meld_tiles = [first] * (3 if kind == _MELD_PON else 4)
+        melds.append(MeldInfo.model_construct(tiles=meld_tiles, is_open=is_open))
+
+    try:
+        player_wind = WINDS[winds & 0x0F]
+        round_wind = WINDS[winds >> 4]
+    except IndexError:
+        raise HandCodecError("Invalid wind in hand data") from None
+    if win_tile != _NO_WIN_TILE and win_tile >= len(TILES_34):
+        raise HandCodecError("Invalid tile index in hand data")
+
+    # 値はすべてデコード時に型が確定しているため、バリデーションは省略する
+    hand = Hand.model_construct(
+        tiles=tiles,
+        melds=melds if flags & _MELDS_PRESENT else None,
+        win_tile="" if win_tile == _NO_WIN_TILE else TILES_34[win_tile],
+        dora_indicators=dora if flags & _DORA_PRESENT else None,
+        player_wind=player_wind,
+        round_wind=round_wind,
+        paarenchan=numbers[0],
+        kyoutaku_number=numbers[1],
+        tsumi_number=numbers[2],
+        **{field: bool(flags >> bit & 1) for bit, field in enumerate(FLAG_FIELDS)},
+    )
+    return hand, offset
+
+
+def decode_hand(data: bytes) -> Hand:
+    """
+    バイナリ形式の手牌をデコードする
+
+    Raises:
+        HandCodecError: データが不正な場合
+    """
+    hand, offset = _decode_one(data, 0)
+    if offset != len(data):
+        raise HandCodecError(f"Trailing data after hand: {len(data) - offset} bytes")
+    return hand
+
+
+def decode_hands(data: bytes) -> Iterator[Hand]:
+    """連結されたバイナリ形式の手牌を順にデコードする"""
+    offset = 0
+    while offset < len(data):
+        hand, offset = _decode_one(data, offset)
+        yield hand
+
+
+def encode_hand_text(hand: Hand) -> str:
+    """CSVなどのテキスト列に保存するため、エンコードした手牌をbase64文字列にする"""
+    return base64.b64encode(encode_hand(hand)).decode("ascii")
+
+
+def decode_hand_text(text: str) -> Hand:
+    """encode_hand_text で保存した手牌をデコードする"""
+    try:
+        data = base64.b64decode(text, validate=True)
+    except ValueError as e:
+        raise HandCodecError(f"Invalid base64 hand data: {e!s}") from e
+    return decode_hand(data)
@@ -0,0 +1,49 @@
+"""
+手牌のJSONのデコード
+
+json.loads → Hand(**data) の2段階ではなく、pydantic-core でJSONを直接
+パース・検証する。
+
+- decode_hand_json: 1件の手牌のJSON
+- decode_hand_array: 手牌のJSON配列（TypeAdapter(List[Hand]) で一括検証）
+"""
+
+from typing import List, Union
+
+from pydantic import TypeAdapter, ValidationError
+
+from entity.entity import Hand
+
+JsonInput = Union[str, bytes]
+
+# スキーマからバリデータを組み立てるコストがかかるため、モジュールで1つだけ作る
+HAND_LIST_ADAPTER: TypeAdapter[List[Hand]] = TypeAdapter(List[Hand])
+
+# JSONとしてパースできなかったことを表す pydantic のエラー種別
+_JSON_SYNTAX_ERROR_TYPES = {"json_invalid", "json_type"}
+
+
+def is_json_syntax_error(error: ValidationError) -> bool:
+    """JSONとしてパースできなかったことによる ValidationError かどうか"""
+    return any(e["type"] in _JSON_SYNTAX_ERROR_TYPES for e in error.errors())
+
+
+def decode_hand_json(data: JsonInput) -> Hand:
+    """
+    1件の手牌のJSONをデコードする
+
+    Raises:
+        ValidationError: JSONの構文エラー (is_json_syntax_error で判定できる)、
+            または手牌の形式が不正な場合
+    """
+    return Hand.model_validate_json(data)
+
+
+def decode_hand_array(data: JsonInput) -> List[Hand]:
+    """
+    手牌のJSON配列を一括でデコードする
+
+    Raises:
+        ValidationError: 1件でも不正な手牌を含む場合（loc の先頭が配列のインデックス）
+    """
+    return HAND_LIST_ADAPTER.validate_json(data)
@@ -1,6 +1,7 @@
 from typing import Any, Dict, List, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
+from pydantic_core import PydanticCustomError
 
 
 class MeldInfo(BaseModel):
@@ -74,6 +75,23 @@ class Hand(BaseModel):
 class ScoreRequest(BaseModel):
     hand: Hand
 
+    @model_validator(mode="before")
+    @classmethod
+    def _decode_binary_hand(cls, data: Any) -> Any:
+        # JSON以外のボディ (application/x-llmmj-hand) はバイナリ形式の手牌として扱う
+        if isinstance(data, bytes):
+            from entity.codec import decode_hand
+            from exceptions import HandCodecError
+
+            try:
+                return {"hand": decode_hand(data)}
+            except HandCodecError as e:
+                # ValueError だと ctx に例外がそのまま入り、JSONにできない
+                raise PydanticCustomError(
+                    "hand_codec", "Invalid hand data: {reason}", {"reason": str(e)}
+                ) from e
+        return data
+
 
 class ScoreResponse(BaseModel):
     han: Optional[int] = Field(None, description="Number of han")
@@ -0,0 +1,195 @@
+"""
+点数計算のホットパス用の軽量な手牌
+
+HandKey は正規化した手牌（34種の牌の枚数・鳴き・和了牌・ドラ・フラグ）を保持する
+イミュータブルな値型で、ハッシュ可能なためキャッシュや重複排除のキーに使える。
+calculate_score / validate_hand は Hand の代わりに HandKey を直接受け付け、
+pydantic のバリデーションを経由せずに点数計算できる。
+
+手牌の並び順は保持しないため、to_hand() の tiles は
+萬子・筒子・索子・字牌の順に並ぶ。
+"""
+
+from typing import Any, Optional, Tuple
+
+from entity.codec import FLAG_FIELDS, TILE_INDEX, TILES_34
+from entity.entity import Hand, MeldInfo
+
+# (牌のインデックス, ...), is_open
+MeldKey = Tuple[Tuple[int, ...], bool]
+
+_NO_WIN_TILE = -1
+
+
+def _index(tile: str, field: str) -> int:
+    try:
+        return TILE_INDEX[tile]
+    except (KeyError, TypeError):
+        raise ValueError(f"Invalid tile {tile!r} in {field}") from None
+
+
+class HandKey:
+    __slots__ = (
+        "counts",
+        "melds",
+        "win_tile",
+        "dora_indicators",
+        "flags",
+        "player_wind",
+        "round_wind",
+        "paarenchan",
+        "kyoutaku_number",
+        "tsumi_number",
+        "_hash",
+    )
+
+    counts: Tuple[int, ...]
+    melds: Optional[Tuple[MeldKey, ...]]
+    win_tile: int
+    dora_indicators: Optional[Tuple[int, ...]]
+    flags: int
+    player_wind: Optional[str]
+    round_wind: Optional[str]
+    paarenchan: int
+    kyoutaku_number: int
+    tsumi_number: int
+
+    def __init__(
+        self,
+        counts: Tuple[int, ...],
+        melds: Optional[Tuple[MeldKey, ...]] = None,
+        win_tile: int = _NO_WIN_TILE,
+        dora_indicators: Optional[Tuple[int, ...]] = None,
+        flags: int = 0,
+        player_wind: Optional[str] = None,
+        round_wind: Optional[str] = None,
+        paarenchan: int = 0,
+        kyoutaku_number: int = 0,
+        tsumi_number: int = 0,
+    ):
+        """
+        Args:
+            counts: 34種の牌の枚数（鳴きの牌も含む）
+            melds: 鳴きごとの (牌のインデックスのタプル, is_open)
+            win_tile: 和了牌のインデックス。-1 は和了牌なし
+            dora_indicators: ドラ表示牌のインデックス
+            flags: FLAG_FIELDS の順に並べたフラグのビット列
+        """
+        if len(counts) != 34:
+            raise ValueError(f"counts must have 34 slots: {len(counts)}")
+        values = (
+            tuple(counts),
+            melds,
+            win_tile,
+            dora_indicators,
+            flags,
+            player_wind,
+            round_wind,
+            paarenchan,
+            kyoutaku_number,
+            tsumi_number,
+        )
+        for name, value in zip(self.__slots__, values):
+            object.__setattr__(self, name, value)
+        object.__setattr__(self, "_hash", hash(values))
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def _values(self) -> Tuple[Any, ...]:
+        return tuple(getattr(self, name) for name in self.__slots__[:-1])
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, HandKey):
+            return NotImplemented
+        return self._hash == other._hash and self._values() == other._values()
+
+    def __repr__(self) -> str:
+        fields = ", ".join(
+            f"{name}={value!r}" for name, value in zip(self.__slots__, self._values())
+        )
+        return f"HandKey({fields})"
+
+    def __reduce__(self):
+        # ワーカープロセスに渡すため pickle に対応する
+        return (HandKey, self._values())
+
+    def flag(self, field: str) -> bool:
+        """FLAG_FIELDS のフラグの値を返す"""
+        return bool(self.flags >> FLAG_FIELDS.index(field) & 1)
+
+    @property
+    def tile_count(self) -> int:
+        return sum(self.counts)
+
+    @classmethod
+    def from_hand(cls, hand: Hand) -> "HandKey":
+        """
+        Hand から HandKey を生成する
+
+        Raises:
+            ValueError: 34種の牌の表記以外の牌を含む場合
+        """
+        counts = [0] * 34
+        for tile in hand.tiles:
+            counts[_index(tile, "tiles")] += 1
+        melds = None
+        if hand.melds is not None:
+            melds = tuple(
+                (tuple(_index(tile, "melds") for tile in meld.tiles), meld.is_open)
+                for meld in hand.melds
+            )
+        dora = None
+        if hand.dora_indicators is not None:
+            dora = tuple(
+                _index(tile, "dora_indicators") for tile in hand.dora_indicators
+            )
+        flags = 0
+        for bit, field in enumerate(FLAG_FIELDS):
+            if getattr(hand, field):
+                flags |= 1 << bit
+        return cls(
+            tuple(counts),
+            melds,
+            _index(hand.win_tile, "win_tile") if hand.win_tile else _NO_WIN_TILE,
+            dora,
+            flags,
+            hand.player_wind,
+            hand.round_wind,
+            hand.paarenchan,
+            hand.kyoutaku_number,
+            hand.tsumi_number,
+        )
+
+    def to_hand(self) -> Hand:
+        """HandKey から Hand を生成する（バリデーションは省略する）"""
+        melds = None
+        if self.melds is not None:
+            melds = [
+                MeldInfo.model_construct(
+                    tiles=[TILES_34[i] for i in tiles], is_open=is_open
+                )
+                for tiles, is_open in self.melds
+            ]
+        return Hand.model_construct(
+            tiles=[TILES_34[i] for i, n in enumerate(self.counts) for _ in range(n)],
+            melds=melds,
+            win_tile=TILES_34[self.win_tile] if self.win_tile >= 0 else "",
+            dora_indicators=(
+                [TILES_34[i] for i in self.dora_indicators]
+                if self.dora_indicators is not None
+                else None
+            ),
+            player_wind=self.player_wind,
+            round_wind=self.round_wind,
+            paarenchan=self.paarenchan,
+            kyoutaku_number=self.kyoutaku_number,
+            tsumi_number=self.tsumi_number,
+            **{field: self.flag(field) for field in FLAG_FIELDS},
+        )
@@ -1,29 +1,39 @@
 import asyncio
-import json
 import logging
 import sys
 import uuid
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, Tuple, Union
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 import pandas as pd
+from pydantic import ValidationError
 
+from entity.decoding import decode_hand_json, is_json_syntax_error
 from entity.entity import Hand
 from evaluator.libs import (
+    check_target_feasibility,
     create_error_result,
     hand_2_result,
     process_hand_generation,
     result_to_df,
 )
 from evaluator.result import EvalResult
+from evaluator.stream import aenumerate, amap_as_completed
 from exceptions import AgentSetupError, JSONParseError
-from runner.runner import get_loop_runner, get_sequential_runner, run
+from runner.runner import (
+    get_loop_runner,
+    get_sequential_runner,
+    get_speculative_runner,
+    run,
+)
 
 logger = logging.getLogger(__name__)
 
+Dataset = Union[Iterable[Dict[str, Any]], AsyncIterable[Dict[str, Any]]]
+
 
 class MahjongMultiAgentsEvaluator:
     def __init__(self, runner_type: str = "sequential"):
@@ -51,6 +61,8 @@ class MahjongMultiAgentsEvaluator:
                 # expected_han=data["answer"]["han"],
                 # expected_fu=data["answer"]["fu"],
             )
+        elif self.runner_type == "speculative":
+            runner = await get_speculative_runner(app_name, user_id, session_id)
         else:
             raise AgentSetupError(f"Unknown runner_type: {self.runner_type}")
 
@@ -58,60 +70,82 @@ class MahjongMultiAgentsEvaluator:
             runner=runner, user_id=user_id, session_id=session_id, query=query
         )
 
-        # Parse the JSON result
+        # Parse and validate the JSON result in one pass
+        try:
+            return decode_hand_json(result)
+        except ValidationError as e:
+            if is_json_syntax_error(e):
+                raise JSONParseError(
+                    f"Error parsing JSON: {e!s}, result: {result}"
+                ) from e
+            raise
+
+    async def evaluate_async(self, d: Dict[str, Any]) -> EvalResult:
+        """データセットの1件を評価する"""
+        # 達成できない目標にはエージェントを呼び出さない
+        infeasible = check_target_feasibility(d, self.model_name)
+        if infeasible is not None:
+            return infeasible
+
+        user_id = str(uuid.uuid4())
+        session_id = str(uuid.uuid4())
         try:
-            hand_data = json.loads(result)
+            hand = await self._generate_hand_from_query(
+                d["query"], self.app_name, user_id, session_id, d
+            )
+        except AgentSetupError as e:
+            logger.error(f"Error setting up agent: {e!s}")
+            raise
+        except JSONParseError as e:
+            return create_error_result(
+                model_name=self.model_name,
+                error=e,
+                error_type=JSONParseError.__name__,
+                data=d,
+            )
         except Exception as e:
-            raise JSONParseError(f"Error parsing JSON: {e!s}, result: {result}") from e
-
-        return Hand(**hand_data)
-
-    async def evals_async(self, dataset: List[Dict[str, Any]]) -> pd.DataFrame:
-        """Asynchronous evaluation of dataset."""
-        eval_results: List[EvalResult] = []
-
-        for d in dataset:
-            user_id = str(uuid.uuid4())
-            session_id = str(uuid.uuid4())
-            try:
-                hand = await self._generate_hand_from_query(
-                    d["query"], self.app_name, user_id, session_id, d
-                )
-            except AgentSetupError as e:
-                logger.error(f"Error setting up agent: {e!s}")
-                raise
-            except JSONParseError as e:
-                eval_result = create_error_result(
-                    model_name=self.model_name,
-                    error=e,
-                    error_type=JSONParseError.__name__,
-                    data=d,
-                )
-                eval_results.append(eval_result)
-                continue
-            except Exception as e:
-                eval_result = create_error_result(
-                    model_name=self.model_name,
-                    error=e,
-                    error_type="UnknownError",
-                    data=d,
-                )
-                eval_results.append(eval_result)
-                continue
-
-            # Process and validate the hand
-            hand_or_error = process_hand_generation(hand, d, self.model_name)
-            if isinstance(hand_or_error, EvalResult):
-                eval_results.append(hand_or_error)
-                continue
-
-            # Calculate score and create result
-            eval_result = hand_2_result(hand_or_error, d, self.model_name)
-            eval_results.append(eval_result)
+            return create_error_result(
+                model_name=self.model_name,
+                error=e,
+                error_type="UnknownError",
+                data=d,
+            )
 
+        # Process and validate the hand
+        hand_or_error = process_hand_generation(hand, d, self.model_name)
+        if isinstance(hand_or_error, EvalResult):
+            return hand_or_error
+
+        # Calculate score and create result
+        return hand_2_result(hand_or_error, d, self.model_name)
+
+    async def _evaluate_item(self, item: Tuple[int, Dict[str, Any]]) -> EvalResult:
+        index, d = item
+        result = await self.evaluate_async(d)
+        result.item_index = index
+        return result
+
+    def aiter_evals(
+        self, dataset: Dataset, concurrency: int = 1
+    ) -> AsyncIterator[EvalResult]:
+        """
+        データセットを1件ずつ読み込み、最大 concurrency 件を同時に評価して完了した順に返す
+
+        dataset にはリスト、JSONLから読み込むイテレータ、非同期イテレータを渡せる。
+        concurrency=1 の場合はデータセットの順に評価する。完了した順では入力の順と
+        異なるため、各評価結果の item_index にデータセットでの位置を入れる。
+        """
+        return amap_as_completed(self._evaluate_item, aenumerate(dataset), concurrency)
+
+    async def evals_async(self, dataset: Dataset, concurrency: int = 1) -> pd.DataFrame:
+        """Asynchronous evaluation of dataset (results are in dataset order)."""
+        eval_results = [
+            result async for result in self.aiter_evals(dataset, concurrency)
+        ]
+        eval_results.sort(key=lambda result: result.item_index)
         return result_to_df(eval_results)
 
-    def evals(self, dataset: List[Dict[str, Any]]) -> pd.DataFrame:
+    def evals(self, dataset: Dataset) -> pd.DataFrame:
         """Synchronous wrapper for evals_async."""
         try:
             # # Check if we're in an async context (like Jupyter)
@@ -1,10 +1,11 @@
 import logging
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, Iterator, List
 
 import pandas as pd
 from langchain_core.language_models.chat_models import BaseChatModel
 
 from evaluator.libs import (
+    check_target_feasibility,
     create_error_result,
     hand_2_result,
     process_hand_generation,
@@ -25,43 +26,52 @@ class MahjongEvaluator:
         self.generator = generator
         self.model_name = generator.model_name
 
-    def evals(self, dataset: List[Dict[str, Any]]) -> pd.DataFrame:
-        eval_results: List[EvalResult] = []
-        for d in dataset:
-            try:
-                result = self.generator.generate_question(d["query"])
-            except AgentSetupError:
-                raise
-            except JSONParseError as e:
-                eval_result = create_error_result(
-                    model_name=self.model_name,
-                    error=e,
-                    error_type=JSONParseError.__name__,
-                    data=d,
-                )
-                eval_results.append(eval_result)
-                continue
-            except Exception as e:
-                eval_result = create_error_result(
-                    model_name=self.model_name,
-                    error=e,
-                    error_type="UnknownError",
-                    data=d,
-                )
-                eval_results.append(eval_result)
-                continue
+    def evaluate(self, d: Dict[str, Any]) -> EvalResult:
+        """データセットの1件を評価する"""
+        # 達成できない目標にはLLMを呼び出さない
+        infeasible = check_target_feasibility(d, self.model_name)
+        if infeasible is not None:
+            return infeasible
+
+        try:
+            # speculative > 1 の生成器は目標に一致する候補を優先して返す
+            result = self.generator.generate_question(
+                d["query"], target=(d["answer"]["han"], d["answer"]["fu"])
+            )
+        except AgentSetupError:
+            raise
+        except JSONParseError as e:
+            return create_error_result(
+                model_name=self.model_name,
+                error=e,
+                error_type=JSONParseError.__name__,
+                data=d,
+            )
+        except Exception as e:
+            return create_error_result(
+                model_name=self.model_name,
+                error=e,
+                error_type="UnknownError",
+                data=d,
+            )
+
+        # Process and validate the hand
+        hand_or_error = process_hand_generation(result, d, self.model_name)
+        if isinstance(hand_or_error, EvalResult):
+            return hand_or_error
 
-            # Process and validate the hand
-            hand_or_error = process_hand_generation(result, d, self.model_name)
-            if isinstance(hand_or_error, EvalResult):
-                eval_results.append(hand_or_error)
-                continue
+        # Calculate score and create result
+        return hand_2_result(hand_or_error, d, self.model_name)
 
-            # Calculate score and create result
-            eval_result = hand_2_result(hand_or_error, d, self.model_name)
-            eval_results.append(eval_result)
+    def iter_evals(self, dataset: Iterable[Dict[str, Any]]) -> Iterator[EvalResult]:
+        """データセットを1件ずつ読み込んで評価し、評価結果を1件ずつ返す"""
+        for index, d in enumerate(dataset):
+            result = self.evaluate(d)
+            result.item_index = index
+            yield result
 
-        return result_to_df(eval_results)
+    def evals(self, dataset: Iterable[Dict[str, Any]]) -> pd.DataFrame:
+        return result_to_df(list(self.iter_evals(dataset)))
 
 
 class MultiModelEvaluator:
@@ -70,17 +80,43 @@ class MultiModelEvaluator:
         models: List[BaseChatModel],
         query_template: str = generate_question_prompt_template,
         use_tools: bool = False,
+        speculative: int = 1,
     ):
         self.models = models
         self.query_template = query_template
         self.use_tools = use_tools
+        self.speculative = speculative
 
-    def evals(self, dataset: List[Dict[str, Any]]) -> pd.DataFrame:
-        eval_results: List[pd.DataFrame] = []
-        for model in self.models:
-            generator = MahjongQuestionGenerator(
-                model, query_template=self.query_template, use_tools=self.use_tools
+    def _evaluators(self) -> List[MahjongEvaluator]:
+        return [
+            MahjongEvaluator(
+                MahjongQuestionGenerator(
+                    model,
+                    query_template=self.query_template,
+                    use_tools=self.use_tools,
+                    speculative=self.speculative,
+                )
             )
-            evaluator = MahjongEvaluator(generator)
+            for model in self.models
+        ]
+
+    def iter_evals(self, dataset: Iterable[Dict[str, Any]]) -> Iterator[EvalResult]:
+        """
+        データセットを1件ずつ読み込み、すべてのモデルで評価して評価結果を1件ずつ返す
+
+        データセットは1回だけ読むため、JSONLから読み込むイテレータも渡せる。
+        """
+        evaluators = self._evaluators()
+        for index, d in enumerate(dataset):
+            for evaluator in evaluators:
+                result = evaluator.evaluate(d)
+                result.item_index = index
+                yield result
+
+    def evals(self, dataset: Iterable[Dict[str, Any]]) -> pd.DataFrame:
+        # モデルごとにデータセットを読むため、イテレータはリストにする
+        dataset = list(dataset)
+        eval_results: List[pd.DataFrame] = []
+        for evaluator in self._evaluators():
             eval_results.append(evaluator.evals(dataset))
         return pd.concat(eval_results).reset_index(drop=True)
@@ -1,20 +1,38 @@
+import ast
 import logging
-from typing import Any, Dict, List, Optional, Union
-
-import pandas as pd
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Union
 
+from entity.canonical import canonicalize
+from entity.codec import decode_hand_text, encode_hand_text
 from entity.entity import Hand
 from evaluator.result import EvalResult
-from exceptions import HandValidationError, ScoreCalculationError
-from llmmj.llmmj import calculate_score, validate_hand
+from exceptions import (
+    HandCodecError,
+    HandValidationError,
+    InfeasibleTargetError,
+    ScoreCalculationError,
+)
+from llmmj.feasibility import is_feasible
+from llmmj.llmmj import calculate_score_cached, validate_hand
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 logger = logging.getLogger(__name__)
 
+# result_to_df(compact_hand=True) で手牌をバイナリ形式 (base64) で保存する列
+HAND_CODEC_COLUMN = "hand_codec"
+# 対称性で正規化した手牌 (entity.canonical) をバイナリ形式 (base64) で保存する列。
+# 色の入れ替えなどで移り合う手牌は同じ値になるため、集計のキーに使う
+CANONICAL_HAND_COLUMN = "canonical_hand"
+# 手牌をJSONで保存する列 (evaluator.stream の JournalSink / ParquetSink)
+HAND_JSON_COLUMN = "hand_json"
+
 
 def hand_2_result(hand: Hand, data: Dict[str, Any], model_name: str) -> EvalResult:
     # 点数計算
     try:
-        result = calculate_score(hand)
+        result = calculate_score_cached(hand)
         if result.fu == data["answer"]["fu"] and result.han == data["answer"]["han"]:
             return EvalResult(
                 model=model_name,
@@ -93,6 +111,28 @@ def create_error_result(
     return result
 
 
+def check_target_feasibility(
+    data: Dict[str, Any], model_name: str
+) -> Optional[EvalResult]:
+    """Check that the target (han, fu) of a dataset item can be reached at all.
+
+    Items of a synthetic dataset also constrain closed/open and ron/tsumo
+    through their "conditions". Returns an error EvalResult for impossible
+    targets so that no LLM call is spent on them, or None otherwise.
+    """
+    han = data["answer"]["han"]
+    fu = data["answer"]["fu"]
+    conditions = data.get("conditions") or {}
+    if is_feasible(han, fu, conditions.get("is_open"), conditions.get("is_tsumo")):
+        return None
+    return create_error_result(
+        model_name=model_name,
+        error=InfeasibleTargetError(f"{han} han {fu} fu cannot be reached"),
+        error_type=InfeasibleTargetError.__name__,
+        data=data,
+    )
+
+
 def process_hand_generation(
     result: Union[Dict[str, Any], Hand],
     data: Dict[str, Any],
@@ -139,13 +179,47 @@ def process_hand_generation(
         )
 
 
-def result_to_df(eval_results: List[EvalResult]) -> pd.DataFrame:
+def canonical_hand_text(hand: Hand) -> Optional[str]:
+    """Encode the canonical representative of a hand, or None if there is none."""
+    if not hand.tiles:
+        return None
+    try:
+        return encode_hand_text(canonicalize(hand))
+    except (HandCodecError, ValueError):
+        return None
+
+
+def result_to_df(
+    eval_results: List[EvalResult],
+    compact_hand: bool = False,
+    canonical: bool = False,
+) -> "pd.DataFrame":
+    """Convert evaluation results to a DataFrame.
+
+    By default the hand is expanded into hand_* columns. With compact_hand=True
+    it is stored in a single HAND_CODEC_COLUMN as base64 of the binary hand
+    codec; hands the codec cannot represent fall back to hand_* columns.
+    With canonical=True, CANONICAL_HAND_COLUMN groups hands that only differ by
+    a score-preserving symmetry (see entity.canonical). Canonicalizing tries
+    every symmetry of each hand, so it is off unless results are aggregated.
+    """
+    # hand_2_result などの採点だけを使う場合に pandas を読み込まないようにする
+    import pandas as pd
+
     records = []
     for result in eval_results:
         record = result.model_dump(exclude={"hand"})
-        hand_dict = result.hand.model_dump()
-        for key, value in hand_dict.items():
-            record[f"hand_{key}"] = value
+        if canonical:
+            record[CANONICAL_HAND_COLUMN] = canonical_hand_text(result.hand)
+        if compact_hand:
+            try:
+                record[HAND_CODEC_COLUMN] = encode_hand_text(result.hand)
+            except HandCodecError:
+                pass
+        if HAND_CODEC_COLUMN not in record:
+            hand_dict = result.hand.model_dump()
+            for key, value in hand_dict.items():
+                record[f"hand_{key}"] = value
 
         # Convert boolean values to integers
         for key, value in record.items():
@@ -155,3 +229,32 @@ def result_to_df(eval_results: List[EvalResult]) -> pd.DataFrame:
         records.append(record)
 
     return pd.DataFrame(records)
+
+
+def hand_from_record(record: Dict[str, Any]) -> Hand:
+    """Rebuild a Hand from the hand_* columns written by result_to_df.
+
+    Works for records read back from CSV, where list fields are stored as
+    their Python repr and booleans as 0/1, for records written with
+    compact_hand=True and for records with a HAND_JSON_COLUMN.
+    """
+    import pandas as pd
+
+    hand_json = record.get(HAND_JSON_COLUMN)
+    if isinstance(hand_json, str):
+        return Hand.model_validate_json(hand_json)
+    encoded = record.get(HAND_CODEC_COLUMN)
+    if isinstance(encoded, str):
+        return decode_hand_text(encoded)
+
+    hand_data = {}
+    for key, value in record.items():
+        if not key.startswith("hand_") or key in (HAND_CODEC_COLUMN, HAND_JSON_COLUMN):
+            continue
+        if not isinstance(value, (list, dict)) and pd.isna(value):
+            continue
+        field = key[len("hand_") :]
+        if field in ("tiles", "melds", "dora_indicators") and isinstance(value, str):
+            value = ast.literal_eval(value)
+        hand_data[field] = value
+    return Hand(**hand_data)
@@ -0,0 +1,261 @@
+"""
+保存済みの評価結果の再採点
+
+点数計算のコード (calculate_score / validate_hand) や mahjong ライブラリを
+更新したときに、LLMを呼び出さずに過去の評価結果を採点し直す。
+評価結果のCSV (result_to_df の出力) の hand_* 列（または hand_codec 列）から
+Hand を復元し、process_hand_generation → hand_2_result を並列に実行して、
+新しい評価結果と判定が変わった行の差分を出力する。
+
+手牌の生成前に失敗した行（JSONのパースエラーなど）は手牌がないため、
+元の行をそのまま残す。
+
+Usage:
+    python -m evaluator.rescore                          # dist/**/*.csv
+    python -m evaluator.rescore dist/zeroshot/*.csv --output-dir dist/rescored
+"""
+
+import argparse
+import glob
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
+
+import pandas as pd
+
+from evaluator.libs import (
+    HAND_CODEC_COLUMN,
+    hand_2_result,
+    hand_from_record,
+    process_hand_generation,
+    result_to_df,
+)
+from evaluator.result import EvalResult
+from llmmj.workers import forkserver_executor, map_with_metrics
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).parent.parent
+DEFAULT_PATTERN = str(PROJECT_ROOT / "dist" / "**" / "*.csv")
+DEFAULT_OUTPUT_DIR = PROJECT_ROOT / "dist" / "rescored"
+
+# 判定として比較する列
+VERDICT_COLUMNS = (
+    "correct",
+    "is_error",
+    "error_type",
+    "got_answer_han",
+    "got_answer_fu",
+)
+# 1回のタスクで再採点する行数
+CHUNK_SIZE = 256
+
+
+class RescoreResult(NamedTuple):
+    """1ファイル分の再採点結果"""
+
+    source: str
+    results: pd.DataFrame
+    diff: pd.DataFrame
+    rescored: int
+
+
+def _clean(value: Any) -> Any:
+    """CSVの欠損値 (NaN) を None に、整数値の float を int にする"""
+    if isinstance(value, float):
+        if pd.isna(value):
+            return None
+        if value.is_integer():
+            return int(value)
+    return value
+
+
+def rescore_record(record: Dict[str, Any]) -> Optional[EvalResult]:
+    """
+    1行の評価結果を採点し直す
+
+    Returns:
+        Optional[EvalResult]: 新しい評価結果。手牌がなく再採点できない場合はNone
+    """
+    try:
+        hand = hand_from_record(record)
+    except Exception as e:
+        logger.warning(f"Cannot rebuild hand: {e!s}")
+        return None
+    if not hand.tiles:
+        return None
+
+    model_name = record.get("model") or "unknown"
+    data = {
+        "answer": {
+            "han": _clean(record["expected_han"]),
+            "fu": _clean(record["expected_fu"]),
+        }
+    }
+    hand_or_error = process_hand_generation(hand, data, model_name)
+    if isinstance(hand_or_error, EvalResult):
+        return hand_or_error
+    return hand_2_result(hand_or_error, data, model_name)
+
+
+def rescore_records(records: List[Dict[str, Any]]) -> List[Optional[EvalResult]]:
+    """複数行を採点し直す"""
+    return [rescore_record(record) for record in records]
+
+
+def _rescore_all(
+    records: List[Dict[str, Any]], workers: int
+) -> List[Optional[EvalResult]]:
+    chunks = [records[i : i + CHUNK_SIZE] for i in range(0, len(records), CHUNK_SIZE)]
+    if workers <= 1 or len(chunks) <= 1:
+        return [result for chunk in chunks for result in rescore_records(chunk)]
+
+    with forkserver_executor(workers, ["evaluator.rescore"]) as executor:
+        return [
+            result
+            for chunk_results in map_with_metrics(executor, rescore_records, chunks)
+            for result in chunk_results
+        ]
+
+
+def _verdict(record: Dict[str, Any]) -> tuple:
+    return tuple(_clean(record.get(column)) for column in VERDICT_COLUMNS)
+
+
+def diff_verdicts(
+    source: str, old: List[Dict[str, Any]], new: List[Dict[str, Any]]
+) -> pd.DataFrame:
+    """判定 (VERDICT_COLUMNS) が変わった行の old_* / new_* を並べる"""
+    rows = []
+    for index, (before, after) in enumerate(zip(old, new)):
+        if _verdict(before) == _verdict(after):
+            continue
+        row = {
+            "source": source,
+            "row": index,
+            "model": before.get("model"),
+            "expected_han": _clean(before.get("expected_han")),
+            "expected_fu": _clean(before.get("expected_fu")),
+        }
+        for column, old_value, new_value in zip(
+            VERDICT_COLUMNS, _verdict(before), _verdict(after)
+        ):
+            row[f"old_{column}"] = old_value
+            row[f"new_{column}"] = new_value
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def rescore_frames(
+    frames: Dict[str, pd.DataFrame], workers: int = 1
+) -> List[RescoreResult]:
+    """
+    評価結果のDataFrameをまとめて採点し直す
+
+    全ファイルの行をまとめてワーカープロセスに分配する。
+
+    Args:
+        frames: ファイル名 → result_to_df の出力（CSVから読み込んだもの）
+        workers: ワーカープロセス数。1の場合は現在のプロセスで実行する
+    """
+    records = {source: df.to_dict("records") for source, df in frames.items()}
+    flat = [record for source_records in records.values() for record in source_records]
+    rescored = iter(_rescore_all(flat, workers))
+
+    outputs = []
+    for source, old in records.items():
+        results = [next(rescored) for _ in old]
+        compact_hand = HAND_CODEC_COLUMN in frames[source].columns
+        new_records = iter(
+            result_to_df(
+                [result for result in results if result is not None],
+                compact_hand,
+                canonical=True,
+            ).to_dict("records")
+        )
+        new = [
+            record if result is None else next(new_records)
+            for record, result in zip(old, results)
+        ]
+        outputs.append(
+            RescoreResult(
+                source=source,
+                results=pd.DataFrame(new, columns=_columns(frames[source], new)),
+                diff=diff_verdicts(source, old, new),
+                rescored=sum(result is not None for result in results),
+            )
+        )
+    return outputs
+
+
+def _columns(df: pd.DataFrame, records: List[Dict[str, Any]]) -> List[str]:
+    # 元のファイルの列の順番を保ち、新しく増えた列は後ろに付ける
+    columns = list(df.columns)
+    for record in records:
+        columns.extend(key for key in record if key not in columns)
+    return columns
+
+
+def rescore_files(
+    paths: Sequence[str], output_dir: Path, workers: int = 1
+) -> pd.DataFrame:
+    """
+    評価結果のCSVを採点し直して output_dir に書き出す
+
+    Returns:
+        pd.DataFrame: 全ファイルの判定の差分（output_dir/rescore-diff-*.csv にも保存する）
+    """
+    frames = {path: pd.read_csv(path) for path in paths}
+    outputs = rescore_frames(frames, workers)
+
+    # 入力のディレクトリ構成 (dist/zeroshot/... など) を output_dir の下に再現する
+    root = Path(os.path.commonpath([Path(path).resolve().parent for path in paths]))
+    for output in outputs:
+        path = output_dir / Path(output.source).resolve().relative_to(root)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        output.results.to_csv(path, index=False)
+        logger.info(
+            f"{output.source}: rescored {output.rescored}/{len(output.results)} rows, "
+            f"{len(output.diff)} verdicts changed"
+        )
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    diff = pd.concat([output.diff for output in outputs], ignore_index=True)
+    diff_path = output_dir / f"rescore-diff-{datetime.now():%Y%m%d%H%M%S}.csv"
+    diff.to_csv(diff_path, index=False)
+    logger.info(f"{len(diff)} verdicts changed in total, diff saved to {diff_path}")
+    return diff
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Re-grade stored evaluation results without calling LLMs"
+    )
+    parser.add_argument(
+        "paths", nargs="*", help=f"Result CSV files (default: {DEFAULT_PATTERN})"
+    )
+    parser.add_argument("--output-dir", type=Path, default=DEFAULT_OUTPUT_DIR)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    # 不正な手牌のエラーログで出力が埋もれないようにする
+    logging.getLogger("evaluator.libs").setLevel(logging.CRITICAL)
+    logging.getLogger("llmmj").setLevel(logging.CRITICAL)
+
+    output_dir = args.output_dir.resolve()
+    paths = args.paths or sorted(glob.glob(DEFAULT_PATTERN, recursive=True))
+    # 出力先のファイルを再び入力にしない
+    paths = [path for path in paths if output_dir not in Path(path).resolve().parents]
+    if not paths:
+        parser.error("no result CSV files found")
+
+    diff = rescore_files(paths, output_dir, args.workers)
+    if not diff.empty:
+        print(diff.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
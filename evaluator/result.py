@@ -16,3 +16,6 @@ class EvalResult(BaseModel):
     got_answer_fu: Optional[int] = Field(None, description="得られた答えの符数")
     expected_han: int = Field(..., description="期待する答えの翻数")
     expected_fu: int = Field(..., description="期待する答えの符数")
+    item_index: Optional[int] = Field(
+        None, description="データセットでの位置（完了した順に返す評価結果の識別用）"
+    )
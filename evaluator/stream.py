@@ -0,0 +1,302 @@
+"""
+評価結果のストリーミング
+
+データセットを1件ずつ読み込んで評価し、評価結果を完了した順にシンクへ書き出す。
+評価結果をすべてメモリに保持しないため、件数の多い合成データセットでも
+一定のメモリで評価でき、途中経過も確認できる。
+
+- iter_dataset (generator.synthetic) でJSONLを1行ずつ読み込む
+- MahjongEvaluator.iter_evals / MahjongMultiAgentsEvaluator.aiter_evals で
+  評価結果を1件ずつ受け取る
+- write_results / awrite_results で評価結果をシンクに書き出す
+
+シンク:
+
+- JournalSink: 評価結果を1行1件のJSONLに追記する（read_journal で読み込める）
+- ParquetSink: 評価結果を batch_size 件ごとにParquetの行グループとして書き出す
+- SummarySink: 件数・正解率・エラーの種類を集計し、every 件ごとにログに出力する
+
+Usage:
+    results = evaluator.iter_evals(iter_dataset("dataset/synthetic.jsonl"))
+    write_results(results, [JournalSink("dist/journal.jsonl"), SummarySink()])
+"""
+
+import asyncio
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import Counter
+from pathlib import Path
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Sequence,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+from evaluator.libs import CANONICAL_HAND_COLUMN, HAND_JSON_COLUMN, canonical_hand_text
+from evaluator.result import EvalResult
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# ParquetSink が1つの行グループにまとめる件数
+PARQUET_BATCH_SIZE = 10_000
+# SummarySink がログに出力する間隔（件数）
+SUMMARY_EVERY = 1000
+
+
+async def aiter_items(items: Union[Iterable[T], AsyncIterable[T]]) -> AsyncIterator[T]:
+    """イテラブルと非同期イテラブルのどちらも非同期イテレータとして読む"""
+    if isinstance(items, AsyncIterable):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+
+async def aenumerate(
+    items: Union[Iterable[T], AsyncIterable[T]],
+) -> AsyncIterator[Tuple[int, T]]:
+    """enumerate の非同期イテラブル版"""
+    index = 0
+    async for item in aiter_items(items):
+        yield index, item
+        index += 1
+
+
+async def amap_as_completed(
+    fn: Callable[[T], Awaitable[R]],
+    items: Union[Iterable[T], AsyncIterable[T]],
+    concurrency: int = 1,
+) -> AsyncIterator[R]:
+    """
+    items を1件ずつ読み込み、最大 concurrency 件を同時に fn で処理して、完了した順に返す
+
+    次の item は処理中の件数が concurrency を下回ったときに読み込むため、
+    メモリに保持するのは concurrency 件まで。concurrency=1 の場合は入力の順に返す。
+    fn が例外を送出した場合は処理中のタスクをキャンセルして例外を送出する。
+    """
+    if concurrency < 1:
+        raise ValueError(f"concurrency must be at least 1: {concurrency}")
+    iterator = aiter_items(items).__aiter__()
+    pending: set = set()
+    exhausted = False
+    try:
+        while True:
+            while not exhausted and len(pending) < concurrency:
+                try:
+                    item = await iterator.__anext__()
+                except StopAsyncIteration:
+                    exhausted = True
+                    break
+                pending.add(asyncio.ensure_future(fn(item)))
+            if not pending:
+                return
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+class ResultSink(ABC):
+    """評価結果の書き出し先"""
+
+    @abstractmethod
+    def write(self, result: EvalResult) -> None:
+        """評価結果を1件書き出す"""
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def result_record(result: EvalResult) -> Dict[str, Any]:
+    """
+    評価結果を1行分の辞書にする (ParquetSink)
+
+    手牌は HAND_JSON_COLUMN にJSONで保存する（hand_from_record で復元できる）。
+    """
+    record = result.model_dump(exclude={"hand"})
+    record[CANONICAL_HAND_COLUMN] = canonical_hand_text(result.hand)
+    record[HAND_JSON_COLUMN] = result.hand.model_dump_json()
+    return record
+
+
+class JournalSink(ResultSink):
+    """評価結果を1行1件のJSONLに追記する。1件ごとに flush するため中断しても残る"""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def write(self, result: EvalResult) -> None:
+        self._file.write(result.model_dump_json() + "\n")
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def read_journal(path: Union[str, Path]) -> Iterator[EvalResult]:
+    """JournalSink が書き出した評価結果を1件ずつ読み込む"""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield EvalResult.model_validate_json(line)
+
+
+class ParquetSink(ResultSink):
+    """
+    評価結果を batch_size 件ごとにParquetの行グループとして書き出す
+
+    列は result_record の形式で固定する。pyarrow が必要。
+    """
+
+    def __init__(self, path: Union[str, Path], batch_size: int = PARQUET_BATCH_SIZE):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        self._pa = pa
+        self._schema = pa.schema(
+            [
+                ("model", pa.string()),
+                ("correct", pa.bool_()),
+                ("is_error", pa.bool_()),
+                ("error_type", pa.string()),
+                ("reason", pa.string()),
+                ("got_answer_han", pa.int64()),
+                ("got_answer_fu", pa.int64()),
+                ("expected_han", pa.int64()),
+                ("expected_fu", pa.int64()),
+                ("item_index", pa.int64()),
+                (CANONICAL_HAND_COLUMN, pa.string()),
+                (HAND_JSON_COLUMN, pa.string()),
+            ]
+        )
+        self._writer = pq.ParquetWriter(self.path, self._schema)
+        self._rows: List[Dict[str, Any]] = []
+
+    def write(self, result: EvalResult) -> None:
+        self._rows.append(result_record(result))
+        if len(self._rows) >= self.batch_size:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self._rows:
+            table = self._pa.Table.from_pylist(self._rows, schema=self._schema)
+            self._writer.write_table(table)
+            self._rows = []
+
+    def close(self) -> None:
+        self._flush()
+        self._writer.close()
+
+
+class SummarySink(ResultSink):
+    """件数・正解率・エラーの種類を集計し、every 件ごとと close 時にログに出力する"""
+
+    def __init__(self, every: int = SUMMARY_EVERY):
+        self.every = every
+        self.total = 0
+        self.correct = 0
+        self.errors: Counter = Counter()
+        self.models: Counter = Counter()
+        self._start = time.perf_counter()
+
+    def write(self, result: EvalResult) -> None:
+        self.total += 1
+        self.correct += result.correct
+        self.models[result.model] += 1
+        if result.is_error:
+            self.errors[result.error_type or "UnknownError"] += 1
+        if self.every and self.total % self.every == 0:
+            self.log()
+
+    def summary(self) -> Dict[str, Any]:
+        elapsed = time.perf_counter() - self._start
+        return {
+            "total": self.total,
+            "correct": self.correct,
+            "accuracy": self.correct / self.total if self.total else 0.0,
+            "errors": dict(self.errors),
+            "models": dict(self.models),
+            "results_per_second": self.total / elapsed if elapsed > 0 else 0.0,
+        }
+
+    def log(self) -> None:
+        summary = self.summary()
+        errors = ", ".join(f"{k}={v}" for k, v in self.errors.most_common()) or "-"
+        logger.info(
+            f"{summary['total']} results, accuracy {summary['accuracy']:.1%}, "
+            f"{summary['results_per_second']:.1f} results/s, errors: {errors}"
+        )
+
+    def close(self) -> None:
+        self.log()
+
+
+def _close_all(sinks: Sequence[ResultSink]) -> None:
+    for sink in sinks:
+        try:
+            sink.close()
+        except Exception as e:
+            logger.error(f"Failed to close {type(sink).__name__}: {e!s}")
+
+
+def write_results(results: Iterable[EvalResult], sinks: Sequence[ResultSink]) -> int:
+    """
+    評価結果を1件ずつすべてのシンクに書き出し、最後にシンクを閉じる
+
+    Returns:
+        int: 書き出した件数
+    """
+    count = 0
+    try:
+        for result in results:
+            for sink in sinks:
+                sink.write(result)
+            count += 1
+    finally:
+        _close_all(sinks)
+    return count
+
+
+async def awrite_results(
+    results: AsyncIterable[EvalResult], sinks: Sequence[ResultSink]
+) -> int:
+    """write_results の非同期イテラブル版"""
+    count = 0
+    try:
+        async for result in results:
+            for sink in sinks:
+                sink.write(result)
+            count += 1
+    finally:
+        _close_all(sinks)
+    return count
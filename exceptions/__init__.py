@@ -1,13 +1,19 @@
 from exceptions.exceptions import (
     AgentSetupError,
+    HandCodecError,
     HandValidationError,
+    InfeasibleTargetError,
     JSONParseError,
     ScoreCalculationError,
+    ScoringPoolSaturatedError,
 )
 
 __all__ = [
     "AgentSetupError",
     "JSONParseError",
+    "HandCodecError",
     "HandValidationError",
+    "InfeasibleTargetError",
     "ScoreCalculationError",
+    "ScoringPoolSaturatedError",
 ]
@@ -12,3 +12,15 @@ class HandValidationError(Exception):
 
 class ScoreCalculationError(Exception):
     pass
+
+
+class ScoringPoolSaturatedError(Exception):
+    pass
+
+
+class HandCodecError(Exception):
+    pass
+
+
+class InfeasibleTargetError(Exception):
+    pass
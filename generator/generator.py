@@ -1,4 +1,4 @@
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Sequence
 
 from langchain.agents import AgentExecutor, create_react_agent
 from langchain.hub import pull
@@ -8,7 +8,14 @@ from pydantic import ValidationError
 
 from entity.entity import Hand
 from exceptions import AgentSetupError, JSONParseError
-from llmmj.tools import CalculateMahjongScoreTool
+from generator.speculative import (
+    SpeculativeResult,
+    Target,
+    first_valid,
+    run_sync,
+    sampling_temperatures,
+)
+from llmmj.tools import ValidateAndScoreHandTool
 from prompts.prompts import (
     generate_question_prompt_template,
     generate_question_with_tools_prompt_template,
@@ -17,14 +24,30 @@ from prompts.prompts import (
 
 class MahjongQuestionGenerator:
     def __init__(
-        self, model, use_tools: bool = False, query_template: Optional[str] = None
+        self,
+        model,
+        use_tools: bool = False,
+        query_template: Optional[str] = None,
+        speculative: int = 1,
+        temperatures: Optional[Sequence[Optional[float]]] = None,
     ):
+        """
+        Args:
+            speculative: 同時に生成する候補の数。2以上の場合、目標の (飜, 符) を
+                渡した generate_question は候補を同時に生成し、最初に目標に
+                一致した候補を返す (generator.speculative)
+            temperatures: 候補ごとの temperature（None はモデルの設定のまま）
+        """
         self.model = model
         self.model_name = getattr(
             model, "model_name", getattr(model, "model", "unknown")
         )
         self.parser = JsonOutputParser(pydantic_object=Hand)
         self.use_tools = use_tools
+        self.speculative = speculative
+        self.temperatures = list(temperatures or sampling_temperatures(speculative))
+        # 直前の投機的な生成の結果（候補ごとの結果と短縮できた時間）
+        self.last_speculation: Optional[SpeculativeResult] = None
 
         # Choose the appropriate template based on whether MCP is enabled
         if query_template:
@@ -44,32 +67,43 @@ class MahjongQuestionGenerator:
         """Setup MCP-style tools using LangChain."""
         try:
             # Create tools
-            self.tools = [CalculateMahjongScoreTool()]
+            # 検証と点数計算を1回の呼び出しで行うツール
+            self.tools = [ValidateAndScoreHandTool()]
 
             # Create agent
-            prompt = pull("hwchase17/react")
-            agent = create_react_agent(self.model, self.tools, prompt)
-            self.agent_executor = AgentExecutor(
-                agent=agent,
-                tools=self.tools,
-                verbose=False,
-                handle_parsing_errors=True,
-                max_iterations=5,
-                early_stopping_method="generate",
-            )
+            self.react_prompt = pull("hwchase17/react")
+            self.agent_executor = self._react_executor(self.model)
 
         except Exception as e:
             raise AgentSetupError(f"Failed to setup ReAct agent: {e!s}")
 
-    def generate_question(self, query: str) -> Dict[str, Any]:
-        """Generate a Mahjong question based on the query."""
+    def _react_executor(self, model) -> AgentExecutor:
+        agent = create_react_agent(model, self.tools, self.react_prompt)
+        return AgentExecutor(
+            agent=agent,
+            tools=self.tools,
+            verbose=False,
+            handle_parsing_errors=True,
+            max_iterations=5,
+            early_stopping_method="generate",
+        )
+
+    def generate_question(
+        self, query: str, target: Optional[Target] = None
+    ) -> Dict[str, Any]:
+        """Generate a Mahjong question based on the query.
+
+        With speculative > 1 and a target (han, fu), candidates are generated
+        concurrently and the first one that scores the target is returned.
+        """
+        if self.speculative > 1 and target is not None:
+            return self._generate_question_speculative(query, target)
         if self.use_tools and self.agent_executor:
             return self._generate_question_with_mcp(query)
         else:
             return self._generate_question_simple(query)
 
-    def _generate_question_simple(self, query: str) -> Dict[str, Any]:
-        """Generate question using simple prompt template without MCP tools."""
+    def _simple_chain(self, model):
         prompt = PromptTemplate(
             template=self.query_template,
             input_variables=["query"],
@@ -77,8 +111,11 @@ class MahjongQuestionGenerator:
                 "format_instructions": self.parser.get_format_instructions()
             },
         )
+        return prompt | model | self.parser
 
-        chain = prompt | self.model | self.parser
+    def _generate_question_simple(self, query: str) -> Dict[str, Any]:
+        """Generate question using simple prompt template without MCP tools."""
+        chain = self._simple_chain(self.model)
         try:
             return chain.invoke({"query": query})
         except ValidationError as e:
@@ -86,10 +123,8 @@ class MahjongQuestionGenerator:
                 f"Failed to parse simple generation output as JSON(input): {e!s}"
             )
 
-    def _generate_question_with_mcp(self, query: str) -> Dict[str, Any]:
-        # Use agent to generate and verify
+    def _parse_agent_output(self, result: Dict[str, Any]) -> Dict[str, Any]:
         try:
-            result = self.agent_executor.invoke({"input": query})
             # Strip markdown formatting before parsing
             output = result["output"]
             if isinstance(output, str):
@@ -106,3 +141,57 @@ class MahjongQuestionGenerator:
             raise JSONParseError(
                 f"Failed to parse agent output as JSON: {e!s}, result: {result}"
             )
+
+    def _generate_question_with_mcp(self, query: str) -> Dict[str, Any]:
+        # Use agent to generate and verify
+        result = self.agent_executor.invoke({"input": query})
+        return self._parse_agent_output(result)
+
+    def _sampled_model(self, temperature: Optional[float]):
+        """temperature を変えたモデルのコピー（temperature を持たないモデルはそのまま）"""
+        if temperature is None or "temperature" not in getattr(
+            type(self.model), "model_fields", {}
+        ):
+            return self.model
+        return self.model.model_copy(update={"temperature": temperature})
+
+    def _candidates(self, query: str) -> List:
+        """候補を1つずつ生成するコルーチン関数"""
+        candidates = []
+        for temperature in self.temperatures[: self.speculative]:
+            model = self._sampled_model(temperature)
+            if self.use_tools and self.agent_executor:
+                executor = self._react_executor(model)
+
+                async def generate(executor=executor):
+                    result = await executor.ainvoke({"input": query})
+                    return self._parse_agent_output(result)
+
+            else:
+                chain = self._simple_chain(model)
+
+                async def generate(chain=chain):
+                    try:
+                        return await chain.ainvoke({"query": query})
+                    except ValidationError as e:
+                        raise JSONParseError(
+                            "Failed to parse simple generation output as "
+                            f"JSON(input): {e!s}"
+                        )
+
+            candidates.append(generate)
+        return candidates
+
+    def _generate_question_speculative(
+        self, query: str, target: Target
+    ) -> Dict[str, Any]:
+        """Generate candidates concurrently and return the first valid one."""
+        speculation = run_sync(
+            first_valid(self._candidates(query), target, fatal=(AgentSetupError,))
+        )
+        self.last_speculation = speculation
+        selected = speculation.selected
+        if selected is None:
+            # すべての候補の生成に失敗した場合は最初の候補のエラーを送出する
+            raise speculation.outcomes[0].result
+        return selected.result
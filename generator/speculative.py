@@ -0,0 +1,285 @@
+"""
+候補の投機的な並列生成 (first-valid-wins)
+
+1回の生成では目標の (飜, 符) にならないことが多く、ReAct やループのエージェントは
+失敗を1回ずつ直列に修正する。ここでは k 個の候補をサンプリングの設定を変えて
+同時に生成し、届いた順に validate_hand / calculate_score でローカルに検証・採点して、
+目標に一致した候補が届いた時点で残りをキャンセルする。
+
+短縮できた時間は、同じ候補を1つずつ直列に再試行した場合の所要時間との差として
+llmmj_speculative_saved_seconds に記録する。キャンセルした候補の所要時間は
+分からないため、直列の再試行には一致した候補より先に届いた候補だけを含める（下限）。
+
+- MahjongQuestionGenerator(speculative=k): LangChain のモデルで k 個の候補を生成する
+- agents_loop.speculative: ADK の ParallelAgent で k 個の候補を生成する
+"""
+
+import asyncio
+import logging
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Coroutine,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+)
+
+from pydantic import ValidationError
+
+from entity.decoding import decode_hand_json
+from entity.entity import Hand
+from exceptions import HandValidationError, ScoreCalculationError
+from llmmj import metrics
+from llmmj.llmmj import calculate_score_cached, validate_hand
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+STATUS_MATCHED = "matched"
+STATUS_MISMATCH = "mismatch"
+STATUS_INVALID = "invalid"
+STATUS_ERROR = "error"
+STATUS_CANCELLED = "cancelled"
+
+# 2つ目以降の候補の temperature の範囲
+TEMPERATURE_RANGE = (0.3, 1.0)
+
+# (飜, 符)
+Target = Tuple[int, int]
+
+_TARGET_PATTERN = re.compile(r"(\d+)\s*han\s*(\d+)\s*fu", re.IGNORECASE)
+
+
+class CandidateOutcome(NamedTuple):
+    """1つの候補の検証・採点の結果"""
+
+    index: int
+    status: str
+    # 生成の開始から届くまで（キャンセルした場合はキャンセルまで）の秒数
+    elapsed: float
+    # 生成結果 (dict / Hand / JSON文字列)。生成に失敗した場合は例外
+    result: Any = None
+    han: Optional[int] = None
+    fu: Optional[int] = None
+    error: Optional[str] = None
+
+
+class SpeculativeResult(NamedTuple):
+    # 目標に一致した候補の index（一致しなかった場合は None）
+    winner: Optional[int]
+    # 採用する候補（一致しなかった場合は目標に最も近い候補）
+    selected: Optional[CandidateOutcome]
+    # index の順
+    outcomes: List[CandidateOutcome]
+    elapsed: float
+    # 届いた候補を1つずつ直列に生成した場合の所要時間
+    serial_seconds: float
+    saved_seconds: float
+
+
+def parse_target(query: str) -> Optional[Target]:
+    """問題文 ("... 2 han 30 fu") から目標の (飜, 符) を取り出す"""
+    match = _TARGET_PATTERN.search(query)
+    if match is None:
+        return None
+    return int(match.group(1)), int(match.group(2))
+
+
+def sampling_temperatures(
+    k: int, temperature_range: Tuple[float, float] = TEMPERATURE_RANGE
+) -> List[Optional[float]]:
+    """
+    k 個の候補の temperature
+
+    最初の候補はモデルの設定のまま (None) にし、1回だけ生成する場合と同じ結果を
+    含める。2つ目以降は temperature_range を等間隔に分ける。
+    """
+    low, high = temperature_range
+    others = k - 1
+    if others <= 0:
+        return [None] * k
+    step = (high - low) / max(others - 1, 1)
+    return [None] + [round(low + step * i, 2) for i in range(others)]
+
+
+def to_hand(result: Any) -> Hand:
+    """生成結果 (dict / Hand / JSON文字列) を Hand にする"""
+    if isinstance(result, Hand):
+        return result
+    if isinstance(result, (str, bytes)):
+        return decode_hand_json(result)
+    if isinstance(result, dict):
+        return Hand(**result)
+    raise TypeError(f"Invalid result type from generator: {type(result)}")
+
+
+def check_candidate(
+    index: int, result: Any, target: Optional[Target], elapsed: float
+) -> CandidateOutcome:
+    """
+    候補を validate_hand / calculate_score で検証・採点し、目標と比べる
+
+    飜のない（和了形でない）手牌は不正な候補とする。
+    target が None の場合は、検証と点数計算に成功した候補を一致とみなす。
+    """
+    try:
+        hand = to_hand(result)
+        validate_hand(hand)
+        score = calculate_score_cached(hand)
+    except (
+        HandValidationError,
+        ScoreCalculationError,
+        ValidationError,
+        TypeError,
+    ) as e:
+        return CandidateOutcome(
+            index, STATUS_INVALID, elapsed, result, error=f"{type(e).__name__}: {e!s}"
+        )
+    if score.error:
+        return CandidateOutcome(
+            index, STATUS_INVALID, elapsed, result, score.han, score.fu, score.error
+        )
+    # 和了形でない手牌は error なしで han=None になる
+    if not score.han:
+        return CandidateOutcome(
+            index, STATUS_INVALID, elapsed, result, error="Not a winning hand"
+        )
+    matched = target is None or (score.han, score.fu) == target
+    status = STATUS_MATCHED if matched else STATUS_MISMATCH
+    return CandidateOutcome(index, status, elapsed, result, score.han, score.fu)
+
+
+def select_candidate(
+    outcomes: Sequence[CandidateOutcome], target: Optional[Target]
+) -> Optional[CandidateOutcome]:
+    """
+    採用する候補を選ぶ
+
+    目標に一致した候補のうち最初に届いたもの、なければ (飜, 符) が目標に最も近い
+    候補、なければ最初の不正な候補。生成に成功した候補がなければ None。
+    """
+    by_status: Dict[str, List[CandidateOutcome]] = {}
+    for outcome in outcomes:
+        by_status.setdefault(outcome.status, []).append(outcome)
+    if STATUS_MATCHED in by_status:
+        return min(by_status[STATUS_MATCHED], key=lambda o: o.elapsed)
+    if STATUS_MISMATCH in by_status:
+        return min(
+            by_status[STATUS_MISMATCH],
+            key=lambda o: (abs(o.han - target[0]), abs(o.fu - target[1]), o.index),
+        )
+    if STATUS_INVALID in by_status:
+        return min(by_status[STATUS_INVALID], key=lambda o: o.index)
+    return None
+
+
+def summarize(
+    outcomes: Sequence[CandidateOutcome], target: Optional[Target], elapsed: float
+) -> SpeculativeResult:
+    """候補の結果をまとめ、候補の件数と短縮できた時間をメトリクスに記録する"""
+    outcomes = sorted(outcomes, key=lambda o: o.index)
+    selected = select_candidate(outcomes, target)
+    winner = selected if selected and selected.status == STATUS_MATCHED else None
+
+    # 一致した候補までに届いた候補を直列に生成した場合の所要時間
+    arrived = [o for o in outcomes if o.status != STATUS_CANCELLED]
+    if winner is not None:
+        arrived = [o for o in arrived if o.elapsed <= winner.elapsed]
+    serial_seconds = sum(o.elapsed for o in arrived)
+    saved_seconds = max(serial_seconds - elapsed, 0.0)
+
+    for outcome in outcomes:
+        metrics.SPECULATIVE_CANDIDATES.inc(outcome=outcome.status)
+    metrics.SPECULATIVE_SAVED_SECONDS.observe(saved_seconds)
+    return SpeculativeResult(
+        winner=winner.index if winner else None,
+        selected=selected,
+        outcomes=outcomes,
+        elapsed=elapsed,
+        serial_seconds=serial_seconds,
+        saved_seconds=saved_seconds,
+    )
+
+
+async def first_valid(
+    candidates: Sequence[Callable[[], Awaitable[Any]]],
+    target: Optional[Target],
+    fatal: Tuple[Type[BaseException], ...] = (),
+) -> SpeculativeResult:
+    """
+    候補を同時に生成し、目標に一致した候補が届いた時点で残りをキャンセルする
+
+    Args:
+        candidates: 候補を1つ生成するコルーチン関数
+        target: 目標の (飜, 符)。None の場合は最初に検証を通った候補を採用する
+        fatal: 他の候補を待たずにそのまま送出する例外（エージェントの設定エラーなど）
+
+    Returns:
+        SpeculativeResult: 候補ごとの結果と採用する候補
+    """
+    start = time.perf_counter()
+    tasks = {asyncio.ensure_future(make()): i for i, make in enumerate(candidates)}
+    pending = set(tasks)
+    outcomes: List[CandidateOutcome] = []
+    try:
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            now = time.perf_counter() - start
+            for task in sorted(done, key=tasks.__getitem__):
+                index = tasks[task]
+                error = task.exception()
+                if error is None:
+                    outcomes.append(check_candidate(index, task.result(), target, now))
+                elif isinstance(error, fatal):
+                    raise error
+                else:
+                    outcomes.append(
+                        CandidateOutcome(
+                            index,
+                            STATUS_ERROR,
+                            now,
+                            error,
+                            error=f"{type(error).__name__}: {error!s}",
+                        )
+                    )
+            if any(o.status == STATUS_MATCHED for o in outcomes):
+                break
+    finally:
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    elapsed = time.perf_counter() - start
+    outcomes.extend(
+        CandidateOutcome(tasks[task], STATUS_CANCELLED, elapsed) for task in pending
+    )
+    result = summarize(outcomes, target, elapsed)
+    logger.info(
+        f"Speculative generation: winner={result.winner}, "
+        f"{len(pending)} cancelled, {result.elapsed:.1f}s "
+        f"(serial {result.serial_seconds:.1f}s, saved {result.saved_seconds:.1f}s)"
+    )
+    return result
+
+
+def run_sync(coro: Coroutine[Any, Any, T]) -> T:
+    """コルーチンを実行する。イベントループの中 (Jupyter など) では別スレッドで実行する"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
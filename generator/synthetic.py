@@ -0,0 +1,507 @@
+"""
+オフラインの合成データセット生成
+
+LLMを使わずにランダムな和了形を生成して calculate_score で点数を計算し、
+問題 (query)・正解 (answer)・参照手牌 (reference) を1行1問のJSONLに出力する。
+
+出力は (飜, 符) ごとに均等になるよう層化し、同じ (飜, 符) の中では
+門前/副露・ロン/ツモ・自風・槓の有無の組み合わせが偏らないように選ぶ。
+層にする (飜, 符) は、実現可能性の表 (llmmj.feasibility) で達成できる
+MAX_HAN 飜までのすべての組み合わせに最初から固定する。
+色の入れ替えなどで点数の変わらない手牌 (entity.canonical) は重複として除く。
+候補の手牌はチャンク単位でワーカープロセスに生成させ、チャンクごとの乱数の
+シードは seed とチャンク番号から決まるため、ワーカー数によらず同じ seed からは
+同じデータセットが生成される。ランダムな手牌では埋まらなくなった層は、
+表の手牌の例にドラ表示牌などを足して目標の (飜, 符) の手牌を作って埋める。
+
+Usage:
+    python -m generator.synthetic --size 10000 --seed 0 --output dataset/synthetic.jsonl
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import random
+import sys
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from entity.canonical import _previous_tile, canonical_key
+from entity.codec import TILE_INDEX, TILES_34, WINDS
+from entity.entity import Hand
+from exceptions import HandValidationError
+from llmmj.feasibility import YAKUMAN_HAN, is_feasible, load_table
+from llmmj.llmmj import calculate_score_cached, validate_hand
+from llmmj.workers import forkserver_executor, map_with_metrics
+
+logger = logging.getLogger(__name__)
+
+QUERY_TEMPLATE = (
+    "Please create a mahjong scoring calculation problem with an answer of "
+    "{han} han {fu} fu"
+)
+
+# 1チャンクで生成する候補の手牌の数
+CHUNK_SIZE = 256
+# 層ごとの件数を確認するまでに生成するチャンク数（ワーカー数に依存させない）
+WINDOW_CHUNKS = 16
+# 生成する候補の手牌の数の上限（データセットの件数に対する倍率）
+MAX_CANDIDATE_FACTOR = 20
+# 層にする飜数の上限（これより上は数え役満・役満になる）
+MAX_HAN = YAKUMAN_HAN - 1
+# ランダムな手牌で層が埋まった件数の割合（候補あたり）がこれを下回ったら、
+# 残りの層は目標の (飜, 符) の手牌で埋める
+MIN_FILL_RATE = 0.01
+# 目標の (飜, 符) の手牌を作る試行回数（層の不足1件あたり）
+FILL_ATTEMPTS = 4
+# 目標の (飜, 符) の手牌に足すドラ表示牌の数の上限（槓ドラ・裏ドラを含めた枚数）
+MAX_DORA_INDICATORS = 10
+
+PLAYER_WINDS = list(WINDS[1:])
+ROUND_WINDS = PLAYER_WINDS[:2]
+_SIMPLES = [tile for tile in TILES_34[:27] if tile[0] not in "19"]
+
+# 門前/副露・ロン/ツモ・自風・槓の有無
+Conditions = Tuple[bool, bool, str, bool]
+
+
+def _sequence(rng: random.Random, simples_only: bool) -> List[str]:
+    suit = rng.choice("mps")
+    start = rng.randint(2, 6) if simples_only else rng.randint(1, 7)
+    return [f"{start + i}{suit}" for i in range(3)]
+
+
+def _tile(rng: random.Random, simples_only: bool) -> str:
+    if simples_only:
+        return rng.choice(_SIMPLES)
+    # 役牌の刻子を作りやすくするため、字牌を多めに選ぶ
+    return rng.choice(TILES_34[27:]) if rng.random() < 0.3 else rng.choice(TILES_34)
+
+
+def _fits(counts: Counter, tiles: List[str]) -> bool:
+    return all(counts[tile] + tiles.count(tile) <= 4 for tile in tiles)
+
+
+def _seven_pairs(rng: random.Random) -> Tuple[List[str], List[str]]:
+    pairs = rng.sample(TILES_34, 7)
+    return [tile for tile in pairs for _ in range(2)], pairs
+
+
+def random_hand(rng: random.Random) -> Dict[str, Any]:
+    """
+    ランダムな和了形を生成する
+
+    4面子1雀頭（または七対子）の形であることは保証するが、役があるとは限らない。
+
+    Returns:
+        Dict[str, Any]: Hand のフィールドの辞書
+    """
+    is_open = rng.random() < 0.5
+    has_kan = rng.random() < 0.25
+    simples_only = rng.random() < 0.2
+
+    counts: Counter = Counter()
+    melds = []
+    if not is_open and not has_kan and rng.random() < 0.1:
+        tiles, win_candidates = _seven_pairs(rng)
+        counts.update(tiles)
+    else:
+        groups: List[List[str]] = []
+        if has_kan:
+            groups.append([_tile(rng, simples_only)] * 4)
+            counts.update(groups[0])
+        while len(groups) < 4:
+            if rng.random() < 0.35:
+                group = [_tile(rng, simples_only)] * 3
+            else:
+                group = _sequence(rng, simples_only)
+            if _fits(counts, group):
+                counts.update(group)
+                groups.append(group)
+        while True:
+            pair = [_tile(rng, simples_only)] * 2
+            if _fits(counts, pair):
+                counts.update(pair)
+                break
+
+        meld_indices = set()
+        if has_kan:
+            # 副露していない手牌の槓は暗槓にする
+            meld_indices.add(0)
+            melds.append(
+                {"tiles": groups[0], "is_open": is_open and rng.random() < 0.5}
+            )
+        if is_open:
+            for index in rng.sample(range(len(groups)), rng.randint(1, 3)):
+                if index not in meld_indices:
+                    meld_indices.add(index)
+                    melds.append({"tiles": groups[index], "is_open": True})
+            if not any(meld["is_open"] for meld in melds):
+                melds[0]["is_open"] = True
+        win_candidates = [
+            tile
+            for index, group in enumerate(groups)
+            if index not in meld_indices
+            for tile in group
+        ] + pair
+        tiles = list(counts.elements())
+
+    is_closed = not any(meld["is_open"] for meld in melds)
+    is_riichi = is_closed and rng.random() < 0.5
+    dora_indicators = []
+    while len(dora_indicators) < 1 + sum(len(meld["tiles"]) == 4 for meld in melds):
+        tile = rng.choice(TILES_34)
+        if counts[tile] < 4:
+            counts[tile] += 1
+            dora_indicators.append(tile)
+
+    return {
+        "tiles": sorted(tiles, key=TILES_34.index),
+        "melds": melds,
+        "win_tile": rng.choice(win_candidates),
+        "dora_indicators": dora_indicators,
+        "is_riichi": is_riichi,
+        "is_ippatsu": is_riichi and rng.random() < 0.1,
+        "is_tsumo": rng.random() < 0.5,
+        "player_wind": rng.choice(PLAYER_WINDS),
+        "round_wind": rng.choice(ROUND_WINDS),
+    }
+
+
+def conditions_of(hand: Hand) -> Conditions:
+    """層化に使う手牌の条件 (is_open, is_tsumo, player_wind, has_kan)"""
+    melds = hand.melds or []
+    return (
+        any(meld.is_open for meld in melds),
+        hand.is_tsumo,
+        hand.player_wind,
+        any(len(meld.tiles) == 4 for meld in melds),
+    )
+
+
+def _make_record(hand: Hand) -> Optional[Dict[str, Any]]:
+    try:
+        validate_hand(hand)
+    except HandValidationError:
+        return None
+    score = calculate_score_cached(hand)
+    if score.error or not score.han:
+        return None
+    is_open, is_tsumo, player_wind, has_kan = conditions_of(hand)
+    return {
+        "query": QUERY_TEMPLATE.format(han=score.han, fu=score.fu),
+        "answer": {"han": score.han, "fu": score.fu},
+        "conditions": {
+            "is_open": is_open,
+            "is_tsumo": is_tsumo,
+            "player_wind": player_wind,
+            "round_wind": hand.round_wind,
+            "has_kan": has_kan,
+        },
+        "reference": hand.model_dump(exclude_defaults=True),
+        "reference_score": {"score": score.score, "yaku": score.yaku},
+    }
+
+
+def reachable_cells(max_han: int = MAX_HAN) -> List[Tuple[int, int]]:
+    """実現可能性の表で達成できる max_han 飜までの (飜, 符)"""
+    fus = sorted({key.fu for key in load_table()})
+    return [
+        (han, fu) for han in range(1, max_han + 1) for fu in fus if is_feasible(han, fu)
+    ]
+
+
+def _dora_indicator(tile: str) -> str:
+    return TILES_34[_previous_tile(TILE_INDEX[tile])]
+
+
+def targeted_hand(rng: random.Random, han: int, fu: int) -> Optional[Dict[str, Any]]:
+    """
+    目標の (飜, 符) になるはずの手牌を作る
+
+    実現可能性の表から符が一致する手牌の例を選び、不足する飜数をドラ表示牌
+    （門前なら立直・一発）で足す。ドラと立直・一発は符を変えない。自風・場風はランダムに選ぶため、
+    役牌や連風牌で点数が変わることがある。呼び出し側で点数計算して確かめる。
+
+    Returns:
+        Optional[Dict[str, Any]]: Hand のフィールドの辞書。作れない場合はNone
+    """
+    entries = [
+        entry
+        for key, entry in sorted(load_table().items())
+        if key.fu == fu and entry["min_han"] <= han and entry["min_han"] < YAKUMAN_HAN
+    ]
+    if not entries:
+        return None
+    entry = rng.choice(entries)
+    example = entry["example"]
+    fields = {
+        **example,
+        "melds": [dict(meld) for meld in example.get("melds", [])],
+        "player_wind": rng.choice(PLAYER_WINDS),
+        "round_wind": rng.choice(ROUND_WINDS),
+    }
+    counts = Counter(fields["tiles"])
+    used = Counter(fields["tiles"])
+    # 手牌の例は既定値を省いて保存している (MeldInfo.is_open の既定値は True)
+    is_closed = not any(meld.get("is_open", True) for meld in fields["melds"])
+    dora_indicators: List[str] = []
+    need = han - entry["min_han"]
+    while need > 0:
+        options = [
+            tile
+            for tile, count in counts.items()
+            if count <= need
+            and len(dora_indicators) < MAX_DORA_INDICATORS
+            and used[_dora_indicator(tile)] < 4
+        ]
+        if is_closed and not fields.get("is_ippatsu"):
+            options.append(None)
+        if not options:
+            return None
+        tile = rng.choice(options)
+        if tile is None:
+            # 立直、立直していれば一発
+            fields["is_ippatsu" if fields.get("is_riichi") else "is_riichi"] = True
+            need -= 1
+        else:
+            indicator = _dora_indicator(tile)
+            used[indicator] += 1
+            dora_indicators.append(indicator)
+            need -= counts[tile]
+    fields["dora_indicators"] = dora_indicators
+    return fields
+
+
+def fill_cell(seed: int, cell: Tuple[int, int], attempts: int) -> List[Dict]:
+    """目標の (飜, 符) の手牌を attempts 回作り、点数が一致したレコードを返す"""
+    han, fu = cell
+    rng = random.Random(f"{seed}:fill:{han}:{fu}")
+    records = []
+    for _ in range(attempts):
+        fields = targeted_hand(rng, han, fu)
+        if fields is None:
+            continue
+        record = _make_record(Hand(**fields))
+        if record is not None and _stratum(record)[0] == cell:
+            records.append(record)
+    return records
+
+
+def generate_chunk(seed: int, chunk: int, size: Optional[int] = None) -> List[Dict]:
+    """1チャンク分の候補の手牌を生成し、役のある和了形のレコードを返す"""
+    rng = random.Random(f"{seed}:{chunk}")
+    records = []
+    for _ in range(size or CHUNK_SIZE):
+        record = _make_record(Hand(**random_hand(rng)))
+        if record is not None:
+            records.append(record)
+    return records
+
+
+def _stratum(record: Dict[str, Any]) -> Tuple[Tuple[int, int], Tuple]:
+    answer = record["answer"]
+    conditions = record["conditions"]
+    return (answer["han"], answer["fu"]), (
+        conditions["is_open"],
+        conditions["is_tsumo"],
+        conditions["player_wind"],
+        conditions["has_kan"],
+    )
+
+
+class _Strata:
+    """(飜, 符) → 条件 → レコードのリスト"""
+
+    def __init__(self, size: int, cells: List[Tuple[int, int]]):
+        self.size = size
+        # 追加したレコードの参照手牌の代表元
+        self.seen = set()
+        # 層は最初に固定するため、(飜, 符) ごとに必要な件数も変わらない
+        self.cells: Dict[Tuple[int, int], Dict[Tuple, List[Dict]]] = {
+            cell: defaultdict(list) for cell in cells
+        }
+        self.quota = math.ceil(size / max(len(cells), 1))
+
+    def add(self, record: Dict[str, Any]) -> bool:
+        """レコードを追加する。追加しなかった場合はFalse"""
+        cell, conditions = _stratum(record)
+        groups = self.cells.get(cell)
+        # MAX_HAN 飜より上などの層の外のレコードは使わない
+        if groups is None:
+            return False
+        # 同じ条件のレコードは quota 件あれば足りる
+        if len(groups[conditions]) >= self.quota:
+            return False
+        key = canonical_key(Hand(**record["reference"]))
+        if key in self.seen:
+            return False
+        self.seen.add(key)
+        groups[conditions].append(record)
+        return True
+
+    def shortage(self) -> Dict[Tuple[int, int], int]:
+        """quota 件に足りない (飜, 符) と不足する件数"""
+        shortage = {}
+        for cell, groups in self.cells.items():
+            count = sum(len(records) for records in groups.values())
+            if count < self.quota:
+                shortage[cell] = self.quota - count
+        return shortage
+
+    def is_full(self) -> bool:
+        return not self.shortage()
+
+    def select(self, rng: random.Random) -> List[Dict[str, Any]]:
+        """
+        (飜, 符) を順番に1件ずつ選ぶ
+
+        (飜, 符) の順番はシャッフルし、件数が層の数より少ない場合も
+        低い飜数に偏らないようにする。同じ (飜, 符) の中では条件をシャッフルした
+        順に選び、門前/副露などの条件が偏らないようにする。
+        """
+        cells = sorted(self.cells)
+        rng.shuffle(cells)
+        queues = {}
+        for cell in cells:
+            groups = self.cells[cell]
+            queues[cell] = [list(records) for _, records in sorted(groups.items())]
+            rng.shuffle(queues[cell])
+        turns = {cell: 0 for cell in queues}
+        selected: List[Dict[str, Any]] = []
+        while len(selected) < self.size and queues:
+            for cell in list(queues):
+                groups = [records for records in queues[cell] if records]
+                if not groups:
+                    del queues[cell]
+                    continue
+                selected.append(groups[turns[cell] % len(groups)].pop(0))
+                turns[cell] += 1
+                if len(selected) == self.size:
+                    break
+        return selected
+
+
+def _iter_chunks(
+    seed: int, start: int, executor: Optional[ProcessPoolExecutor]
+) -> Iterator[List[Dict]]:
+    chunks = range(start, start + WINDOW_CHUNKS)
+    if executor is None:
+        yield from (generate_chunk(seed, chunk) for chunk in chunks)
+    else:
+        yield from map_with_metrics(
+            executor, generate_chunk, [seed] * len(chunks), chunks
+        )
+
+
+def generate_dataset(
+    size: int,
+    seed: int = 0,
+    workers: int = 1,
+    max_candidates: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    (飜, 符) と手牌の条件で層化した合成データセットを生成する
+
+    Args:
+        size: 生成する問題の数
+        seed: 乱数のシード（ワーカー数によらず同じ結果になる）
+        workers: ワーカープロセス数。1の場合は現在のプロセスで生成する
+        max_candidates: 生成する候補の手牌の数の上限
+
+    Returns:
+        List[Dict[str, Any]]: query / answer / conditions / reference / reference_score
+    """
+    max_candidates = max_candidates or size * MAX_CANDIDATE_FACTOR
+    strata = _Strata(size, reachable_cells())
+    executor = None
+    if workers > 1:
+        executor = forkserver_executor(workers, ["generator.synthetic"])
+    try:
+        chunk = 0
+        while chunk * CHUNK_SIZE < max_candidates and not strata.is_full():
+            added = 0
+            for records in _iter_chunks(seed, chunk, executor):
+                added += sum(strata.add(record) for record in records)
+            chunk += WINDOW_CHUNKS
+            # ランダムな手牌で層がほとんど埋まらなくなったら、残りは目標の手牌で埋める
+            if added < MIN_FILL_RATE * WINDOW_CHUNKS * CHUNK_SIZE:
+                break
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    targeted = 0
+    for cell, missing in sorted(strata.shortage().items()):
+        for record in fill_cell(seed, cell, missing * FILL_ATTEMPTS):
+            targeted += strata.add(record)
+    shortage = strata.shortage()
+    if shortage:
+        logger.warning(
+            f"{len(shortage)} (han, fu) cells have fewer than {strata.quota} items: "
+            f"{sorted(shortage)}"
+        )
+
+    selected = strata.select(random.Random(seed))
+    logger.info(
+        f"Generated {len(selected)} items over {len(strata.cells)} (han, fu) cells "
+        f"from {chunk * CHUNK_SIZE} candidates and {targeted} targeted hands"
+    )
+    if len(selected) < size:
+        logger.warning(f"Only {len(selected)} of {size} items could be generated")
+    return selected
+
+
+def iter_dataset(path: Union[str, Path]) -> Iterator[Dict[str, Any]]:
+    """
+    データセットを1件ずつ読み込む
+
+    JSONL (合成データセット) は1行ずつ読み込むため、件数によらずメモリは一定。
+    JSON (queries.json) はファイル全体を読み込んでから1件ずつ返す。
+    """
+    path = Path(path)
+    with open(path) as f:
+        if path.suffix == ".jsonl":
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from json.load(f)
+
+
+def load_dataset(path: Union[str, Path]) -> List[Dict[str, Any]]:
+    """JSON (queries.json) またはJSONL (合成データセット) のデータセットを読み込む"""
+    return list(iter_dataset(path))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic dataset")
+    parser.add_argument("--size", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--max-candidates", type=int)
+    parser.add_argument(
+        "--output", type=Path, help="Output JSONL path (default: stdout)"
+    )
+    args = parser.parse_args()
+
+    # 役なしの候補のログで出力が埋もれないようにする
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+    logging.getLogger("llmmj").setLevel(logging.CRITICAL)
+
+    dataset = generate_dataset(args.size, args.seed, args.workers, args.max_candidates)
+    out = open(args.output, "w") if args.output else sys.stdout
+    try:
+        for record in dataset:
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+    finally:
+        if args.output:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+"""
+NumPy による手牌の一括バリデーション
+
+評価結果や生成したコーパスの手牌 N 件を (N, 34) の枚数の行列と鳴き・和了牌・
+ドラ表示牌の配列にエンコードし、各チェックを行列演算でまとめて行う。
+Python のループは牌の表記をインデックスに変換するエンコード時の1回だけになる。
+
+validate_hand より厳密に、次の項目をチェックする（エラーはビットの組み合わせ）:
+
+- 牌の表記が34種のいずれか (INVALID_TILE)
+- 同じ牌が4枚以下 (TOO_MANY_COPIES)
+- 鳴きの牌が手牌に含まれる（枚数も含めて） (MELD_NOT_IN_HAND)
+- 鳴きがポン・チー・カンの形 (INVALID_MELD)
+- 手牌の枚数が 14 + カンの数 (TILE_COUNT)
+- 和了牌が手牌に含まれる (WIN_TILE_MISSING)
+- ドラ表示牌の表記が正しく、手牌と合わせて同じ牌が4枚以下 (INVALID_DORA)
+"""
+
+from typing import Any, Dict, Iterable, List, NamedTuple, Tuple, Union
+
+import numpy as np
+
+from entity.codec import TILE_INDEX
+from entity.entity import Hand
+
+OK = 0
+EMPTY_TILES = 1 << 0
+INVALID_TILE = 1 << 1
+TOO_MANY_COPIES = 1 << 2
+MELD_NOT_IN_HAND = 1 << 3
+INVALID_MELD = 1 << 4
+TILE_COUNT = 1 << 5
+WIN_TILE_MISSING = 1 << 6
+INVALID_DORA = 1 << 7
+
+ERROR_MESSAGES: Dict[int, str] = {
+    EMPTY_TILES: "tiles is empty",
+    INVALID_TILE: "invalid tile notation in tiles, melds or win_tile",
+    TOO_MANY_COPIES: "more than 4 copies of a tile",
+    MELD_NOT_IN_HAND: "meld tiles are not in tiles",
+    INVALID_MELD: "meld is not a pon, chi or kan",
+    TILE_COUNT: "tile count is not 14 plus the number of kans",
+    WIN_TILE_MISSING: "win_tile is not in tiles",
+    INVALID_DORA: "invalid dora indicators",
+}
+
+N_TILES = 34
+# 1手牌あたりの鳴きの数・1つの鳴きの牌の数・ドラ表示牌の数の上限
+MAX_MELDS = 4
+MAX_MELD_TILES = 4
+MAX_DORA = 10
+
+_HONOR_START = 27
+_PAD = -1
+_INVALID = -2
+
+HandLike = Union[Hand, Dict[str, Any]]
+
+
+class HandBatch(NamedTuple):
+    """N 件の手牌のエンコード結果"""
+
+    # (N, 34) 手牌の牌の枚数（鳴きの牌も含む）
+    counts: np.ndarray
+    # (N, MAX_MELDS, MAX_MELD_TILES) 鳴きの牌のインデックス。空きは -1
+    melds: np.ndarray
+    # (N,) 和了牌のインデックス。-1: なし
+    win_tile: np.ndarray
+    # (N, MAX_DORA) ドラ表示牌のインデックス。空きは -1
+    dora: np.ndarray
+    # (N,) エンコード時に見つかったエラー (INVALID_TILE / INVALID_MELD / INVALID_DORA)
+    encode_errors: np.ndarray
+
+
+def _get(hand: HandLike, field: str) -> Any:
+    if isinstance(hand, dict):
+        return hand.get(field)
+    return getattr(hand, field)
+
+
+def _meld_tiles(meld: Any) -> Any:
+    return meld.get("tiles") if isinstance(meld, dict) else meld.tiles
+
+
+def encode_hands(hands: Iterable[HandLike]) -> HandBatch:
+    """
+    手牌を行列にエンコードする
+
+    Args:
+        hands: Hand、または Hand と同じキーの dict（JSONL のコーパスなど）
+    """
+    tiles: List[int] = []
+    lengths: List[int] = []
+    win_tiles: List[int] = []
+    meld_rows: List[Tuple[int, int, int, int]] = []
+    dora_rows: List[Tuple[int, int, int]] = []
+    errors: List[int] = []
+
+    lookup = TILE_INDEX.get
+    for row, hand in enumerate(hands):
+        error = OK
+        hand_tiles = [lookup(tile, _INVALID) for tile in _get(hand, "tiles") or ()]
+        tiles += hand_tiles
+        lengths.append(len(hand_tiles))
+        if _INVALID in hand_tiles:
+            error |= INVALID_TILE
+
+        win_tile = _get(hand, "win_tile")
+        win_index = lookup(win_tile, _INVALID) if win_tile else _PAD
+        if win_index == _INVALID:
+            error |= INVALID_TILE
+        win_tiles.append(win_index)
+
+        melds = _get(hand, "melds") or ()
+        if len(melds) > MAX_MELDS:
+            error |= INVALID_MELD
+        for m, meld in enumerate(melds[:MAX_MELDS]):
+            meld_tiles = _meld_tiles(meld) or ()
+            if not 3 <= len(meld_tiles) <= MAX_MELD_TILES:
+                error |= INVALID_MELD
+                continue
+            for t, tile in enumerate(meld_tiles):
+                index = lookup(tile, _INVALID)
+                if index == _INVALID:
+                    error |= INVALID_TILE
+                    continue
+                meld_rows.append((row, m, t, index))
+
+        dora = _get(hand, "dora_indicators") or ()
+        if len(dora) > MAX_DORA:
+            error |= INVALID_DORA
+        for d, tile in enumerate(dora[:MAX_DORA]):
+            index = lookup(tile, _INVALID)
+            if index == _INVALID:
+                error |= INVALID_DORA
+                continue
+            dora_rows.append((row, d, index))
+        errors.append(error)
+
+    n = len(errors)
+    columns = np.asarray(tiles, dtype=np.int64)
+    rows = np.repeat(np.arange(n, dtype=np.int64), lengths)
+    valid = columns >= 0
+    counts = np.bincount(rows[valid] * N_TILES + columns[valid], minlength=n * N_TILES)
+    # 同じ牌が255枚を超える入力でも桁あふれしないよう、上限で切り詰める
+    counts = np.minimum(counts, np.iinfo(np.uint8).max).astype(np.uint8)
+
+    meld_array = np.full((n, MAX_MELDS, MAX_MELD_TILES), _PAD, dtype=np.int8)
+    if meld_rows:
+        r, m, t, index = np.asarray(meld_rows, dtype=np.int64).T
+        meld_array[r, m, t] = index
+    dora_array = np.full((n, MAX_DORA), _PAD, dtype=np.int8)
+    if dora_rows:
+        r, d, index = np.asarray(dora_rows, dtype=np.int64).T
+        dora_array[r, d] = index
+
+    return HandBatch(
+        counts=counts.reshape(n, N_TILES),
+        melds=meld_array,
+        win_tile=np.asarray(win_tiles, dtype=np.int8),
+        dora=dora_array,
+        encode_errors=np.asarray(errors, dtype=np.uint16),
+    )
+
+
+def _one_hot_counts(indices: np.ndarray) -> np.ndarray:
+    """(N, ...) のインデックス（-1 は空き）を (N, 34) の枚数に集計する"""
+    n = indices.shape[0]
+    flat = indices.reshape(n, int(np.prod(indices.shape[1:])))
+    rows = np.repeat(np.arange(n), flat.shape[1])
+    values = flat.ravel().astype(np.int64)
+    present = values >= 0
+    return np.bincount(
+        rows[present] * N_TILES + values[present], minlength=n * N_TILES
+    ).reshape(n, N_TILES)
+
+
+def _invalid_melds(melds: np.ndarray) -> np.ndarray:
+    """(N,) ポン・チー・カンの形でない鳴きを含むか"""
+    sizes = (melds >= 0).sum(axis=2)
+    first, second, third, fourth = (melds[:, :, i].astype(np.int16) for i in range(4))
+    same3 = (first == second) & (second == third)
+    is_kan = (sizes == 4) & same3 & (third == fourth)
+
+    # チーは同じ色の数牌の連続した3枚（並び順は問わない）
+    ordered = np.sort(melds[:, :, :3].astype(np.int16), axis=2)
+    low, mid, high = ordered[:, :, 0], ordered[:, :, 1], ordered[:, :, 2]
+    is_chi = (
+        (mid == low + 1)
+        & (high == low + 2)
+        & (high < _HONOR_START)
+        & (low // 9 == high // 9)
+    )
+    is_pon_or_chi = (sizes == 3) & (same3 | is_chi)
+    return ((sizes > 0) & ~is_kan & ~is_pon_or_chi).any(axis=1)
+
+
+def validate_batch(batch: HandBatch) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    エンコードした手牌をまとめて検証する
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: 正しい手牌の (N,) bool のマスクと、
+        (N,) のエラー（ERROR_MESSAGES のビットの組み合わせ。0 は正しい手牌）
+    """
+    counts = batch.counts.astype(np.int16)
+    codes = batch.encode_errors.copy()
+    n = counts.shape[0]
+
+    total = counts.sum(axis=1)
+    codes[total == 0] |= EMPTY_TILES
+    codes[(counts > 4).any(axis=1)] |= TOO_MANY_COPIES
+
+    meld_counts = _one_hot_counts(batch.melds)
+    codes[(meld_counts > counts).any(axis=1)] |= MELD_NOT_IN_HAND
+    codes[_invalid_melds(batch.melds)] |= INVALID_MELD
+
+    kans = ((batch.melds >= 0).sum(axis=2) == 4).sum(axis=1)
+    codes[total != 14 + kans] |= TILE_COUNT
+
+    win = batch.win_tile.astype(np.int64)
+    has_win = counts[np.arange(n), np.maximum(win, 0)] > 0
+    codes[(win < 0) | ~has_win] |= WIN_TILE_MISSING
+
+    dora_counts = _one_hot_counts(batch.dora)
+    codes[(counts + dora_counts > 4).any(axis=1)] |= INVALID_DORA
+
+    return codes == OK, codes
+
+
+def validate_hands(hands: Iterable[HandLike]) -> Tuple[np.ndarray, np.ndarray]:
+    """encode_hands と validate_batch をまとめて行う"""
+    return validate_batch(encode_hands(hands))
+
+
+def describe_errors(code: int) -> List[str]:
+    """エラーのビットの組み合わせをメッセージのリストにする"""
+    return [message for bit, message in ERROR_MESSAGES.items() if code & bit]
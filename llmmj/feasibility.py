@@ -0,0 +1,283 @@
+"""
+(飜, 符) の目標が達成可能かどうかの判定
+
+手牌の構成要素（面子の種類・副露/暗槓・雀頭・和了牌・ロン/ツモ）の組み合わせを
+列挙して calculate_score で点数計算し、符と条件ごとに最小の飜数と
+その手牌の例を表にしたものを feasibility.json に保存しておく。
+ドラ表示牌を追加すれば飜数はいくらでも増やせるため、
+飜数が最小の飜数以上であれば達成可能とみなす。ただし役満は
+ドラで飜数が増えないため、最小の飜数と一致する場合のみ達成可能とする。
+
+表は点数計算のコードや mahjong ライブラリを更新したら作り直す:
+
+    python -m llmmj.feasibility build
+    python -m llmmj.feasibility check --han 1 --fu 20
+"""
+
+import argparse
+import itertools
+import json
+import logging
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from entity.entity import Hand
+from llmmj import metrics
+from llmmj.llmmj import calculate_score
+
+logger = logging.getLogger(__name__)
+
+TABLE_PATH = Path(__file__).with_name("feasibility.json")
+TABLE_VERSION = 1
+# これ以上の飜数は役満（ドラで飜数が増えない）
+YAKUMAN_HAN = 13
+
+# 面子の種類ごとに使う牌（互いに重ならず、偶然の役ができにくい牌を選んでいる）
+_SEQUENCES = [
+    ["2m", "3m", "4m"],
+    ["6p", "7p", "8p"],
+    ["3s", "4s", "5s"],
+    ["6s", "7s", "8s"],
+]
+_SIMPLE_TILES = ["5m", "2p", "4p", "8m"]
+_TERMINAL_TILES = ["1m", "9s", "2z", "3z"]
+# 雀頭: 役牌でない牌・三元牌・連風牌（自風・場風とも東）
+_PAIRS = ["9p", "5z", "1z"]
+_SEVEN_PAIRS = ["1m", "4m", "7p", "9p", "5s", "2z", "3z"]
+
+# (面子の種類, 副露かどうか)。槓の副露は明槓、門前は暗槓
+_GROUP_KINDS = [
+    (kind, is_open)
+    for kind in (
+        "sequence",
+        "simple_triplet",
+        "terminal_triplet",
+        "simple_kan",
+        "terminal_kan",
+    )
+    for is_open in (False, True)
+]
+
+
+class Constraints(NamedTuple):
+    """表のキー。is_chiitoitsu は七対子かどうか"""
+
+    fu: int
+    is_open: bool
+    is_tsumo: bool
+    is_chiitoitsu: bool
+
+
+def _build_groups(kinds: Tuple[Tuple[str, bool], ...]) -> List[Tuple[List[str], bool]]:
+    sequences = iter(_SEQUENCES)
+    simples = iter(_SIMPLE_TILES)
+    terminals = iter(_TERMINAL_TILES)
+    groups = []
+    for kind, is_open in kinds:
+        if kind == "sequence":
+            tiles = next(sequences)
+        elif kind.startswith("simple"):
+            tiles = [next(simples)] * (4 if kind.endswith("kan") else 3)
+        else:
+            tiles = [next(terminals)] * (4 if kind.endswith("kan") else 3)
+        groups.append((tiles, is_open))
+    return groups
+
+
+def _candidate_hands() -> List[Dict[str, Any]]:
+    """構成要素の組み合わせごとの手牌（役を付ける前）を列挙する"""
+    hands = []
+    for kinds in itertools.combinations_with_replacement(_GROUP_KINDS, 4):
+        groups = _build_groups(kinds)
+        for pair in _PAIRS:
+            tiles = [tile for group, _ in groups for tile in group] + [pair, pair]
+            melds = [
+                {"tiles": group, "is_open": is_open}
+                for group, is_open in groups
+                if is_open or len(group) == 4
+            ]
+            # 和了牌は鳴いていない部分から選ぶ（待ちの形は点数計算で判定される）
+            closed_tiles = {
+                tile
+                for group, is_open in groups
+                if not is_open and len(group) == 3
+                for tile in group
+            } | {pair}
+            for win_tile in sorted(closed_tiles):
+                for is_tsumo in (False, True):
+                    hands.append(
+                        {
+                            "tiles": tiles,
+                            "melds": melds,
+                            "win_tile": win_tile,
+                            "is_tsumo": is_tsumo,
+                        }
+                    )
+    for win_tile in _SEVEN_PAIRS:
+        for is_tsumo in (False, True):
+            hands.append(
+                {
+                    "tiles": [tile for tile in _SEVEN_PAIRS for _ in range(2)],
+                    "melds": [],
+                    "win_tile": win_tile,
+                    "is_tsumo": is_tsumo,
+                }
+            )
+    return hands
+
+
+def _minimal_yaku_flags(is_open: bool, is_tsumo: bool) -> Dict[str, bool]:
+    """符に影響しない1飜の役のフラグ"""
+    if not is_open:
+        return {"is_riichi": True}
+    return {"is_haitei": True} if is_tsumo else {"is_houtei": True}
+
+
+def _score_with_least_han(fields: Dict[str, Any]) -> Optional[Tuple[Hand, Any]]:
+    is_open = any(meld["is_open"] for meld in fields["melds"])
+    base = {**fields, "player_wind": "east", "round_wind": "east"}
+    # 構成要素だけで役がある場合はそのまま、なければ符に影響しない役を1つ付ける
+    for flags in ({}, _minimal_yaku_flags(is_open, fields["is_tsumo"])):
+        hand = Hand(**base, **flags)
+        score = calculate_score(hand)
+        if not score.error and score.han:
+            return hand, score
+    return None
+
+
+def build_table() -> Dict[str, Any]:
+    """構成要素を列挙して実現可能性の表を作る"""
+    entries: Dict[Constraints, Dict[str, Any]] = {}
+    for fields in _candidate_hands():
+        scored = _score_with_least_han(fields)
+        if scored is None:
+            continue
+        hand, score = scored
+        melds = hand.melds or []
+        key = Constraints(
+            fu=score.fu,
+            is_open=any(meld.is_open for meld in melds),
+            is_tsumo=hand.is_tsumo,
+            is_chiitoitsu="Chiitoitsu" in score.yaku,
+        )
+        if key not in entries or score.han < entries[key]["min_han"]:
+            entries[key] = {
+                "min_han": score.han,
+                "yaku": score.yaku,
+                "example": hand.model_dump(exclude_defaults=True),
+            }
+        # 計算のたびに記録されるメトリクスは不要なので捨てる
+        metrics.REGISTRY.drain()
+
+    return {
+        "version": TABLE_VERSION,
+        "entries": [
+            {**key._asdict(), **entry} for key, entry in sorted(entries.items())
+        ],
+    }
+
+
+@lru_cache(maxsize=1)
+def load_table() -> Dict[Constraints, Dict[str, Any]]:
+    """保存した表を読み込む"""
+    table = json.loads(TABLE_PATH.read_text())
+    if table.get("version") != TABLE_VERSION:
+        raise ValueError(
+            f"{TABLE_PATH}: unsupported table version {table.get('version')!r}"
+        )
+    entries = {}
+    for entry in table["entries"]:
+        key = Constraints(*(entry.pop(field) for field in Constraints._fields))
+        entries[key] = entry
+    return entries
+
+
+def _matches(
+    key: Constraints,
+    fu: int,
+    is_open: Optional[bool],
+    is_tsumo: Optional[bool],
+    allow_chiitoitsu: bool,
+) -> bool:
+    return (
+        key.fu == fu
+        and (is_open is None or key.is_open == is_open)
+        and (is_tsumo is None or key.is_tsumo == is_tsumo)
+        and (allow_chiitoitsu or not key.is_chiitoitsu)
+    )
+
+
+def _reachable(min_han: int, han: int) -> bool:
+    if min_han >= YAKUMAN_HAN:
+        return han == min_han
+    return min_han <= han
+
+
+def find_structure(
+    han: int,
+    fu: int,
+    is_open: Optional[bool] = None,
+    is_tsumo: Optional[bool] = None,
+    allow_chiitoitsu: bool = True,
+) -> Optional[Dict[str, Any]]:
+    """
+    (飜, 符) を達成できる最小の構成を返す
+
+    Args:
+        han: 目標の飜数
+        fu: 目標の符数
+        is_open: 副露ありに限る場合はTrue、門前に限る場合はFalse、どちらでもよければNone
+        is_tsumo: ツモに限る場合はTrue、ロンに限る場合はFalse、どちらでもよければNone
+        allow_chiitoitsu: 七対子を許すかどうか
+
+    Returns:
+        Optional[Dict[str, Any]]: 条件・最小の飜数・役・手牌の例。達成できなければNone
+    """
+    candidates = [
+        (entry["min_han"], key, entry)
+        for key, entry in load_table().items()
+        if _matches(key, fu, is_open, is_tsumo, allow_chiitoitsu)
+        and _reachable(entry["min_han"], han)
+    ]
+    if not candidates:
+        return None
+    _, key, entry = min(candidates)
+    return {**key._asdict(), **entry}
+
+
+def is_feasible(
+    han: int,
+    fu: int,
+    is_open: Optional[bool] = None,
+    is_tsumo: Optional[bool] = None,
+    allow_chiitoitsu: bool = True,
+) -> bool:
+    """(飜, 符) を条件を満たす手牌で達成できるかどうか"""
+    return find_structure(han, fu, is_open, is_tsumo, allow_chiitoitsu) is not None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="(han, fu) feasibility table")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("build", help=f"Rebuild {TABLE_PATH.name}")
+    check_parser = subparsers.add_parser("check", help="Check a (han, fu) target")
+    check_parser.add_argument("--han", type=int, required=True)
+    check_parser.add_argument("--fu", type=int, required=True)
+    args = parser.parse_args()
+
+    # 役なしの候補のログで出力が埋もれないようにする
+    logging.basicConfig(level=logging.CRITICAL)
+
+    if args.command == "build":
+        table = build_table()
+        TABLE_PATH.write_text(json.dumps(table, indent=1, ensure_ascii=False) + "\n")
+        print(f"{len(table['entries'])} entries saved to {TABLE_PATH}")
+        return
+
+    structure = find_structure(args.han, args.fu)
+    print(json.dumps(structure, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
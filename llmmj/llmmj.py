@@ -1,17 +1,51 @@
-import json
 import logging
-from typing import List
+import threading
+from collections import OrderedDict
+from itertools import product
+from typing import (
+    Any,
+    Dict,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
 from mahjong.hand_calculating.hand import HandCalculator
 from mahjong.hand_calculating.hand_config import HandConfig
+from mahjong.hand_calculating.hand_response import HandResponse
 from mahjong.meld import Meld
 from mahjong.tile import TilesConverter
 
+from entity.canonical import canonical_key
+from entity.codec import FLAG_FIELDS, TILE_INDEX
+from entity.decoding import decode_hand_json
 from entity.entity import Hand, MeldInfo, ScoreResponse
+from entity.hand_key import HandKey
 from exceptions import HandValidationError, ScoreCalculationError
+from llmmj import log, metrics
+from llmmj.waits import WaitScore, analyze_waits
 
 logger = logging.getLogger(__name__)
 
+# score_conditions で置き換えられる和了の条件
+CONDITION_FIELDS = FLAG_FIELDS + (
+    "player_wind",
+    "round_wind",
+    "dora_indicators",
+    "paarenchan",
+    "kyoutaku_number",
+    "tsumi_number",
+)
+
+# calculate_score_cached で保持する点数計算結果の件数
+SCORE_CACHE_SIZE = 65536
+_score_cache: "OrderedDict[HandKey, ScoreResponse]" = OrderedDict()
+_score_cache_lock = threading.Lock()
+
 
 def convert_tiles_to_136_array(tiles: List[str]) -> List[int]:
     """
@@ -71,12 +105,12 @@ def convert_melds_to_mahjong_format(
     return result
 
 
-def _detect_meld_type(tiles: List[str]) -> str:
+def _detect_meld_type(tiles: Sequence) -> str:
     """
     牌のリストから鳴きの種類を判定する
 
     Args:
-        tiles: 牌のリスト
+        tiles: 牌のリスト（表記または34形式のインデックス）
 
     Returns:
         str: 鳴きの種類 (Meld.CHI, Meld.PON, Meld.KAN)
@@ -96,68 +130,132 @@ def _detect_meld_type(tiles: List[str]) -> str:
         raise ValueError(f"Invalid meld size: {len(tiles)}")
 
 
-def calculate_score(hand: Hand) -> ScoreResponse:
+def _convert_hand(hand: Hand) -> Tuple[List[int], int, List[Meld], List[int]]:
+    """Hand を136形式の手牌・和了牌・鳴き・ドラ表示牌に変換する"""
+    # 鳴きの情報を変換
+    mahjong_melds = convert_melds_to_mahjong_format(hand.melds) if hand.melds else []
+
+    # 手牌を136形式に変換（全ての牌を含める）
+    tiles = convert_tiles_to_136_array(hand.tiles)
+
+    # 和了牌を変換
+    win_tile = convert_tiles_to_136_array([hand.win_tile])[0]
+
+    # ドラ表示牌を変換
+    dora_indicators = (
+        convert_tiles_to_136_array(hand.dora_indicators) if hand.dora_indicators else []
+    )
+    return tiles, win_tile, mahjong_melds, dora_indicators
+
+
+def _indices_to_136_array(indices: Sequence[int]) -> List[int]:
+    """34形式のインデックスを136形式に変換する（同じ牌の2枚目以降は次のIDにする）"""
+    copies: Dict[int, int] = {}
+    result = []
+    for index in indices:
+        copy = copies.get(index, 0)
+        copies[index] = copy + 1
+        result.append(index * 4 + copy)
+    return result
+
+
+def _convert_hand_key(key: HandKey) -> Tuple[List[int], int, List[Meld], List[int]]:
+    """HandKey を136形式の手牌・和了牌・鳴き・ドラ表示牌に変換する"""
+    if key.win_tile < 0:
+        raise ValueError("win_tile is required")
+
+    mahjong_melds = []
+    for meld_tiles, is_open in key.melds or ():
+        meld_type = _detect_meld_type(meld_tiles)
+        # カンの場合はis_openを使用、それ以外は常にTrue
+        opened = is_open if meld_type == Meld.KAN else True
+        mahjong_melds.append(
+            Meld(
+                meld_type=meld_type,
+                tiles=_indices_to_136_array(meld_tiles),
+                opened=opened,
+            )
+        )
+
+    dora_indicators = _indices_to_136_array(key.dora_indicators or ())
+    return (
+        _counts_to_136_array(key.counts),
+        key.win_tile * 4,
+        mahjong_melds,
+        dora_indicators,
+    )
+
+
+def _counts_to_136_array(counts: Sequence[int]) -> List[int]:
+    """34種の枚数を136形式に変換する"""
+    return [i * 4 + copy for i, n in enumerate(counts) for copy in range(n)]
+
+
+def _hand_config(hand: Union[Hand, HandKey]) -> HandConfig:
+    if isinstance(hand, HandKey):
+        flag = hand.flag
+    else:
+
+        def flag(field: str) -> bool:
+            return getattr(hand, field)
+
+    return HandConfig(
+        is_riichi=flag("is_riichi"),
+        is_tsumo=flag("is_tsumo"),
+        is_ippatsu=flag("is_ippatsu"),
+        is_rinshan=flag("is_rinshan"),
+        is_chankan=flag("is_chankan"),
+        is_haitei=flag("is_haitei"),
+        is_houtei=flag("is_houtei"),
+        is_daburu_riichi=flag("is_daburu_riichi"),
+        is_nagashi_mangan=flag("is_nagashi_mangan"),
+        is_tenhou=flag("is_tenhou"),
+        is_chiihou=flag("is_chiihou"),
+        is_open_riichi=flag("is_open_riichi"),
+        player_wind=hand.player_wind,
+        round_wind=hand.round_wind,
+        paarenchan=hand.paarenchan,
+        kyoutaku_number=hand.kyoutaku_number,
+        tsumi_number=hand.tsumi_number,
+    )
+
+
+def calculate_score(hand: Union[Hand, HandKey]) -> ScoreResponse:
     """
     麻雀の点数を計算する
 
     Args:
-        hand: 手牌の情報
-        melds: 鳴きの情報
+        hand: 手牌の情報。HandKey の場合は牌の表記からの変換を省略する
 
     Returns:
         ScoreResponse: 点数計算結果
     """
+    result = None
     try:
         calculator = HandCalculator()
 
-        # 鳴きの情報を変換
-        mahjong_melds = (
-            convert_melds_to_mahjong_format(hand.melds) if hand.melds else []
-        )
-
-        # 手牌を136形式に変換（全ての牌を含める）
-        tiles = convert_tiles_to_136_array(hand.tiles)
-
-        # 和了牌を変換
-        win_tile = convert_tiles_to_136_array([hand.win_tile])[0]
-
-        # ドラ表示牌を変換
-        dora_indicators = (
-            convert_tiles_to_136_array(hand.dora_indicators)
-            if hand.dora_indicators
-            else []
-        )
-        logger.debug(f"Converted dora indicators: {dora_indicators}")
+        with metrics.stage("tile_conversion"):
+            if isinstance(hand, HandKey):
+                tiles, win_tile, mahjong_melds, dora_indicators = _convert_hand_key(
+                    hand
+                )
+            else:
+                tiles, win_tile, mahjong_melds, dora_indicators = _convert_hand(hand)
+        if log.HOT_PATH_DEBUG:
+            logger.debug(f"Converted dora indicators: {dora_indicators}")
 
         # 設定を準備
-        config = HandConfig(
-            is_riichi=hand.is_riichi,
-            is_tsumo=hand.is_tsumo,
-            is_ippatsu=hand.is_ippatsu,
-            is_rinshan=hand.is_rinshan,
-            is_chankan=hand.is_chankan,
-            is_haitei=hand.is_haitei,
-            is_houtei=hand.is_houtei,
-            is_daburu_riichi=hand.is_daburu_riichi,
-            is_nagashi_mangan=hand.is_nagashi_mangan,
-            is_tenhou=hand.is_tenhou,
-            is_chiihou=hand.is_chiihou,
-            is_open_riichi=hand.is_open_riichi,
-            player_wind=hand.player_wind,
-            round_wind=hand.round_wind,
-            paarenchan=hand.paarenchan,
-            kyoutaku_number=hand.kyoutaku_number,
-            tsumi_number=hand.tsumi_number,
-        )
+        config = _hand_config(hand)
 
         # 点数計算
-        result = calculator.estimate_hand_value(
-            tiles,
-            win_tile,
-            melds=mahjong_melds,
-            dora_indicators=dora_indicators,
-            config=config,
-        )
+        with metrics.stage("estimate_hand_value"):
+            result = calculator.estimate_hand_value(
+                tiles,
+                win_tile,
+                melds=mahjong_melds,
+                dora_indicators=dora_indicators,
+                config=config,
+            )
 
         # 結果を変換
         if result is None:
@@ -179,7 +277,233 @@ def calculate_score(hand: Hand) -> ScoreResponse:
             f"Error during score calculation: {str(e)}, result: {result if result else 'None'}",
             exc_info=True,
         )
-        raise ScoreCalculationError(f"Error during score calculation: {str(e)}") from e
+        error = ScoreCalculationError(f"Error during score calculation: {str(e)}")
+        metrics.record_error(error)
+        raise error from e
+
+
+class ConditionScore(NamedTuple):
+    """score_conditions の1行（和了の条件1通り分）"""
+
+    conditions: Dict[str, Any]
+    han: int
+    fu: int
+    score: int
+    yaku: Tuple[str, ...]
+    error: Optional[str] = None
+
+
+def score_all_waits(
+    hand13: Sequence[str],
+    melds: Optional[Sequence[MeldInfo]] = None,
+    dora: Optional[Sequence[str]] = None,
+    config: Optional[Dict[str, Any]] = None,
+) -> List[WaitScore]:
+    """
+    聴牌の手牌の全ての和了牌について、ロンとツモの点数をまとめて計算する
+
+    和了牌は llmmj.waits の分解表で求める。手牌・鳴き・ドラ表示牌の変換と
+    HandCalculator・HandConfig の生成は1回だけ行い、和了牌ごとの面子分解は
+    mahjong ライブラリの分解キャッシュでロンとツモに共有する。
+
+    Args:
+        hand13: 和了牌を含まない手牌（鳴きの牌も含む。カンは4枚）
+        melds: 鳴き
+        dora: ドラ表示牌
+        config: is_riichi や player_wind など Hand の和了の条件。is_tsumo は無視する
+
+    Returns:
+        List[WaitScore]: 和了牌ごとにロン・ツモの順に並べた表。聴牌していない場合は空。
+        役がないなどで和了にならない行は error に理由が入る
+
+    Raises:
+        HandValidationError: 手牌の牌の表記や枚数が不正な場合
+        ValueError: config やドラ表示牌が不正な場合
+    """
+    analysis = analyze_waits(hand13, melds)
+    if not analysis.waits:
+        return []
+
+    config = {key: value for key, value in (config or {}).items() if key != "is_tsumo"}
+    base = HandKey.from_hand(
+        Hand(
+            tiles=list(hand13),
+            melds=list(melds) if melds else None,
+            win_tile="",
+            dora_indicators=list(dora) if dora is not None else None,
+            **config,
+        )
+    )
+    # 和了牌によらない部分は最初の和了牌で変換しておく
+    _, _, mahjong_melds, dora_indicators = _convert_hand_key(
+        HandKey(base.counts, base.melds, 0, base.dora_indicators)
+    )
+    configs = [
+        (is_tsumo, _hand_config(_with_conditions(base, {"is_tsumo": is_tsumo})))
+        for is_tsumo in (False, True)
+    ]
+
+    calculator = HandCalculator()
+    counts = list(base.counts)
+    rows = []
+    with metrics.stage("score_all_waits"):
+        for wait in analysis.waits:
+            index = TILE_INDEX[wait.tile]
+            counts[index] += 1
+            tiles = _counts_to_136_array(counts)
+            counts[index] -= 1
+            for is_tsumo, hand_config in configs:
+                result = calculator.estimate_hand_value(
+                    tiles,
+                    index * 4,
+                    melds=mahjong_melds,
+                    dora_indicators=dora_indicators,
+                    config=hand_config,
+                    use_hand_divider_cache=True,
+                )
+                rows.append(
+                    WaitScore(
+                        tile=wait.tile,
+                        wait_types=wait.wait_types,
+                        wait_fu=wait.fu,
+                        is_tsumo=is_tsumo,
+                        **_result_fields(result),
+                    )
+                )
+    return rows
+
+
+def _result_fields(result: HandResponse) -> Dict[str, Any]:
+    """HandResponse から表の1行分の han / fu / score / yaku / error を取り出す"""
+    return {
+        "han": result.han or 0,
+        "fu": result.fu or 0,
+        "score": result.cost["main"] if result.cost else 0,
+        "yaku": tuple(yaku.name for yaku in result.yaku or ()),
+        "error": result.error,
+    }
+
+
+def _with_conditions(key: HandKey, conditions: Mapping[str, Any]) -> HandKey:
+    """
+    和了の条件 (CONDITION_FIELDS) を置き換えた HandKey を返す
+
+    Raises:
+        ValueError: CONDITION_FIELDS 以外の条件や、不正なドラ表示牌を含む場合
+    """
+    values = dict(zip(HandKey.__slots__, key._values()))
+    for name, value in conditions.items():
+        if name in FLAG_FIELDS:
+            bit = 1 << FLAG_FIELDS.index(name)
+            values["flags"] = values["flags"] | bit if value else values["flags"] & ~bit
+        elif name == "dora_indicators":
+            try:
+                values[name] = (
+                    None if value is None else tuple(TILE_INDEX[tile] for tile in value)
+                )
+            except KeyError as e:
+                raise ValueError(
+                    f"Invalid tile {e.args[0]!r} in dora_indicators"
+                ) from None
+        elif name in CONDITION_FIELDS:
+            values[name] = value
+        else:
+            raise ValueError(f"Unknown condition: {name}")
+    return HandKey(**values)
+
+
+def score_conditions(
+    hand: Union[Hand, HandKey], variants: Sequence[Mapping[str, Any]]
+) -> List[ConditionScore]:
+    """
+    同じ牌姿を複数の和了の条件で点数計算する
+
+    手牌・和了牌・鳴きの変換と HandCalculator の生成は1回だけ行い、面子分解は
+    mahjong ライブラリの分解キャッシュで全ての条件に共有する。
+
+    Args:
+        hand: 牌姿（tiles / melds / win_tile）と既定の条件
+        variants: 条件ごとに置き換える CONDITION_FIELDS の値
+            (例: {"is_riichi": True, "dora_indicators": ["1m"]})
+
+    Returns:
+        List[ConditionScore]: variants と同じ順の点数計算結果。和了にならない条件は
+        error に理由が入る
+
+    Raises:
+        ValueError: 条件や牌の表記が不正な場合
+    """
+    base = hand if isinstance(hand, HandKey) else HandKey.from_hand(hand)
+    keys = [_with_conditions(base, conditions) for conditions in variants]
+    tiles, win_tile, mahjong_melds, _ = _convert_hand_key(base)
+
+    calculator = HandCalculator()
+    rows = []
+    with metrics.stage("score_conditions"):
+        for conditions, key in zip(variants, keys):
+            result = calculator.estimate_hand_value(
+                tiles,
+                win_tile,
+                melds=mahjong_melds,
+                dora_indicators=_indices_to_136_array(key.dora_indicators or ()),
+                config=_hand_config(key),
+                use_hand_divider_cache=True,
+            )
+            rows.append(ConditionScore(dict(conditions), **_result_fields(result)))
+    return rows
+
+
+def sweep_conditions(
+    hand: Union[Hand, HandKey], grid: Mapping[str, Sequence[Any]]
+) -> List[ConditionScore]:
+    """
+    条件の全ての組み合わせで点数計算する
+
+    Args:
+        grid: CONDITION_FIELDS → 試す値のリスト
+            (例: {"is_riichi": [False, True], "is_tsumo": [False, True]})
+
+    Returns:
+        List[ConditionScore]: grid の直積の順の点数計算結果
+    """
+    variants = [dict(zip(grid, values)) for values in product(*grid.values())]
+    return score_conditions(hand, variants)
+
+
+def calculate_score_cached(hand: Union[Hand, HandKey]) -> ScoreResponse:
+    """
+    calculate_score の結果を、対称性で正規化した手牌をキーにキャッシュする
+
+    色の入れ替えや数字の反転で移り合う手牌 (entity.canonical) は同じ結果を共有する。
+    飜・符・点数・役は元の手牌を計算した場合と同じだが、同じ符になる待ちの解釈が
+    複数ある手牌では fu_details の待ちの名前（嵌張/単騎など）が異なることがある。
+
+    Raises:
+        ScoreCalculationError: 点数計算に失敗した場合（失敗はキャッシュしない）
+    """
+    try:
+        key = canonical_key(hand)
+    except ValueError:
+        # 34種の牌の表記以外の牌を含む手牌はキャッシュしない
+        return calculate_score(hand)
+
+    with _score_cache_lock:
+        result = _score_cache.get(key)
+        if result is not None:
+            _score_cache.move_to_end(key)
+    metrics.record_cache("score", result is not None)
+    if result is None:
+        result = calculate_score(key)
+        with _score_cache_lock:
+            _score_cache[key] = result
+            if len(_score_cache) > SCORE_CACHE_SIZE:
+                _score_cache.popitem(last=False)
+    return result.model_copy(deep=True)
+
+
+def clear_score_cache() -> None:
+    with _score_cache_lock:
+        _score_cache.clear()
 
 
 def validate_tiles(tiles: List[str]) -> bool:
@@ -193,7 +517,8 @@ def validate_tiles(tiles: List[str]) -> bool:
         bool: 正しい形式かどうか
     """
     try:
-        logger.debug(f"Validating tiles: {tiles}")
+        if log.HOT_PATH_DEBUG:
+            logger.debug(f"Validating tiles: {tiles}")
         convert_tiles_to_136_array(tiles)
         return True
     except Exception as e:
@@ -234,7 +559,19 @@ def validate_meld(tiles: List[str], melds: List[MeldInfo]) -> bool:
     return True
 
 
-def validate_hand(hand: Hand):
+def validate_hand(hand: Union[Hand, HandKey]):
+    with metrics.stage("validate_hand"):
+        try:
+            if isinstance(hand, HandKey):
+                _validate_hand_key(hand)
+            else:
+                _validate_hand(hand)
+        except HandValidationError as e:
+            metrics.record_error(e)
+            raise
+
+
+def _validate_hand(hand: Hand):
     # Handle error cases where hand has empty tiles
     if not hand.tiles:
         raise HandValidationError("Invalid tile format in tiles. tiles is required")
@@ -262,8 +599,24 @@ def validate_hand(hand: Hand):
         raise HandValidationError("Invalid win tile in hand. win_tile is not in tiles")
 
 
+def _validate_hand_key(key: HandKey):
+    """_validate_hand と同じ検証を HandKey に対して行う（牌の表記は生成時に検証済み）"""
+    if key.tile_count == 0:
+        raise HandValidationError("Invalid tile format in tiles. tiles is required")
+
+    # meldsに存在する牌は全てtilesに含まれているべき
+    for meld_tiles, _ in key.melds or ():
+        if any(key.counts[index] == 0 for index in meld_tiles):
+            raise HandValidationError("Invalid meld in hand. melds is not valid")
+
+    if key.tile_count < 14:
+        raise HandValidationError("Invalid tile count in hand. tiles is less than 14")
+
+    if key.win_tile >= 0 and key.counts[key.win_tile] == 0:
+        raise HandValidationError("Invalid win tile in hand. win_tile is not in tiles")
+
+
 def calculate_score_with_json(json_str: str) -> ScoreResponse:
-    hand_data = json.loads(json_str)
-    hand = Hand(**hand_data)
+    hand = decode_hand_json(json_str)
     validate_hand(hand)
     return calculate_score(hand)
@@ -0,0 +1,172 @@
+"""
+ログ出力の設定
+
+- ログの書き込みは QueueListener のバックグラウンドスレッドで行い、
+  リクエスト処理のスレッドではキューへの追加のみ行う
+- ログはJSON形式の構造化ログとして出力する
+- extra={"route": ...} を持つログはルートごとのサンプリング率で間引く
+- 点数計算のホットパスのデバッグログは HOT_PATH_DEBUG が有効な場合のみ出力する
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+# ホットパスのデバッグログを出力するかどうか。
+# 呼び出し側で `if log.HOT_PATH_DEBUG:` と判定してからログを組み立てるため、
+# 無効時はメッセージの生成コストもかからない
+HOT_PATH_DEBUG = os.environ.get("LLMMJ_HOT_PATH_DEBUG", "") == "1"
+
+# HOT_PATH_DEBUG が有効な場合にDEBUGレベルにするロガー
+HOT_PATH_LOGGERS = ("apimcp", "llmmj", "tools")
+
+# ルートごとのサンプリング率のデフォルト値
+DEFAULT_SAMPLE_RATES: Dict[str, float] = {
+    "/calculate": 0.1,
+    "/calculate/batch": 1.0,
+    "/health": 0.0,
+}
+
+# LogRecord の標準属性（これ以外の属性は extra として構造化ログに含める）
+_RESERVED_ATTRS = set(
+    logging.LogRecord("", 0, "", 0, "", None, None).__dict__.keys()
+) | {"message", "asctime", "taskName"}
+
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional[QueueHandler] = None
+
+
+def set_hot_path_debug(enabled: bool) -> None:
+    """Enable or disable debug logs on the scoring hot path."""
+    global HOT_PATH_DEBUG
+    HOT_PATH_DEBUG = enabled
+
+
+def parse_sample_rates(value: str) -> Dict[str, float]:
+    """
+    サンプリング率の設定文字列をパースする
+
+    Args:
+        value: "/calculate=0.01,/health=0" 形式の文字列
+
+    Returns:
+        Dict[str, float]: ルートごとのサンプリング率
+    """
+    rates = {}
+    for item in value.split(","):
+        if not item.strip():
+            continue
+        route, rate = item.rsplit("=", 1)
+        rates[route.strip()] = float(rate)
+    return rates
+
+
+class JsonFormatter(logging.Formatter):
+    """Format log records as single-line JSON."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                data[key] = value
+        if record.exc_info:
+            data["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class RouteSamplingFilter(logging.Filter):
+    """Sample log records that have a route attribute by per-route rates.
+
+    Records without a route and records at WARNING or above are always kept.
+    """
+
+    def __init__(self, sample_rates: Dict[str, float], default_rate: float = 1.0):
+        super().__init__()
+        self.sample_rates = sample_rates
+        self.default_rate = default_rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        route = getattr(record, "route", None)
+        if route is None or record.levelno >= logging.WARNING:
+            return True
+        rate = self.sample_rates.get(route, self.default_rate)
+        return rate >= 1.0 or random.random() < rate
+
+
+def setup_logging(
+    log_file: Optional[str] = "api.log",
+    level: int = logging.INFO,
+    sample_rates: Optional[Dict[str, float]] = None,
+) -> QueueListener:
+    """
+    キュー経由でバックグラウンド出力するロギングを設定する
+
+    2回目以降の呼び出しでは既存のリスナーを返す。
+
+    Args:
+        log_file: 出力先のファイル。Noneの場合は標準出力のみ
+        level: ルートロガーのログレベル
+        sample_rates: ルートごとのサンプリング率。Noneの場合は
+            DEFAULT_SAMPLE_RATES と環境変数 LLMMJ_LOG_SAMPLE_RATES から決める
+
+    Returns:
+        QueueListener: 開始済みのリスナー
+    """
+    global _listener, _queue_handler
+    if _listener is not None:
+        return _listener
+
+    if sample_rates is None:
+        sample_rates = {
+            **DEFAULT_SAMPLE_RATES,
+            **parse_sample_rates(os.environ.get("LLMMJ_LOG_SAMPLE_RATES", "")),
+        }
+
+    formatter = JsonFormatter()
+    handlers = [logging.StreamHandler(sys.stdout)]
+    if log_file:
+        handlers.append(logging.FileHandler(log_file))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    _queue_handler = QueueHandler(log_queue)
+    # キューに積む前に間引く
+    _queue_handler.addFilter(RouteSamplingFilter(sample_rates))
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(_queue_handler)
+    if HOT_PATH_DEBUG:
+        for name in HOT_PATH_LOGGERS:
+            logging.getLogger(name).setLevel(logging.DEBUG)
+
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+    return _listener
+
+
+def shutdown_logging() -> None:
+    """リスナーを停止し、キューに残ったログを書き出す"""
+    global _listener, _queue_handler
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _queue_handler = None
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
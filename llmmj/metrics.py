@@ -0,0 +1,287 @@
+"""
+軽量なメトリクス収集 (Prometheus テキスト形式)
+
+点数計算の各ステージの処理時間、エラー数、キャッシュのヒット数などを記録する。
+点数計算はワーカープロセスでも実行されるため、ワーカー側で記録した値は
+drain() で取り出して親プロセスの REGISTRY に merge() する。
+"""
+
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# 処理時間のヒストグラムのバケット（秒）
+DEFAULT_BUCKETS = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_labels(labelnames: Sequence[str], values: Sequence[str]) -> str:
+    if not labelnames:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)
+    )
+    return "{" + pairs + "}"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        return self._values.get(key, 0.0)
+
+    def drain(self) -> Dict[LabelValues, float]:
+        with self._lock:
+            values, self._values = self._values, {}
+        return values
+
+    def merge(self, values: Dict[LabelValues, float]) -> None:
+        with self._lock:
+            for key, value in values.items():
+                self._values[key] = self._values.get(key, 0.0) + value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in items
+        ]
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # ラベルごとに [各バケットの件数..., 合計値, 件数]
+        self._values: Dict[LabelValues, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            data = self._values.get(key)
+            if data is None:
+                data = self._values[key] = [0.0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    data[i] += 1
+                    break
+            data[-2] += value
+            data[-1] += 1
+
+    def count(self, **labels: str) -> float:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        data = self._values.get(key)
+        return data[-1] if data else 0.0
+
+    def drain(self) -> Dict[LabelValues, List[float]]:
+        with self._lock:
+            values, self._values = self._values, {}
+        return values
+
+    def merge(self, values: Dict[LabelValues, List[float]]) -> None:
+        with self._lock:
+            for key, other in values.items():
+                data = self._values.get(key)
+                if data is None:
+                    self._values[key] = list(other)
+                else:
+                    for i, value in enumerate(other):
+                        data[i] += value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, list(data)) for key, data in self._values.items())
+        lines = []
+        labelnames = self.labelnames + ("le",)
+        for key, data in items:
+            cumulative = 0.0
+            for bound, bucket_count in zip(self.buckets, data):
+                cumulative += bucket_count
+                labels = _format_labels(labelnames, key + (_format_value(bound),))
+                lines.append(f"{self.name}_bucket{labels} {_format_value(cumulative)}")
+            labels = _format_labels(labelnames, key + ("+Inf",))
+            lines.append(f"{self.name}_bucket{labels} {_format_value(data[-1])}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(data[-2])}")
+            lines.append(f"{self.name}_count{labels} {_format_value(data[-1])}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, Any] = {}
+
+    def register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def drain(self) -> Dict[str, Dict]:
+        """記録済みの値を取り出してリセットする（ワーカープロセス用）"""
+        return {name: metric.drain() for name, metric in self._metrics.items()}
+
+    def merge(self, snapshot: Dict[str, Dict]) -> None:
+        """drain() で取り出した値を加算する"""
+        for name, values in snapshot.items():
+            metric = self._metrics.get(name)
+            if metric is not None and values:
+                metric.merge(values)
+
+    def render(self) -> str:
+        """Prometheus テキスト形式で出力する"""
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.register(
+    Histogram(
+        "llmmj_stage_seconds",
+        "Time spent in each scoring stage",
+        labelnames=("stage",),
+    )
+)
+ERRORS = REGISTRY.register(
+    Counter("llmmj_errors_total", "Number of errors by type", labelnames=("type",))
+)
+CACHE_REQUESTS = REGISTRY.register(
+    Counter(
+        "llmmj_cache_requests_total",
+        "Number of cache lookups by cache and result (hit/miss)",
+        labelnames=("cache", "result"),
+    )
+)
+HTTP_REQUESTS = REGISTRY.register(
+    Counter(
+        "llmmj_http_requests_total",
+        "Number of HTTP requests by route and status",
+        labelnames=("route", "status"),
+    )
+)
+HTTP_REQUEST_SECONDS = REGISTRY.register(
+    Histogram(
+        "llmmj_http_request_seconds",
+        "HTTP request latency by route",
+        labelnames=("route",),
+    )
+)
+# LLMの呼び出しの所要時間のバケット（秒）
+LLM_BUCKETS = (0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 40.0, 80.0, 160.0)
+SPECULATIVE_CANDIDATES = REGISTRY.register(
+    Counter(
+        "llmmj_speculative_candidates_total",
+        "Number of speculative candidates by outcome",
+        labelnames=("outcome",),
+    )
+)
+SPECULATIVE_SAVED_SECONDS = REGISTRY.register(
+    Histogram(
+        "llmmj_speculative_saved_seconds",
+        "Time saved by generating candidates in parallel instead of retrying serially",
+        buckets=LLM_BUCKETS,
+    )
+)
+EVENT_LOOP_LAG_SECONDS = REGISTRY.register(
+    Histogram(
+        "llmmj_event_loop_lag_seconds",
+        "Delay of the event loop in waking up a periodic task",
+    )
+)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """処理時間を llmmj_stage_seconds に記録する"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - start, stage=name)
+
+
+def observe_stage(name: str, seconds: float) -> None:
+    """stage() で囲めない処理の時間を llmmj_stage_seconds に記録する"""
+    STAGE_SECONDS.observe(seconds, stage=name)
+
+
+def record_error(error: BaseException) -> None:
+    ERRORS.inc(type=type(error).__name__)
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def call_with_metrics(
+    fn: Callable[..., Any], *args: Any
+) -> Tuple[Any, Optional[Dict[str, Dict]]]:
+    """
+    ワーカープロセスで関数を実行し、結果と記録したメトリクスを返す
+
+    Returns:
+        Tuple[Any, Dict]: 関数の戻り値と REGISTRY.drain() の結果
+    """
+    try:
+        result = fn(*args)
+    except Exception as e:
+        # 例外にメトリクスを載せて親プロセスに渡す
+        e.metrics = REGISTRY.drain()
+        raise
+    return result, REGISTRY.drain()
@@ -0,0 +1,294 @@
+"""
+共有メモリを使った一括点数計算
+
+Hand を ProcessPoolExecutor のワーカーに渡すと1件ずつ pickle され、小さな手牌では
+点数計算と同じくらいの時間がかかる。ここでは手牌を固定長の NumPy の構造化配列
+(HAND_DTYPE) に詰めて multiprocessing.shared_memory に置き、ワーカーには
+共有メモリの名前と担当する行の範囲だけを渡す。ワーカーは手牌をその場で読み、
+結果を共有メモリ上の結果の配列 (RESULT_DTYPE) に直接書き込む。
+
+結果の error は SCORE_ERRORS のインデックス（0 は和了）で、mahjong ライブラリの
+エラー（役なし・和了形でないなど）と、エンコードできない手牌 (ERROR_INVALID_HAND)、
+点数計算中の例外 (ERROR_CALCULATION) を区別する。
+"""
+
+from contextlib import ExitStack
+from multiprocessing.shared_memory import SharedMemory
+from typing import Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from mahjong.hand_calculating.hand import HandCalculator
+
+from entity.codec import WINDS
+from entity.entity import Hand
+from entity.hand_key import HandKey
+from llmmj import metrics
+from llmmj.llmmj import _convert_hand_key, _hand_config
+from llmmj.workers import forkserver_executor, map_with_metrics
+
+MAX_MELDS = 4
+MAX_MELD_TILES = 4
+MAX_DORA = 10
+# 1回のタスクで点数計算する行数
+CHUNK_SIZE = 512
+
+_PAD = -1
+_WIND_INDEX = {wind: index for index, wind in enumerate(WINDS)}
+
+HAND_DTYPE = np.dtype(
+    [
+        ("counts", np.uint8, 34),
+        # 鳴きの牌のインデックス。空きは -1
+        ("melds", np.int8, (MAX_MELDS, MAX_MELD_TILES)),
+        ("meld_open", np.bool_, MAX_MELDS),
+        ("win_tile", np.int8),
+        # ドラ表示牌のインデックス。空きは -1
+        ("dora_indicators", np.int8, MAX_DORA),
+        # FLAG_FIELDS の順に並べたフラグのビット列
+        ("flags", np.uint16),
+        # WINDS のインデックス（0: None）
+        ("player_wind", np.uint8),
+        ("round_wind", np.uint8),
+        ("paarenchan", np.uint8),
+        ("kyoutaku_number", np.uint8),
+        ("tsumi_number", np.uint8),
+        # False の行はエンコードできなかった手牌
+        ("valid", np.bool_),
+    ]
+)
+RESULT_DTYPE = np.dtype(
+    [
+        ("han", np.int16),
+        ("fu", np.int16),
+        ("score", np.int32),
+        ("error", np.uint8),
+    ]
+)
+
+ERROR_NO_VALID_HAND = "No valid hand found"
+ERROR_INVALID_HAND = "invalid hand"
+ERROR_CALCULATION = "score calculation failed"
+# 結果の error のインデックス → エラーの内容（0 は和了）
+SCORE_ERRORS: Tuple[Optional[str], ...] = (
+    (None,)
+    + tuple(
+        sorted(
+            getattr(HandCalculator, name)
+            for name in dir(HandCalculator)
+            if name.startswith("ERR_")
+        )
+    )
+    + (ERROR_NO_VALID_HAND, ERROR_INVALID_HAND, ERROR_CALCULATION)
+)
+_ERROR_CODES = {error: code for code, error in enumerate(SCORE_ERRORS)}
+
+
+def _hand_row(key: HandKey) -> Tuple:
+    """HandKey を HAND_DTYPE の1行にする"""
+    melds = key.melds or ()
+    dora = key.dora_indicators or ()
+    if (
+        len(melds) > MAX_MELDS
+        or any(len(tiles) > MAX_MELD_TILES for tiles, _ in melds)
+        or len(dora) > MAX_DORA
+    ):
+        raise ValueError("Too many melds, meld tiles or dora indicators")
+    if max(key.counts) > np.iinfo(np.uint8).max:
+        raise ValueError("Too many copies of a tile")
+
+    meld_tiles = [[_PAD] * MAX_MELD_TILES for _ in range(MAX_MELDS)]
+    meld_open = [False] * MAX_MELDS
+    for m, (tiles, is_open) in enumerate(melds):
+        meld_tiles[m][: len(tiles)] = tiles
+        meld_open[m] = is_open
+    return (
+        key.counts,
+        meld_tiles,
+        meld_open,
+        key.win_tile,
+        tuple(dora) + (_PAD,) * (MAX_DORA - len(dora)),
+        key.flags,
+        _WIND_INDEX[key.player_wind],
+        _WIND_INDEX[key.round_wind],
+        key.paarenchan,
+        key.kyoutaku_number,
+        key.tsumi_number,
+        True,
+    )
+
+
+def pack_hands(
+    hands: Sequence[Union[Hand, HandKey]], out: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    手牌を HAND_DTYPE の配列に詰める
+
+    牌の表記が不正な手牌や、鳴き・ドラ表示牌・風が固定長に収まらない手牌は
+    valid=False の行になり、点数計算の結果は ERROR_INVALID_HAND になる。
+
+    Args:
+        out: 書き込み先の配列（共有メモリ上の配列など）。None の場合は新しく作る
+    """
+    if out is None:
+        out = np.empty(len(hands), dtype=HAND_DTYPE)
+    invalid = np.zeros((), dtype=HAND_DTYPE)
+    invalid["win_tile"] = _PAD
+    rows = []
+    for hand in hands:
+        try:
+            key = hand if isinstance(hand, HandKey) else HandKey.from_hand(hand)
+            rows.append(_hand_row(key))
+        except (KeyError, ValueError, OverflowError):
+            rows.append(invalid.item())
+    out[:] = np.array(rows, dtype=HAND_DTYPE)
+    return out
+
+
+def unpack_hand(row: np.void) -> HandKey:
+    """HAND_DTYPE の1行から HandKey を復元する"""
+    melds = tuple(
+        (tuple(int(index) for index in tiles if index >= 0), bool(is_open))
+        for tiles, is_open in zip(row["melds"], row["meld_open"])
+        if tiles[0] >= 0
+    )
+    dora = tuple(int(index) for index in row["dora_indicators"] if index >= 0)
+    return HandKey(
+        tuple(row["counts"].tolist()),
+        melds or None,
+        int(row["win_tile"]),
+        dora or None,
+        int(row["flags"]),
+        WINDS[row["player_wind"]],
+        WINDS[row["round_wind"]],
+        int(row["paarenchan"]),
+        int(row["kyoutaku_number"]),
+        int(row["tsumi_number"]),
+    )
+
+
+def score_records(hands: np.ndarray, results: np.ndarray) -> None:
+    """
+    HAND_DTYPE の配列を点数計算し、同じ長さの RESULT_DTYPE の配列に書き込む
+
+    共有メモリ上の配列のスライスをそのまま渡せる。
+    """
+    calculator = HandCalculator()
+    for i, row in enumerate(hands):
+        han = fu = score = 0
+        if not row["valid"]:
+            error = ERROR_INVALID_HAND
+        else:
+            try:
+                key = unpack_hand(row)
+                tiles, win_tile, melds, dora_indicators = _convert_hand_key(key)
+                result = calculator.estimate_hand_value(
+                    tiles,
+                    win_tile,
+                    melds=melds,
+                    dora_indicators=dora_indicators,
+                    config=_hand_config(key),
+                    use_hand_divider_cache=True,
+                )
+            except Exception:
+                error = ERROR_CALCULATION
+            else:
+                if result is None:
+                    error = ERROR_NO_VALID_HAND
+                else:
+                    error = result.error
+                    han = result.han or 0
+                    fu = result.fu or 0
+                    score = result.cost["main"] if result.cost else 0
+        results[i] = (
+            han,
+            fu,
+            score,
+            _ERROR_CODES.get(error, _ERROR_CODES[ERROR_CALCULATION]),
+        )
+
+
+def _attach(name: str, dtype: np.dtype, size: int) -> Tuple[SharedMemory, np.ndarray]:
+    shm = SharedMemory(name=name)
+    return shm, np.ndarray((size,), dtype=dtype, buffer=shm.buf)
+
+
+def score_shared_slice(
+    hands_name: str, results_name: str, size: int, start: int, stop: int
+) -> None:
+    """共有メモリ上の手牌の start から stop までの行を点数計算する"""
+    hands_shm, hands = _attach(hands_name, HAND_DTYPE, size)
+    results_shm, results = _attach(results_name, RESULT_DTYPE, size)
+    try:
+        score_records(hands[start:stop], results[start:stop])
+    finally:
+        # 共有メモリを閉じる前に配列の参照を外す
+        del hands, results
+        hands_shm.close()
+        results_shm.close()
+
+
+def _chunks(size: int, chunk_size: int) -> Iterator[Tuple[int, int]]:
+    for start in range(0, size, chunk_size):
+        yield start, min(start + chunk_size, size)
+
+
+def score_batch(
+    hands: Sequence[Union[Hand, HandKey]],
+    workers: int = 1,
+    chunk_size: int = CHUNK_SIZE,
+) -> np.ndarray:
+    """
+    手牌をまとめて点数計算する
+
+    workers が2以上の場合は手牌と結果の配列を共有メモリに置き、行の範囲ごとに
+    ワーカープロセスで点数計算する。ワーカーに渡すのは共有メモリの名前と行の範囲
+    だけで、手牌は pickle しない。
+
+    Args:
+        hands: 手牌
+        workers: ワーカープロセス数。1の場合は現在のプロセスで実行する
+        chunk_size: 1回のタスクで点数計算する行数
+
+    Returns:
+        np.ndarray: hands と同じ順の RESULT_DTYPE の配列 (han / fu / score / error)。
+        error は SCORE_ERRORS のインデックス
+    """
+    size = len(hands)
+    if workers <= 1 or size <= chunk_size:
+        results = np.zeros(size, dtype=RESULT_DTYPE)
+        with metrics.stage("score_batch"):
+            score_records(pack_hands(hands), results)
+        return results
+
+    with ExitStack() as stack:
+        shared = []
+        for dtype in (HAND_DTYPE, RESULT_DTYPE):
+            shm = SharedMemory(create=True, size=max(dtype.itemsize * size, 1))
+            stack.callback(shm.unlink)
+            stack.callback(shm.close)
+            shared.append((shm, np.ndarray((size,), dtype=dtype, buffer=shm.buf)))
+        (hands_shm, hands_array), (results_shm, results_array) = shared
+        pack_hands(hands, out=hands_array)
+
+        chunks = list(_chunks(size, chunk_size))
+        with metrics.stage("score_batch"):
+            with forkserver_executor(workers, ["llmmj.shared_scoring"]) as executor:
+                list(
+                    map_with_metrics(
+                        executor,
+                        score_shared_slice,
+                        [hands_shm.name] * len(chunks),
+                        [results_shm.name] * len(chunks),
+                        [size] * len(chunks),
+                        *zip(*chunks),
+                    )
+                )
+        results = results_array.copy()
+        # 共有メモリを閉じる前に配列の参照を外す
+        del shared, hands_array, results_array
+    return results
+
+
+def describe_results(results: np.ndarray) -> List[Optional[str]]:
+    """結果の error のインデックスをエラーの内容にする（和了は None）"""
+    return [SCORE_ERRORS[code] for code in results["error"]]
@@ -1,10 +1,18 @@
-from typing import Any, Dict, List, Optional
+import asyncio
+import json
+import logging
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 from langchain_core.tools import BaseTool
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ValidationError
 
 from entity.entity import Hand, MeldInfo
+from exceptions import HandValidationError, ScoreCalculationError
+from llmmj import log
 from llmmj.llmmj import calculate_score, validate_hand
+from tools.calculation import VERBOSITY_FULL, Verbosity, compact_score_result
+
+logger = logging.getLogger(__name__)
 
 
 def _is_valid_chi(sorted_tiles: List[str]) -> bool:
@@ -106,70 +114,168 @@ class CalculateMahjongScoreTool(BaseTool):
         "Calculate mahjong score. Computes han, fu, and points from hand tiles, "
     )
     args_schema: type[BaseModel] = MahjongScoreInput
+    verbosity: Optional[Verbosity] = None
 
     def _run(self, **kwargs) -> Dict[str, Any]:
         """Execute the tool."""
         try:
-            # Convert melds to proper format
-            melds = kwargs.get("melds", [])
-            converted_melds = []
-            for meld in melds:
-                if isinstance(meld, dict) and "tiles" in meld:
-                    converted_melds.append(
-                        MeldInfo(tiles=meld["tiles"], is_open=meld.get("is_open", True))
-                    )
-                else:
-                    converted_melds.append(meld)
-
-            # Create Hand object with all necessary fields
-            hand = Hand(
-                tiles=kwargs.get("tiles", []),
-                win_tile=kwargs.get("win_tile", ""),
-                melds=converted_melds,
-                dora_indicators=kwargs.get("dora_indicators", []),
-                is_riichi=kwargs.get("is_riichi", False),
-                is_tsumo=kwargs.get("is_tsumo", False),
-                is_ippatsu=kwargs.get("is_ippatsu", False),
-                is_rinshan=kwargs.get("is_rinshan", False),
-                is_chankan=kwargs.get("is_chankan", False),
-                is_haitei=kwargs.get("is_haitei", False),
-                is_houtei=kwargs.get("is_houtei", False),
-                is_daburu_riichi=kwargs.get("is_daburu_riichi", False),
-                is_nagashi_mangan=kwargs.get("is_nagashi_mangan", False),
-                is_tenhou=kwargs.get("is_tenhou", False),
-                is_chiihou=kwargs.get("is_chiihou", False),
-                is_renhou=kwargs.get("is_renhou", False),
-                is_open_riichi=kwargs.get("is_open_riichi", False),
-                player_wind=kwargs.get("player_wind"),
-                round_wind=kwargs.get("round_wind"),
-                paarenchan=kwargs.get("paarenchan", 0),
-                kyoutaku_number=kwargs.get("kyoutaku_number", 0),
-                tsumi_number=kwargs.get("tsumi_number", 0),
-            )
+            hand = _hand_from_kwargs(kwargs)
 
             # Calculate score
             result = calculate_score(hand)
 
-            print(f"tools result: {result}")
+            logger.debug(f"tools result: {result}")
 
-            return {
-                "han": result.han,
-                "fu": result.fu,
-                "score": result.score,
-                "yaku": result.yaku,
-                "fu_details": result.fu_details,
-                "error": result.error,
-            }
+            return compact_score_result(
+                {
+                    "han": result.han,
+                    "fu": result.fu,
+                    "score": result.score,
+                    "yaku": result.yaku,
+                    "fu_details": result.fu_details,
+                    "error": result.error,
+                },
+                self.verbosity,
+            )
 
         except Exception as e:
-            return {
-                "han": 0,
-                "fu": 0,
-                "score": 0,
-                "yaku": [],
-                "fu_details": [],
-                "error": str(e),
-            }
+            return compact_score_result(
+                {
+                    "han": 0,
+                    "fu": 0,
+                    "score": 0,
+                    "yaku": [],
+                    "fu_details": [],
+                    "error": str(e),
+                },
+                self.verbosity,
+            )
+
+
+def _parse_tool_input(kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """Parse the input of a ReAct agent that passes all arguments as one JSON string."""
+    if len(kwargs) == 1:
+        value = next(iter(kwargs.values()))
+        if isinstance(value, str) and "tiles" in value:
+            return json.loads(value)
+    return kwargs
+
+
+def _to_meld_infos(melds: Optional[List[Any]]) -> List[MeldInfo]:
+    """Convert melds given as dicts or tile lists to MeldInfo."""
+    meld_infos = []
+    for meld in melds or []:
+        if isinstance(meld, MeldInfo):
+            meld_infos.append(meld)
+        elif isinstance(meld, dict):
+            meld_infos.append(
+                MeldInfo(tiles=meld.get("tiles", []), is_open=meld.get("is_open", True))
+            )
+        else:
+            meld_infos.append(MeldInfo(tiles=meld))
+    return meld_infos
+
+
+def _hand_from_kwargs(kwargs: Dict[str, Any]) -> Hand:
+    """Create a Hand from tool arguments, applying the tool defaults."""
+    return Hand(
+        tiles=kwargs.get("tiles", []),
+        win_tile=kwargs.get("win_tile", ""),
+        melds=_to_meld_infos(kwargs.get("melds", [])),
+        dora_indicators=kwargs.get("dora_indicators", []),
+        is_riichi=kwargs.get("is_riichi", False),
+        is_tsumo=kwargs.get("is_tsumo", False),
+        is_ippatsu=kwargs.get("is_ippatsu", False),
+        is_rinshan=kwargs.get("is_rinshan", False),
+        is_chankan=kwargs.get("is_chankan", False),
+        is_haitei=kwargs.get("is_haitei", False),
+        is_houtei=kwargs.get("is_houtei", False),
+        is_daburu_riichi=kwargs.get("is_daburu_riichi", False),
+        is_nagashi_mangan=kwargs.get("is_nagashi_mangan", False),
+        is_tenhou=kwargs.get("is_tenhou", False),
+        is_chiihou=kwargs.get("is_chiihou", False),
+        is_renhou=kwargs.get("is_renhou", False),
+        is_open_riichi=kwargs.get("is_open_riichi", False),
+        player_wind=kwargs.get("player_wind"),
+        round_wind=kwargs.get("round_wind"),
+        paarenchan=kwargs.get("paarenchan", 0),
+        kyoutaku_number=kwargs.get("kyoutaku_number", 0),
+        tsumi_number=kwargs.get("tsumi_number", 0),
+    )
+
+
+def _validation_report(hand: Hand) -> Tuple[List[str], List[str]]:
+    """Validate a hand and return (errors, warnings) with agent-friendly messages."""
+    tiles = hand.tiles
+    melds = [meld.tiles for meld in hand.melds or []]
+    errors = []
+    warnings = []
+
+    # Use centralized validation
+    try:
+        validate_hand(hand)
+    except (HandValidationError, ValueError) as e:
+        error_msg = str(e)
+        if "tiles is required" in error_msg:
+            errors.append("Invalid tile format in hand")
+        elif "Invalid tile format in tiles" in error_msg:
+            errors.append("Invalid tile format in hand")
+        elif "Invalid tile format in dora indicators" in error_msg:
+            errors.append("Invalid tile format in dora indicators")
+        elif "Invalid meld in hand" in error_msg:
+            errors.append("Invalid meld in hand")
+        elif "Invalid tile count in hand" in error_msg:
+            errors.append(
+                f"Hand should have at least 14 tiles, but has {len(tiles)} tiles"
+            )
+        elif "Invalid win tile in hand" in error_msg:
+            errors.append("Win tile is not in the hand")
+        else:
+            errors.append(error_msg)
+
+    # Additional detailed meld validation for better error messages
+    for i, meld_tiles_list in enumerate(melds):
+        # Check if meld tiles are present in hand tiles
+        for meld_tile in meld_tiles_list:
+            if meld_tile not in tiles:
+                errors.append(f"Meld tile {meld_tile} is not present in hand tiles")
+
+        if not errors and len(meld_tiles_list) not in [3, 4]:
+            errors.append(
+                f"Meld {i} should have 3 or 4 tiles, but has {len(meld_tiles_list)}"
+            )
+        elif not errors:
+            # Check if meld is valid (same tiles for pon/kan, consecutive for chi)
+            if len(meld_tiles_list) == 4:
+                # Kan: all 4 tiles should be the same
+                if not all(tile == meld_tiles_list[0] for tile in meld_tiles_list):
+                    errors.append(f"Kan meld {i} should have 4 identical tiles")
+            elif len(meld_tiles_list) == 3:
+                sorted_meld = sorted(meld_tiles_list)
+                if sorted_meld[0] == sorted_meld[1] == sorted_meld[2]:
+                    # Pon: all 3 tiles should be the same
+                    pass
+                else:
+                    # Chi: should be consecutive
+                    if not _is_valid_chi(sorted_meld):
+                        errors.append(f"Meld {i} is neither a valid pon nor chi")
+
+    # Check tile counts
+    tile_counts = {}
+    for tile in tiles:
+        tile_counts[tile] = tile_counts.get(tile, 0) + 1
+        if tile_counts[tile] > 4:
+            errors.append(f"Tile {tile} appears more than 4 times")
+
+    # Check total tile count consistency
+    kan_count = sum(1 for meld_tiles_list in melds if len(meld_tiles_list) == 4)
+    expected_tiles = 14 + kan_count
+    if len(tiles) != expected_tiles:
+        warnings.append(
+            f"Expected {expected_tiles} tiles (14 + {kan_count} kan tiles), but got {len(tiles)} tiles"
+        )
+
+    return errors, warnings
 
 
 class ValidateMahjongHandTool(BaseTool):
@@ -185,117 +291,98 @@ class ValidateMahjongHandTool(BaseTool):
     def _run(self, **kwargs) -> Dict[str, Any]:
         """Execute the tool."""
         # Handle case where input is passed as a JSON string
-        if len(kwargs) == 1 and "tiles" in str(list(kwargs.values())[0]):
-            import json
-
-            json_str = list(kwargs.values())[0]
-            if isinstance(json_str, str):
-                parsed_input = json.loads(json_str)
-                kwargs = parsed_input
-
-        tiles = kwargs.get("tiles", [])
-        win_tile = kwargs.get("win_tile")
-        melds = kwargs.get("melds", [])
-
-        errors = []
-        warnings = []
-
-        # Create Hand object for centralized validation
-        meld_infos = []
-        if melds:
-            for meld in melds:
-                if isinstance(meld, dict):
-                    meld_tiles_list = meld.get("tiles", [])
-                else:
-                    meld_tiles_list = meld
-                meld_infos.append(MeldInfo(tiles=meld_tiles_list))
+        kwargs = _parse_tool_input(kwargs)
 
+        meld_infos = _to_meld_infos(kwargs.get("melds", []))
         hand = Hand(
-            tiles=tiles, win_tile=win_tile, melds=meld_infos if meld_infos else None
+            tiles=kwargs.get("tiles", []),
+            win_tile=kwargs.get("win_tile"),
+            melds=meld_infos if meld_infos else None,
         )
+        errors, warnings = _validation_report(hand)
+
+        return {"valid": len(errors) == 0, "errors": errors, "warnings": warnings}
 
-        # Use centralized validation
+
+class ValidateAndScoreHandTool(BaseTool):
+    """Tool that validates a hand and calculates its score in one pass."""
+
+    name: str = "validate_and_score_hand"
+    description: str = (
+        "Validate a mahjong hand and calculate its score in one step. "
+        "Returns validation errors and warnings, whether the hand is a winning hand, "
+        "and han, fu, points and yaku."
+    )
+    args_schema: type[BaseModel] = MahjongScoreInput
+    verbosity: Optional[Verbosity] = None
+
+    def _parse_input(
+        self, tool_input: Union[str, Dict[str, Any]], tool_call_id: Optional[str]
+    ) -> Union[str, Dict[str, Any]]:
+        # ReActエージェントはJSON文字列で渡すため、ここでは検証せず _run で1回だけパースする
+        if isinstance(tool_input, str):
+            return tool_input
+        return super()._parse_input(tool_input, tool_call_id)
+
+    def _run(self, tool_input: Optional[str] = None, **kwargs) -> Dict[str, Any]:
+        """Execute the tool."""
+        # 入力のパース・検証・点数計算をそれぞれ1回だけ行う
         try:
-            validate_hand(hand)
-        except ValueError as e:
-            error_msg = str(e)
-            if "tiles is required" in error_msg:
-                errors.append("Invalid tile format in hand")
-            elif "Invalid tile format in tiles" in error_msg:
-                errors.append("Invalid tile format in hand")
-            elif "Invalid tile format in dora indicators" in error_msg:
-                errors.append("Invalid tile format in dora indicators")
-            elif "Invalid meld in hand" in error_msg:
-                errors.append("Invalid meld in hand")
-            elif "Invalid tile count in hand" in error_msg:
-                errors.append(
-                    f"Hand should have at least 14 tiles, but has {len(tiles)} tiles"
-                )
-            elif "Invalid win tile in hand" in error_msg:
-                errors.append("Win tile is not in the hand")
-            else:
-                errors.append(error_msg)
-
-        # Additional detailed meld validation for better error messages
-        if melds:
-            for i, meld in enumerate(melds):
-                if isinstance(meld, dict):
-                    meld_tiles_list = meld.get("tiles", [])
-                else:
-                    meld_tiles_list = meld
-
-                # Check if meld tiles are present in hand tiles
-                for meld_tile in meld_tiles_list:
-                    if meld_tile not in tiles:
-                        errors.append(
-                            f"Meld tile {meld_tile} is not present in hand tiles"
-                        )
-
-                if not errors and len(meld_tiles_list) not in [3, 4]:
-                    errors.append(
-                        f"Meld {i} should have 3 or 4 tiles, but has {len(meld_tiles_list)}"
-                    )
-                elif not errors:
-                    # Check if meld is valid (same tiles for pon/kan, consecutive for chi)
-                    if len(meld_tiles_list) == 4:
-                        # Kan: all 4 tiles should be the same
-                        if not all(
-                            tile == meld_tiles_list[0] for tile in meld_tiles_list
-                        ):
-                            errors.append(f"Kan meld {i} should have 4 identical tiles")
-                    elif len(meld_tiles_list) == 3:
-                        sorted_meld = sorted(meld_tiles_list)
-                        if sorted_meld[0] == sorted_meld[1] == sorted_meld[2]:
-                            # Pon: all 3 tiles should be the same
-                            pass
-                        else:
-                            # Chi: should be consecutive
-                            if not _is_valid_chi(sorted_meld):
-                                errors.append(
-                                    f"Meld {i} is neither a valid pon nor chi"
-                                )
-
-        # Check tile counts
-        tile_counts = {}
-        for tile in tiles:
-            tile_counts[tile] = tile_counts.get(tile, 0) + 1
-            if tile_counts[tile] > 4:
-                errors.append(f"Tile {tile} appears more than 4 times")
-
-        # Check total tile count consistency
-        kan_count = 0
-        for meld in melds:
-            meld_tiles_list = meld.get("tiles", []) if isinstance(meld, dict) else meld
-            if len(meld_tiles_list) == 4:
-                kan_count += 1
+            if tool_input is not None:
+                kwargs = MahjongScoreInput.model_validate_json(tool_input).model_dump()
+            hand = _hand_from_kwargs(kwargs)
+        except (ValidationError, ValueError) as e:
+            return {
+                "valid": False,
+                "is_winning": False,
+                "errors": [f"Invalid input: {e!s}"],
+                "warnings": [],
+            }
 
-        expected_tiles = 14 + kan_count
-        if len(tiles) != expected_tiles:
-            warnings.append(
-                f"Expected {expected_tiles} tiles (14 + {kan_count} kan tiles), but got {len(tiles)} tiles"
-            )
+        errors, warnings = _validation_report(hand)
+        if errors:
+            return {
+                "valid": False,
+                "is_winning": False,
+                "errors": errors,
+                "warnings": warnings,
+            }
 
-        return {"valid": len(errors) == 0, "errors": errors, "warnings": warnings}
+        try:
+            result = calculate_score(hand)
+            score = {
+                "han": result.han,
+                "fu": result.fu,
+                "score": result.score,
+                "yaku": result.yaku,
+                "fu_details": result.fu_details,
+                "error": result.error,
+            }
+        except ScoreCalculationError as e:
+            score = {
+                "han": 0,
+                "fu": 0,
+                "score": 0,
+                "yaku": [],
+                "fu_details": [],
+                "error": str(e),
+            }
+
+        if log.HOT_PATH_DEBUG:
+            logger.debug(f"tools result: {score}")
+
+        return {
+            "valid": True,
+            "is_winning": score["error"] is None and bool(score["han"]),
+            "errors": [],
+            "warnings": warnings,
+            **compact_score_result(score, self.verbosity),
+        }
+
+    async def _arun(self, tool_input: Optional[str] = None, **kwargs) -> Dict[str, Any]:
+        """Execute the tool without blocking the event loop."""
+        # 点数計算はCPUバウンドなためスレッドで実行する
+        return await asyncio.to_thread(self._run, tool_input, **kwargs)
 
 
 class CheckWinningHandTool(BaseTool):
@@ -311,34 +398,28 @@ class CheckWinningHandTool(BaseTool):
     def _run(self, **kwargs) -> Dict[str, Any]:
         """Execute the tool."""
         try:
-            # First validate
-            validator = ValidateMahjongHandTool()
-            validation = validator._run(**kwargs)
+            result = ValidateAndScoreHandTool(verbosity=VERBOSITY_FULL)._run(**kwargs)
 
-            if not validation["valid"]:
+            if not result["valid"]:
                 return {
                     "is_winning": False,
-                    "reason": f"Invalid hand: {', '.join(validation['errors'])}",
+                    "reason": f"Invalid hand: {', '.join(result['errors'])}",
                 }
 
-            # Then try to calculate score
-            calculator = CalculateMahjongScoreTool()
-            score_result = calculator._run(**kwargs)
-
-            if score_result.get("error"):
+            if not result["is_winning"]:
                 return {
                     "is_winning": False,
-                    "reason": f"Not a winning hand: {score_result['error']}",
+                    "reason": f"Not a winning hand: {result['error'] or 'no yaku'}",
                 }
 
             return {
                 "is_winning": True,
                 "reason": "Valid winning hand",
                 "score_info": {
-                    "han": score_result["han"],
-                    "fu": score_result["fu"],
-                    "score": score_result["score"],
-                    "yaku": score_result["yaku"],
+                    "han": result["han"],
+                    "fu": result["fu"],
+                    "score": result["score"],
+                    "yaku": result.get("yaku", []),
                 },
             }
 
@@ -0,0 +1,294 @@
+"""
+聴牌・待ちの判定
+
+13枚（鳴きがある場合は鳴きの牌を除いた 13-3n 枚）の手牌について、和了牌になる
+全ての牌と待ちの形（両面・嵌張・辺張・単騎・双碰）を求め、聴牌していない場合は
+向聴数を返す。
+
+数牌は色ごとに、面子4組以内と雀頭1組以内に分解できる9種の枚数の全パターンを
+事前に計算した表 (_suit_table) を引いて分解する。和了牌の候補ごとに
+calculate_score を呼ぶ必要はない。
+
+待ちの符は嵌張・辺張・単騎が2符、両面・双碰が0符。1つの和了牌に複数の分解が
+ある場合（例: 2345 の 2 と 5、1112 の 2）は全ての待ちの形を返す。
+"""
+
+from functools import lru_cache
+from itertools import combinations_with_replacement, product
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from mahjong.shanten import Shanten
+
+from entity.codec import TILE_INDEX, TILES_34
+from entity.entity import MeldInfo
+from exceptions import HandValidationError
+
+WAIT_RYANMEN = "ryanmen"
+WAIT_KANCHAN = "kanchan"
+WAIT_PENCHAN = "penchan"
+WAIT_TANKI = "tanki"
+WAIT_SHANPON = "shanpon"
+WAIT_KOKUSHI = "kokushi"
+# 待ちの形ごとに加算される符
+WAIT_FU = {WAIT_KANCHAN: 2, WAIT_PENCHAN: 2, WAIT_TANKI: 2}
+
+SUIT_SIZE = 9
+_HONOR_START = 27
+_TERMINALS_AND_HONORS = tuple(
+    index for index in range(34) if index >= _HONOR_START or index % SUIT_SIZE in (0, 8)
+)
+
+# 面子・雀頭（牌のインデックスのタプル）
+Group = Tuple[int, ...]
+# 1色分の分解: (面子のタプル, 雀頭 or None)
+Decomposition = Tuple[Tuple[Group, ...], Optional[Group]]
+
+
+class Wait(NamedTuple):
+    """和了牌1種類分の待ち"""
+
+    tile: str
+    wait_types: Tuple[str, ...]
+    # 待ちで加算される符（複数の形がある場合は最大）
+    fu: int
+
+
+class WaitAnalysis(NamedTuple):
+    """
+    待ちの判定結果
+
+    shanten は聴牌で0。聴牌していない場合は waits が空になる。
+    """
+
+    shanten: int
+    waits: List[Wait]
+
+    @property
+    def is_tenpai(self) -> bool:
+        return self.shanten == 0
+
+
+class WaitScore(NamedTuple):
+    """score_all_waits の1行（和了牌1種類 x ロン/ツモ）"""
+
+    tile: str
+    wait_types: Tuple[str, ...]
+    wait_fu: int
+    is_tsumo: bool
+    han: int
+    fu: int
+    score: int
+    yaku: Tuple[str, ...]
+    error: Optional[str] = None
+
+
+@lru_cache(maxsize=1)
+def _suit_table() -> Dict[Tuple[int, ...], Tuple[Decomposition, ...]]:
+    """1色9種の枚数 → 面子4組以内・雀頭1組以内への全ての分解"""
+    melds: List[Group] = [(n, n, n) for n in range(SUIT_SIZE)]
+    melds += [(n, n + 1, n + 2) for n in range(SUIT_SIZE - 2)]
+    pairs: List[Optional[Group]] = [None] + [(n, n) for n in range(SUIT_SIZE)]
+
+    table: Dict[Tuple[int, ...], List[Decomposition]] = {}
+    for size in range(5):
+        for groups in combinations_with_replacement(melds, size):
+            for pair in pairs:
+                counts = [0] * SUIT_SIZE
+                for group in groups + ((pair,) if pair else ()):
+                    for n in group:
+                        counts[n] += 1
+                if max(counts) > 4:
+                    continue
+                table.setdefault(tuple(counts), []).append((groups, pair))
+    return {counts: tuple(decompositions) for counts, decompositions in table.items()}
+
+
+def _decompose(counts: Sequence[int]) -> List[Tuple[Group, ...]]:
+    """
+    34種の枚数を面子と雀頭1組に分解する
+
+    Returns:
+        List[Tuple[Group, ...]]: 分解ごとの面子と雀頭（牌のインデックスは34種の通し番号）
+    """
+    table = _suit_table()
+    options: List[Tuple[Decomposition, ...]] = []
+    for suit in range(3):
+        offset = suit * SUIT_SIZE
+        decompositions = table.get(tuple(counts[offset : offset + SUIT_SIZE]))
+        if decompositions is None:
+            return []
+        options.append(
+            tuple(
+                (
+                    tuple(tuple(n + offset for n in group) for group in groups),
+                    tuple(n + offset for n in pair) if pair else None,
+                )
+                for groups, pair in decompositions
+            )
+        )
+
+    # 字牌は刻子か雀頭にしかならない
+    honor_groups: List[Group] = []
+    honor_pairs: List[Group] = []
+    for index in range(_HONOR_START, len(counts)):
+        count = counts[index]
+        if count == 3:
+            honor_groups.append((index,) * 3)
+        elif count == 2:
+            honor_pairs.append((index,) * 2)
+        elif count:
+            return []
+    options.append(((tuple(honor_groups), honor_pairs[0] if honor_pairs else None),))
+    if len(honor_pairs) > 1:
+        return []
+
+    result = []
+    for combination in product(*options):
+        pairs = [pair for _, pair in combination if pair]
+        if len(pairs) != 1:
+            continue
+        groups = tuple(group for groups, _ in combination for group in groups)
+        result.append(groups + (pairs[0],))
+    return result
+
+
+def _wait_type(group: Group, tile: int) -> str:
+    """和了牌を含む面子・雀頭から待ちの形を求める"""
+    if len(group) == 2:
+        return WAIT_TANKI
+    if group[0] == group[1]:
+        return WAIT_SHANPON
+    if tile == group[1]:
+        return WAIT_KANCHAN
+    number = group[0] % SUIT_SIZE
+    # 12 で 3 を待つ、89 で 7 を待つ形
+    if (tile == group[2] and number == 0) or (tile == group[0] and number == 6):
+        return WAIT_PENCHAN
+    return WAIT_RYANMEN
+
+
+def _special_wait_types(counts: Sequence[int]) -> List[str]:
+    """七対子・国士無双として和了になる場合の待ちの形"""
+    wait_types = []
+    if sum(counts) == 14:
+        if sum(count == 2 for count in counts) == 7:
+            wait_types.append(WAIT_TANKI)
+        if all(counts[index] for index in _TERMINALS_AND_HONORS) and (
+            sum(counts[index] for index in _TERMINALS_AND_HONORS) == 14
+        ):
+            wait_types.append(WAIT_KOKUSHI)
+    return wait_types
+
+
+def _wait_types(counts: List[int], tile: int, special: bool) -> Tuple[str, ...]:
+    """
+    tile で和了になる場合の待ちの形
+
+    Args:
+        counts: 鳴きの牌を除いた手牌の34種の枚数（一時的に tile を加える）
+        special: 七対子・国士無双も判定するか（鳴きがない場合）
+    """
+    counts[tile] += 1
+    try:
+        wait_types = {
+            _wait_type(group, tile)
+            for groups in _decompose(counts)
+            for group in groups
+            if tile in group
+        }
+        if special:
+            wait_types.update(_special_wait_types(counts))
+    finally:
+        counts[tile] -= 1
+    return tuple(sorted(wait_types))
+
+
+def _candidates(counts: Sequence[int], special: bool) -> List[int]:
+    """
+    和了牌になりうる牌
+
+    面子・雀頭になるのは手牌にある牌か、同じ色で2つ以内の数字の牌だけ。
+    国士無双の和了牌は手牌にない么九牌のこともある。
+    """
+    candidates = set(_TERMINALS_AND_HONORS) if special else set()
+    for index, count in enumerate(counts):
+        if not count:
+            continue
+        if index >= _HONOR_START:
+            candidates.add(index)
+            continue
+        offset = index - index % SUIT_SIZE
+        number = index % SUIT_SIZE
+        candidates.update(
+            offset + n for n in range(max(number - 2, 0), min(number + 3, SUIT_SIZE))
+        )
+    return sorted(candidates)
+
+
+def _concealed_counts(
+    tiles: Sequence[str], melds: Optional[Sequence[MeldInfo]]
+) -> Tuple[List[int], List[int]]:
+    """手牌全体と、鳴きの牌を除いた手牌の34種の枚数"""
+    total = [0] * len(TILES_34)
+    for tile in tiles:
+        if tile not in TILE_INDEX:
+            raise HandValidationError(f"Invalid tile {tile!r} in tiles")
+        total[TILE_INDEX[tile]] += 1
+    concealed = list(total)
+    for meld in melds or ():
+        for tile in meld.tiles:
+            index = TILE_INDEX.get(tile)
+            if index is None or concealed[index] == 0:
+                raise HandValidationError(f"Meld tile {tile!r} is not in tiles")
+            concealed[index] -= 1
+    expected = 13 - 3 * len(melds or ())
+    if sum(concealed) != expected:
+        raise HandValidationError(
+            f"Expected {expected} tiles outside melds, got {sum(concealed)}"
+        )
+    return total, concealed
+
+
+def analyze_waits(
+    tiles: Sequence[str], melds: Optional[Sequence[MeldInfo]] = None
+) -> WaitAnalysis:
+    """
+    聴牌の判定と、和了牌ごとの待ちの形を求める
+
+    Args:
+        tiles: 和了牌を含まない手牌（鳴きの牌も含む。カンは4枚）
+        melds: 鳴き
+
+    Returns:
+        WaitAnalysis: 向聴数と、和了牌ごとの待ちの形と符。手牌で4枚使っている牌
+        （純空の待ち）は和了牌に含めない
+
+    Raises:
+        HandValidationError: 牌の表記や枚数が不正な場合
+    """
+    total, concealed = _concealed_counts(tiles, melds)
+    # 七対子・国士無双は鳴きがない場合だけ
+    special = not melds
+
+    waits = []
+    is_tenpai = False
+    for tile in _candidates(concealed, special):
+        wait_types = _wait_types(concealed, tile, special)
+        if not wait_types:
+            continue
+        is_tenpai = True
+        if total[tile] < 4:
+            waits.append(
+                Wait(
+                    tile=TILES_34[tile],
+                    wait_types=wait_types,
+                    fu=max(WAIT_FU.get(wait_type, 0) for wait_type in wait_types),
+                )
+            )
+    if is_tenpai:
+        return WaitAnalysis(shanten=0, waits=waits)
+
+    shanten = Shanten().calculate_shanten(
+        concealed, use_chiitoitsu=special, use_kokushi=special
+    )
+    return WaitAnalysis(shanten=shanten, waits=[])
@@ -0,0 +1,56 @@
+"""
+ワーカープロセスのプール
+
+点数計算・合成データの生成・再採点などのCPUバウンドな処理をプロセスプールで実行する。
+イベントループやスレッドを持つプロセスから fork しないよう forkserver を使い、
+forkserver には preload のモジュールを事前に読み込ませておく。
+ワーカーで実行する関数は pickle できるよう、モジュールレベルの関数にする。
+"""
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any, Callable, Iterable, Iterator, Optional, Sequence
+
+from llmmj import metrics
+
+
+def forkserver_executor(
+    workers: int,
+    preload: Sequence[str],
+    initializer: Optional[Callable[[], Any]] = None,
+) -> ProcessPoolExecutor:
+    """
+    forkserver で起動するプロセスプールを作る
+
+    Args:
+        workers: ワーカープロセス数
+        preload: forkserver に事前に読み込ませるモジュール
+        initializer: 各ワーカープロセスの起動時に呼び出す関数
+    """
+    mp_context = multiprocessing.get_context("forkserver")
+    mp_context.set_forkserver_preload(list(preload))
+    return ProcessPoolExecutor(
+        max_workers=workers, mp_context=mp_context, initializer=initializer
+    )
+
+
+def map_with_metrics(
+    executor: ProcessPoolExecutor, fn: Callable[..., Any], *iterables: Iterable[Any]
+) -> Iterator[Any]:
+    """
+    executor.map と同じく fn をワーカーで実行し、結果を入力の順に返す
+
+    ワーカーで記録されたメトリクスは親プロセスの REGISTRY に集約する。
+    """
+    results = executor.map(partial(metrics.call_with_metrics, fn), *iterables)
+    while True:
+        try:
+            result, snapshot = next(results)
+        except StopIteration:
+            return
+        except Exception as e:
+            metrics.REGISTRY.merge(getattr(e, "metrics", None) or {})
+            raise
+        metrics.REGISTRY.merge(snapshot)
+        yield result
@@ -12,6 +12,8 @@ mcp = FastApiMCP(
     description="麻雀の点数計算を行うAPIサーバー。",
     describe_all_responses=True,
     describe_full_response_schema=True,
+    # ストリーミングのバッチ計算とメトリクスはMCPツールとしては公開しない
+    exclude_operations=["calculate_batch", "metrics"],
 )
 
 # Mount the MCP server directly to your FastAPI app
@@ -1,23 +1,30 @@
-import os
+"""
+プロンプトの共通の部品
+
+各部品は PROMPTS に登録する。ファイルの部品 (RULE / COT) は最初に参照されたときに
+読み込む。rule_str などのモジュール属性も参照時に PROMPTS から取り出す。
+"""
 
-rule_path = os.path.join(os.path.dirname(__file__), "../sources/rule_en.md")
-with open(rule_path, "r") as f:
-    rule_str = f.read()
+from prompts.registry import PROMPTS
 
-cot_path = os.path.join(os.path.dirname(__file__), "../sources/cot_en.md")
-with open(cot_path, "r") as f:
-    cot_str = f.read()
+RULE = PROMPTS.add_asset("rule", "rule_en.md")
+COT = PROMPTS.add_asset("cot", "cot_en.md")
 
-tile_notation_str = """
+TILE_NOTATION = PROMPTS.add_section(
+    "tile_notation",
+    """
 ## Tile Notation
 Mahjong hands are represented in 136 format. Man tiles are denoted by m, pin tiles by p, sou tiles by s, and honor tiles by z. Each tile has 4 copies.
 1-man:1m, 2-man:2m, 3-man:3m, 4-man:4m, 5-man:5m, 6-man:6m, 7-man:7m, 8-man:8m, 9-man:9m
 1-pin:1p, 2-pin:2p, 3-pin:3p, 4-pin:4p, 5-pin:5p, 6-pin:6p, 7-pin:7p, 8-pin:8p, 9-pin:9p
 1-sou:1s, 2-sou:2s, 3-sou:3s, 4-sou:4s, 5-sou:5s, 6-sou:6s, 7-sou:7s, 8-sou:8s, 9-sou:9s
 East:1z, South:2z, West:3z, North:4z, White:5z, Green:6z, Red:7z
-"""
+""",
+)
 
-required_json_format_str = """
+REQUIRED_JSON_FORMAT = PROMPTS.add_section(
+    "required_json_format",
+    """
 ## **Required JSON Format**
     - The message must be in the following JSON format:
         {{
@@ -40,4 +47,18 @@ required_json_format_str = """
     - is_tsumo (bool): Whether it's a tsumo win
     - player_wind (str): Player's wind (east, south, west, north)
     - round_wind (str): Round wind (east, south, west, north)
-"""
+""",
+)
+
+_SECTION_ATTRIBUTES = {
+    "rule_str": RULE,
+    "cot_str": COT,
+    "tile_notation_str": TILE_NOTATION,
+    "required_json_format_str": REQUIRED_JSON_FORMAT,
+}
+
+
+def __getattr__(name):
+    if name in _SECTION_ATTRIBUTES:
+        return PROMPTS.section(_SECTION_ATTRIBUTES[name].name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
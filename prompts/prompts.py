@@ -1,84 +1,107 @@
-from .parts import cot_str, required_json_format_str, rule_str, tile_notation_str
+"""
+LangChain の生成器で使うプロンプトのテンプレート
+
+テンプレートは PROMPTS に登録し、generate_question_prompt_template などの
+モジュール属性を参照したときに組み立てる。
+"""
+
+from prompts.parts import COT, REQUIRED_JSON_FORMAT, RULE, TILE_NOTATION
+from prompts.registry import PROMPTS
 
-generate_question_prompt_template = (
+PROMPTS.add_template(
+    "generate_question_prompt_template",
     """
 You are an expert in creating Japanese Riichi Mahjong scoring problems.
 
 ## Background Knowledge
-"""
-    + tile_notation_str
-    + """
+""",
+    TILE_NOTATION,
+    """
 
-"""
-    + required_json_format_str
-    + """
+""",
+    REQUIRED_JSON_FORMAT,
+    """
 
 ## Instructions
 {query}
-"""
+""",
 )
 
-generate_question_with_cot_and_rule_prompt_template = (
+PROMPTS.add_template(
+    "generate_question_with_cot_and_rule_prompt_template",
     """
 You are an expert in creating Japanese Riichi Mahjong scoring problems.
 
 ## Background Knowledge
-"""
-    + tile_notation_str
-    + """
+""",
+    TILE_NOTATION,
+    """
 
 ### Calculation Rules
-"""
-    + rule_str
-    + """
+""",
+    RULE,
+    """
 
-"""
-    + cot_str
-    + """
+""",
+    COT,
+    """
 
-"""
-    + required_json_format_str
-    + """
+""",
+    REQUIRED_JSON_FORMAT,
+    """
 
 ## Instructions
 {query}
-"""
+""",
 )
 
 
-generate_question_with_tools_prompt_template = (
+PROMPTS.add_template(
+    "generate_question_with_tools_prompt_template",
     """
 You are an expert in creating Japanese Riichi Mahjong scoring problems. 
 
 ## ** Required Steps **
 1. Generate a problem.
-2. Use the calculate_mahjong_score tool to verify that the parameters are correct and that the calculation result of the problem matches the specified answer.
+2. Use the validate_and_score_hand tool to verify that the parameters are correct and that the calculation result of the problem matches the specified answer.
 3. Return the problem and the answer.
 4. If the parameters are incorrect or the calculation result does not match the specified answer, repeat the process from step 1.
 
 ## Background Knowledge
-"""
-    + tile_notation_str
-    + """
+""",
+    TILE_NOTATION,
+    """
 
 ### Calculation Rules
-"""
-    + rule_str
-    + """
+""",
+    RULE,
+    """
 
 ### Example of thinking steps
-"""
-    + cot_str
-    + """
+""",
+    COT,
+    """
 
-"""
-    + required_json_format_str
-    + """
+""",
+    REQUIRED_JSON_FORMAT,
+    """
 
 ### Tool Description
-- calculate_mahjong_score: Calculates mahjong scores. From information such as hand tiles, winning tile, melds, dora etc., it calculates han, fu, and points, and also returns details of the yaku.
+- validate_and_score_hand: Validates the hand and calculates mahjong scores in one call. From information such as hand tiles, winning tile, melds, dora etc., it returns validation errors and warnings, whether the hand is a winning hand, han, fu, points, and details of the yaku.
 
 ## Instructions
 {query}
-"""
+""",
 )
+
+TEMPLATE_NAMES = (
+    "generate_question_prompt_template",
+    "generate_question_with_cot_and_rule_prompt_template",
+    "generate_question_with_tools_prompt_template",
+)
+
+
+def __getattr__(name):
+    if name in TEMPLATE_NAMES:
+        return PROMPTS.template(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,149 @@
+"""
+プロンプトの部品とテンプレートのレジストリ
+
+ルール (sources/rule_en.md) や思考例 (sources/cot_en.md) などの共通の部品
+(セクション) と、部品を組み合わせたテンプレートを名前で登録する。
+
+- ファイルの部品は最初に参照されたときに1回だけ読み込み、sys.intern して共有する
+- テンプレートは最初に参照されたときに1回だけ組み立ててキャッシュする
+- stats はテンプレートごとのサイズとトークン数の目安を返す
+
+Usage:
+    python -m prompts.registry   # テンプレートのサイズ一覧
+"""
+
+import sys
+import threading
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
+
+SOURCES_DIR = Path(__file__).parent.parent / "sources"
+# 1トークンあたりの文字数の目安（英語のテキスト）
+CHARS_PER_TOKEN = 4
+
+
+class Section(NamedTuple):
+    """テンプレート内で共通の部品を参照する"""
+
+    name: str
+
+
+Part = Union[str, Section]
+
+
+class PromptStats(NamedTuple):
+    name: str
+    chars: int
+    tokens: int
+    # 共通の部品の名前と、テンプレートのうち部品が占める文字数
+    sections: Tuple[str, ...]
+    section_chars: int
+
+
+def estimate_tokens(text: str) -> int:
+    """トークン数の目安（CHARS_PER_TOKEN 文字で1トークン）"""
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+class PromptRegistry:
+    def __init__(self, sources_dir: Path = SOURCES_DIR):
+        self.sources_dir = sources_dir
+        # 部品の名前 → 本文、またはファイルのパス（未読み込み）
+        self._sections: Dict[str, Union[str, Path]] = {}
+        self._templates: Dict[str, Tuple[Part, ...]] = {}
+        self._built: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def add_section(self, name: str, text: str) -> Section:
+        """本文を部品として登録する"""
+        self._sections[name] = sys.intern(text)
+        return Section(name)
+
+    def add_asset(self, name: str, filename: str) -> Section:
+        """sources_dir のファイルを部品として登録する（読み込みは最初の参照時）"""
+        self._sections[name] = self.sources_dir / filename
+        return Section(name)
+
+    def add_template(self, name: str, *parts: Part) -> None:
+        """文字列と部品を順に連結したテンプレートを登録する"""
+        self._templates[name] = parts
+        self._built.pop(name, None)
+
+    def section(self, name: str) -> str:
+        """
+        部品の本文を返す
+
+        Raises:
+            KeyError: 登録されていない部品の場合
+        """
+        text = self._sections[name]
+        if isinstance(text, Path):
+            with self._lock:
+                text = self._sections[name]
+                if isinstance(text, Path):
+                    text = sys.intern(text.read_text(encoding="utf-8"))
+                    self._sections[name] = text
+        return text
+
+    def template(self, name: str) -> str:
+        """
+        組み立てたテンプレートを返す
+
+        Raises:
+            KeyError: 登録されていないテンプレートの場合
+        """
+        built = self._built.get(name)
+        if built is None:
+            built = "".join(
+                self.section(part.name) if isinstance(part, Section) else part
+                for part in self._templates[name]
+            )
+            self._built[name] = built
+        return built
+
+    def compose(self, name: str, *parts: Part) -> str:
+        """テンプレートを登録して組み立てる（エージェントの instruction 用）"""
+        self.add_template(name, *parts)
+        return self.template(name)
+
+    def is_loaded(self, name: str) -> bool:
+        """部品のファイルを読み込み済みか"""
+        return not isinstance(self._sections[name], Path)
+
+    def stats(self, names: Optional[List[str]] = None) -> List[PromptStats]:
+        """テンプレートごとのサイズとトークン数の目安（テンプレートを組み立てる）"""
+        rows = []
+        for name in names or self._templates:
+            text = self.template(name)
+            sections = tuple(
+                part.name for part in self._templates[name] if isinstance(part, Section)
+            )
+            rows.append(
+                PromptStats(
+                    name=name,
+                    chars=len(text),
+                    tokens=estimate_tokens(text),
+                    sections=sections,
+                    section_chars=sum(len(self.section(s)) for s in sections),
+                )
+            )
+        return rows
+
+
+PROMPTS = PromptRegistry()
+
+
+def main():
+    # テンプレートを登録するモジュール
+    import prompts.prompts  # noqa: F401
+
+    print(f"{'template':<52}{'chars':>8}{'tokens':>8}{'shared':>8}  sections")
+    for row in PROMPTS.stats():
+        print(
+            f"{row.name:<52}{row.chars:>8}{row.tokens:>8}"
+            f"{row.section_chars / max(row.chars, 1):>8.0%}  {', '.join(row.sections)}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,10 @@
-from runner.runner import get_loop_runner, get_sequential_runner, run
+# google.adk とエージェントの読み込みは重いため、属性を参照したときに読み込む
+__all__ = ["run", "get_loop_runner", "get_sequential_runner", "get_speculative_runner"]
 
-__all__ = ["run", "get_loop_runner", "get_sequential_runner"]
+
+def __getattr__(name):
+    if name in __all__:
+        from runner import runner
+
+        return getattr(runner, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -4,6 +4,7 @@ from google.adk.runners import InMemorySessionService, Runner
 from google.genai import types
 
 from agents_loop.agent import mahjong_loop_agent
+from agents_loop.speculative import mahjong_speculative_agent
 from agents_seq.agent import mahjong_sequential_agent
 
 
@@ -48,6 +49,19 @@ async def get_loop_runner(app_name: str, user_id: str, session_id: str) -> Runne
     )
 
 
+async def get_speculative_runner(
+    app_name: str, user_id: str, session_id: str
+) -> Runner:
+    session_service = await create_session(
+        app_name=app_name, user_id=user_id, session_id=session_id
+    )
+    return Runner(
+        agent=mahjong_speculative_agent,
+        app_name=app_name,
+        session_service=session_service,
+    )
+
+
 async def call_agent_async(query: str, runner, user_id, session_id) -> str:
     """Sends a query to the agent and prints the final response."""
     agent_logger = logging.getLogger("agent_interactions")
@@ -0,0 +1,169 @@
+"""Tests for the scoring API endpoints."""
+
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from apimcp.fast_api import _stream_batch_scores, app
+from apimcp.pool import get_scoring_pool
+from entity.codec import HAND_CODEC_MEDIA_TYPE
+
+VALID_HAND = {
+    "tiles": [
+        "1m",
+        "2m",
+        "3m",
+        "4m",
+        "5m",
+        "6m",
+        "7m",
+        "8m",
+        "9m",
+        "1p",
+        "1p",
+        "1p",
+        "2s",
+        "2s",
+    ],
+    "win_tile": "2s",
+    "dora_indicators": ["1m"],
+    "is_riichi": True,
+    "is_tsumo": True,
+}
+
+INVALID_HAND = {"tiles": ["1m", "2m", "3m"], "win_tile": "1m"}
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(app) as client:
+        yield client
+
+
+def _read_ndjson(response):
+    return [json.loads(line) for line in response.text.splitlines() if line]
+
+
+class TestCalculate:
+    def test_valid_hand(self, client):
+        response = client.post("/calculate", json={"hand": VALID_HAND})
+
+        assert response.status_code == 200
+        assert response.json()["han"] > 0
+
+    def test_invalid_hand(self, client):
+        response = client.post("/calculate", json={"hand": INVALID_HAND})
+
+        assert response.status_code == 400
+        assert "less than 14" in response.json()["detail"]
+
+    def test_non_utf8_binary_hand(self, client):
+        response = client.post(
+            "/calculate",
+            content=b"\x80\x81\xff",
+            headers={"content-type": HAND_CODEC_MEDIA_TYPE},
+        )
+
+        assert response.status_code == 422
+        error = response.json()["detail"][0]
+        assert error["type"] == "hand_codec"
+        assert "input" not in error
+
+    def test_saturated_pool(self, client, monkeypatch):
+        monkeypatch.setattr(get_scoring_pool(), "max_pending", 0)
+
+        response = client.post("/calculate", json={"hand": VALID_HAND})
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
+
+        response = client.post("/calculate/batch", json=[VALID_HAND])
+        assert response.status_code == 503
+
+        # ヘルスチェックはプールの状態に影響されない
+        assert client.get("/health").status_code == 200
+
+
+class TestCalculateBatch:
+    def test_json_array(self, client):
+        response = client.post(
+            "/calculate/batch",
+            json=[VALID_HAND, INVALID_HAND, VALID_HAND],
+            params={"chunk_size": 2},
+        )
+
+        assert response.status_code == 200
+        results = _read_ndjson(response)
+        assert len(results) == 3
+        assert results[0]["han"] == results[2]["han"] > 0
+        assert results[0]["error"] is None
+        assert "less than 14" in results[1]["error"]
+
+    def test_ndjson_stream(self, client):
+        lines = [json.dumps(VALID_HAND), "{not json", json.dumps(VALID_HAND)]
+        response = client.post(
+            "/calculate/batch",
+            content="\n".join(lines) + "\n",
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+
+        assert response.status_code == 200
+        results = _read_ndjson(response)
+        assert len(results) == 3
+        assert results[0]["error"] is None
+        assert results[1]["error"].startswith("Invalid hand format")
+        assert results[2]["fu"] == results[0]["fu"]
+
+    def test_non_array_body(self, client):
+        response = client.post("/calculate/batch", json=VALID_HAND)
+
+        assert response.status_code == 400
+
+    def test_disconnect_cancels_pending_chunks(self):
+        cancelled = []
+
+        class SlowPool:
+            max_workers = 1
+
+            async def run(self, fn, chunk, bounded=True):
+                if chunk[0] > 0:
+                    try:
+                        await asyncio.sleep(10)
+                    except asyncio.CancelledError:
+                        cancelled.append(chunk[0])
+                        raise
+                return [f"{chunk[0]}\n"]
+
+        async def read_first_chunk():
+            stream = _stream_batch_scores(SlowPool(), list(range(4)), 1)
+            first = await stream.__anext__()
+            # クライアントの切断
+            await stream.aclose()
+            await asyncio.sleep(0)
+            # asyncio.run の終了時の取り消しより前に取り消されている
+            return first, sorted(cancelled)
+
+        assert asyncio.run(read_first_chunk()) == ("0\n", [1, 2])
+
+
+class TestMetrics:
+    def test_stage_metrics(self, client):
+        client.post("/calculate", json={"hand": VALID_HAND})
+        client.post("/calculate", json={"hand": INVALID_HAND})
+
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+
+        text = response.text
+        for stage in (
+            "request_parsing",
+            "validate_hand",
+            "tile_conversion",
+            "estimate_hand_value",
+        ):
+            assert f'llmmj_stage_seconds_count{{stage="{stage}"}}' in text
+        assert 'llmmj_errors_total{type="HandValidationError"}' in text
+        assert 'llmmj_http_requests_total{route="/calculate",status="200"}' in text
+        assert 'llmmj_http_requests_total{route="/calculate",status="400"}' in text
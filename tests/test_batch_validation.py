@@ -0,0 +1,126 @@
+"""Test the vectorized batch validation of hands"""
+
+import random
+
+import numpy as np
+import pytest
+
+from entity.entity import Hand, MeldInfo
+from exceptions import HandValidationError
+from generator.synthetic import random_hand
+from llmmj.batch_validation import (
+    EMPTY_TILES,
+    INVALID_DORA,
+    INVALID_MELD,
+    INVALID_TILE,
+    MELD_NOT_IN_HAND,
+    TILE_COUNT,
+    TOO_MANY_COPIES,
+    WIN_TILE_MISSING,
+    describe_errors,
+    encode_hands,
+    validate_hands,
+)
+from llmmj.llmmj import validate_hand
+
+PINFU = {
+    "tiles": "2m 3m 4m 5m 6m 7m 2p 3p 4p 5p 6p 7p 8s 8s".split(),
+    "win_tile": "7p",
+    "dora_indicators": ["1m"],
+}
+ANKAN = {
+    "tiles": "1m 2m 3m 4m 5m 6m 7m 8m 9m 1s 1s 1z 1z 1z 1z".split(),
+    "win_tile": "1s",
+    "melds": [{"tiles": ["1z", "1z", "1z", "1z"], "is_open": False}],
+}
+
+
+def _with(hand, **update):
+    return {**hand, **update}
+
+
+def test_encode_counts():
+    batch = encode_hands([Hand(**PINFU), ANKAN])
+
+    assert batch.counts.shape == (2, 34)
+    assert batch.counts.dtype == np.uint8
+    assert batch.counts.sum(axis=1).tolist() == [14, 15]
+    assert batch.counts[1, 27] == 4
+    assert batch.melds[1, 0].tolist() == [27, 27, 27, 27]
+    assert batch.win_tile.tolist() == [15, 18]
+
+
+def test_valid_hands_agree_with_validate_hand():
+    rng = random.Random(0)
+    hands = [Hand(**random_hand(rng)) for _ in range(200)]
+    mask, codes = validate_hands(hands)
+
+    for hand, valid, code in zip(hands, mask, codes):
+        if valid:
+            validate_hand(hand)
+        else:
+            # Only the stricter dora check may reject a hand validate_hand accepts
+            assert code == INVALID_DORA, describe_errors(int(code))
+
+
+@pytest.mark.parametrize(
+    "hand,code",
+    [
+        (_with(PINFU, tiles=[]), EMPTY_TILES | TILE_COUNT | WIN_TILE_MISSING),
+        (_with(PINFU, tiles=PINFU["tiles"][:-1] + ["8x"]), INVALID_TILE | TILE_COUNT),
+        (_with(PINFU, win_tile="0m"), INVALID_TILE | WIN_TILE_MISSING),
+        (_with(PINFU, win_tile="1s"), WIN_TILE_MISSING),
+        (_with(PINFU, tiles=PINFU["tiles"][:-1]), TILE_COUNT),
+        (
+            _with(PINFU, tiles="2m 2m 2m 2m 2m 3m 4m 2p 3p 4p 5p 6p 7p 8s".split()),
+            TOO_MANY_COPIES | INVALID_DORA,
+        ),
+        (_with(PINFU, melds=[{"tiles": ["1s", "1s", "1s"]}]), MELD_NOT_IN_HAND),
+        (_with(PINFU, melds=[{"tiles": ["2m", "3m"]}]), INVALID_MELD),
+        (_with(PINFU, melds=[{"tiles": ["2m", "3m", "5m"]}]), INVALID_MELD),
+        (_with(PINFU, melds=[{"tiles": ["7p", "8s", "8s"]}]), INVALID_MELD),
+        (_with(PINFU, dora_indicators=["9x"]), INVALID_DORA),
+        (_with(ANKAN, dora_indicators=["1z"]), INVALID_DORA),
+        (_with(ANKAN, melds=[{"tiles": ["1z", "1z", "1z"]}]), TILE_COUNT),
+    ],
+)
+def test_error_codes(hand, code):
+    mask, codes = validate_hands([PINFU, hand, ANKAN])
+
+    assert mask.tolist() == [True, False, True]
+    assert codes[1] == code, describe_errors(int(codes[1]))
+
+
+def test_rejected_hands_raise_in_validate_hand():
+    hands = [
+        _with(PINFU, tiles=[]),
+        _with(PINFU, win_tile="1s"),
+        _with(PINFU, melds=[MeldInfo(tiles=["1s", "1s", "1s"], is_open=True)]),
+    ]
+    mask, _ = validate_hands(hands)
+
+    assert not mask.any()
+    for hand in hands:
+        with pytest.raises(HandValidationError):
+            validate_hand(Hand(**hand))
+
+
+def test_chi_in_any_order():
+    hand = _with(PINFU, melds=[{"tiles": ["4p", "2p", "3p"], "is_open": True}])
+    mask, codes = validate_hands([hand])
+
+    assert mask.all(), describe_errors(int(codes[0]))
+
+
+def test_empty_batch():
+    mask, codes = validate_hands([])
+
+    assert mask.shape == codes.shape == (0,)
+
+
+def test_describe_errors():
+    assert describe_errors(0) == []
+    assert describe_errors(TILE_COUNT | WIN_TILE_MISSING) == [
+        "tile count is not 14 plus the number of kans",
+        "win_tile is not in tiles",
+    ]
@@ -1,8 +1,11 @@
 import json
+import logging
 
 from tools.calculation import (
+    _verbosity_from_env,
     calculate_mahjong_score,
     check_hand_validity,
+    compact_score_result,
     final_output_message_check,
 )
 
@@ -422,3 +425,52 @@ class TestFinalOutputMessageCheck:
 
         result = final_output_message_check(valid_message)
         assert result["status"] == "success"
+
+
+class TestCompactScoreResult:
+    full_result = {
+        "han": 2,
+        "fu": 60,
+        "cost": {
+            "main": 3900,
+            "main_bonus": 0,
+            "additional": 0,
+            "additional_bonus": 0,
+            "kyoutaku_bonus": 0,
+            "total": 3900,
+            "yaku_level": "",
+        },
+        "yaku": ["Riichi", "Dora 1"],
+        "fu_details": [
+            {"fu": 30, "reason": "base"},
+            {"fu": 16, "reason": "closed_kan"},
+            {"fu": 2, "reason": "kanchan"},
+        ],
+        "error": None,
+    }
+
+    def test_minimal(self):
+        result = compact_score_result(self.full_result, "minimal")
+        assert result == {"han": 2, "fu": 60, "cost": {"main": 3900}, "error": None}
+
+    def test_standard(self):
+        result = compact_score_result(self.full_result, "standard")
+        assert result["cost"] == {"main": 3900}
+        assert result["yaku"] == ["Riichi", "Dora 1"]
+        assert result["fu_details"] == "base 30, closed_kan 16, kanchan 2"
+
+    def test_full(self):
+        assert compact_score_result(self.full_result, "full") == self.full_result
+
+    def test_error_result_is_kept(self):
+        error = {"status": "error", "error": "Invalid tiles"}
+        assert compact_score_result(error, "minimal") == error
+
+    def test_verbosity_from_env(self, monkeypatch, caplog):
+        monkeypatch.setenv("LLMMJ_TOOL_VERBOSITY", "full")
+        assert _verbosity_from_env() == "full"
+
+        monkeypatch.setenv("LLMMJ_TOOL_VERBOSITY", "verbose")
+        with caplog.at_level(logging.WARNING, logger="tools.calculation"):
+            assert _verbosity_from_env() == "standard"
+        assert "Invalid LLMMJ_TOOL_VERBOSITY: verbose" in caplog.text
@@ -0,0 +1,154 @@
+"""Test the suit-symmetry canonicalization of hands"""
+
+import random
+
+from entity.canonical import (
+    canonical_key,
+    canonicalize,
+    dedupe,
+    is_green_sensitive,
+    symmetric_variants,
+)
+from entity.entity import Hand, MeldInfo
+from entity.hand_key import HandKey
+from evaluator.libs import CANONICAL_HAND_COLUMN, hand_2_result, result_to_df
+from generator.synthetic import random_hand
+from llmmj import metrics
+from llmmj.llmmj import calculate_score, calculate_score_cached, clear_score_cache
+
+
+def _hand(tiles, win_tile, **kwargs):
+    return Hand(tiles=tiles.split(), win_tile=win_tile, **kwargs)
+
+
+# Riichi, pinfu, ittsu with the dora indicator wrapping from 9m to 1m
+ITTSU = _hand(
+    "1m 2m 3m 4m 5m 6m 7m 8m 9m 3p 4p 5p 7s 7s",
+    "3p",
+    is_riichi=True,
+    dora_indicators=["9m"],
+)
+# Sanshoku over all three suits
+SANSHOKU = _hand("1m 2m 3m 1p 2p 3p 1s 2s 3s 5m 6m 7m 9p 9p", "7m", is_riichi=True)
+# All green
+RYUUIISOU = _hand(
+    "2s 3s 4s 2s 3s 4s 6s 6s 6s 8s 8s 6z 6z 6z",
+    "8s",
+    melds=[MeldInfo(tiles=["6z", "6z", "6z"], is_open=True)],
+)
+
+
+def _score(hand):
+    result = calculate_score(hand)
+    return result.han, result.fu, result.score, sorted(result.yaku)
+
+
+def test_mirrored_and_swapped_hands_share_a_key():
+    mirrored = _hand(
+        "9p 8p 7p 6p 5p 4p 3p 2p 1p 7s 6s 5s 3m 3m",
+        "7s",
+        is_riichi=True,
+        dora_indicators=["8p"],
+    )
+
+    assert canonical_key(mirrored) == canonical_key(ITTSU)
+    assert _score(mirrored) == _score(ITTSU)
+
+
+def test_dora_follows_the_dora_not_the_indicator():
+    hand = _hand(
+        "2m 3m 4m 5m 6m 7m 2p 3p 4p 6s 7s 8s 9s 9s",
+        "4p",
+        is_riichi=True,
+        dora_indicators=["8s"],
+    )
+    # The dora 9s mirrors to 1s, whose indicator is 9s (not the mirrored 2s)
+    mirrored = _hand(
+        "8m 7m 6m 5m 4m 3m 8p 7p 6p 4s 3s 2s 1s 1s",
+        "6p",
+        is_riichi=True,
+        dora_indicators=["9s"],
+    )
+    wrong = mirrored.model_copy(update={"dora_indicators": ["2s"]})
+
+    assert canonical_key(mirrored) == canonical_key(hand)
+    assert _score(mirrored) == _score(hand)
+    assert canonical_key(wrong) != canonical_key(hand)
+    assert _score(wrong) != _score(hand)
+
+
+def test_all_variants_score_the_same():
+    rng = random.Random(0)
+    for _ in range(60):
+        hand = Hand(**random_hand(rng))
+        expected = _score(hand)
+        variants = symmetric_variants(hand)
+        key = canonical_key(hand)
+        assert key in variants
+        for variant in variants[:: max(1, len(variants) // 8)]:
+            assert _score(variant) == expected, (hand, variant)
+            assert canonical_key(variant) == key
+
+
+def test_suits_are_mirrored_together_with_three_suits():
+    # Mirroring only the man suit would break sanshoku
+    broken = _hand("7m 8m 9m 1p 2p 3p 1s 2s 3s 3m 4m 5m 9p 9p", "5m", is_riichi=True)
+    assert canonical_key(broken) != canonical_key(SANSHOKU)
+    assert _score(broken) != _score(SANSHOKU)
+
+    mirrored = _hand("7m 8m 9m 7p 8p 9p 7s 8s 9s 3m 4m 5m 1p 1p", "3m", is_riichi=True)
+    assert canonical_key(mirrored) == canonical_key(SANSHOKU)
+
+
+def test_green_hands_are_kept():
+    assert is_green_sensitive(HandKey.from_hand(RYUUIISOU))
+    assert symmetric_variants(RYUUIISOU) == [canonical_key(RYUUIISOU)]
+    assert canonicalize(RYUUIISOU).tiles == sorted(
+        RYUUIISOU.tiles, key=lambda tile: (tile[1], tile[0])
+    )
+
+
+def test_value_winds_and_dragons_are_kept():
+    base = "1m 2m 3m 4m 5m 6m 7m 8m 9m {0} {0} {0} 2p 2p"
+    east = _hand(base.format("1z"), "2p", player_wind="east", round_wind="east")
+    south = _hand(base.format("2z"), "2p", player_wind="east", round_wind="east")
+    west = _hand(base.format("3z"), "2p", player_wind="east", round_wind="east")
+    haku = _hand(base.format("5z"), "2p")
+    chun = _hand(base.format("7z"), "2p")
+
+    assert canonical_key(east) != canonical_key(south)
+    assert canonical_key(south) == canonical_key(west)
+    assert canonical_key(haku) != canonical_key(chun)
+
+
+def test_dedupe():
+    mirrored = canonicalize(ITTSU)
+    assert dedupe([ITTSU, SANSHOKU, mirrored]) == [ITTSU, SANSHOKU]
+
+    records = [{"hand": ITTSU}, {"hand": mirrored}]
+    assert dedupe(records, hand_of=lambda record: record["hand"]) == records[:1]
+
+
+def test_calculate_score_cached_shares_variants():
+    clear_score_cache()
+    requests = metrics.CACHE_REQUESTS
+    hits = requests.value(cache="score", result="hit")
+    misses = requests.value(cache="score", result="miss")
+
+    for variant in symmetric_variants(ITTSU):
+        result = calculate_score_cached(variant)
+        assert (result.han, result.fu, result.score) == _score(ITTSU)[:3]
+
+    assert requests.value(cache="score", result="miss") == misses + 1
+    assert requests.value(cache="score", result="hit") > hits
+
+
+def test_result_to_df_adds_canonical_hand():
+    data = {"answer": {"han": 4, "fu": 30}}
+    variant = symmetric_variants(ITTSU)[-1].to_hand()
+    results = [hand_2_result(ITTSU, data, "m"), hand_2_result(variant, data, "m")]
+
+    assert CANONICAL_HAND_COLUMN not in result_to_df(results).columns
+    df = result_to_df(results, canonical=True)
+    assert df[CANONICAL_HAND_COLUMN].nunique() == 1
+    assert df[CANONICAL_HAND_COLUMN].notna().all()
@@ -0,0 +1,134 @@
+"""Tests for the binary hand codec."""
+
+import pandas as pd
+import pytest
+
+from entity.codec import (
+    TILE_INDEX,
+    decode_hand,
+    decode_hand_text,
+    decode_hands,
+    encode_hand,
+    encode_hand_text,
+)
+from entity.entity import Hand, MeldInfo, ScoreRequest
+from evaluator.libs import HAND_CODEC_COLUMN, hand_from_record, result_to_df
+from evaluator.result import EvalResult
+from exceptions import HandCodecError
+
+OPEN_HAND = Hand(
+    tiles=[
+        "2m",
+        "3m",
+        "4m",
+        "7z",
+        "7z",
+        "7z",
+        "5p",
+        "6p",
+        "7p",
+        "1z",
+        "1z",
+        "1z",
+        "1z",
+        "9s",
+        "9s",
+    ],
+    melds=[
+        MeldInfo(tiles=["7z", "7z", "7z"], is_open=True),
+        MeldInfo(tiles=["5p", "6p", "7p"], is_open=True),
+        MeldInfo(tiles=["1z", "1z", "1z", "1z"], is_open=False),
+    ],
+    win_tile="9s",
+    dora_indicators=["1m", "9p"],
+    is_tsumo=True,
+    is_rinshan=True,
+    player_wind="south",
+    round_wind="east",
+    tsumi_number=2,
+)
+
+
+def _sorted_tiles(hand: Hand) -> Hand:
+    return hand.model_copy(
+        update={"tiles": sorted(hand.tiles, key=TILE_INDEX.__getitem__)}
+    )
+
+
+class TestHandCodec:
+    def test_round_trip(self):
+        decoded = decode_hand(encode_hand(OPEN_HAND))
+
+        # 手牌の並び順以外は復元される
+        assert decoded.model_dump() == _sorted_tiles(OPEN_HAND).model_dump()
+
+    def test_none_and_empty_are_distinguished(self):
+        hand = Hand(tiles=["1m"], win_tile="", melds=[], dora_indicators=None)
+
+        decoded = decode_hand(encode_hand(hand))
+
+        assert decoded.melds == []
+        assert decoded.dora_indicators is None
+        assert decoded.win_tile == ""
+
+    def test_irregular_meld_is_kept(self):
+        hand = Hand(
+            tiles=["1m", "3m", "5m"],
+            melds=[MeldInfo(tiles=["5m", "1m", "3m"])],
+            win_tile="1m",
+        )
+
+        assert decode_hand(encode_hand(hand)).melds[0].tiles == ["5m", "1m", "3m"]
+
+    def test_much_smaller_than_json(self):
+        assert len(encode_hand(OPEN_HAND)) * 10 < len(OPEN_HAND.model_dump_json())
+
+    def test_unencodable_tile(self):
+        with pytest.raises(HandCodecError):
+            encode_hand(Hand(tiles=["10m"], win_tile="10m"))
+
+    def test_truncated_data(self):
+        with pytest.raises(HandCodecError):
+            decode_hand(encode_hand(OPEN_HAND)[:-1])
+
+    def test_decode_concatenated(self):
+        data = encode_hand(OPEN_HAND) * 3
+
+        assert len(list(decode_hands(data))) == 3
+
+    def test_text_round_trip(self):
+        assert decode_hand_text(encode_hand_text(OPEN_HAND)) == decode_hand(
+            encode_hand(OPEN_HAND)
+        )
+
+    def test_score_request_accepts_binary(self):
+        request = ScoreRequest.model_validate(encode_hand(OPEN_HAND))
+
+        assert request.hand.win_tile == "9s"
+
+
+class TestCompactHandColumn:
+    def _result(self, hand: Hand) -> EvalResult:
+        return EvalResult(
+            correct=True,
+            is_error=False,
+            reason="Correct",
+            hand=hand,
+            expected_han=1,
+            expected_fu=30,
+        )
+
+    def test_result_to_df_round_trip(self, tmp_path):
+        bad_hand = Hand(tiles=["10m"], win_tile="10m")
+        df = result_to_df(
+            [self._result(OPEN_HAND), self._result(bad_hand)], compact_hand=True
+        )
+        path = tmp_path / "results.csv"
+        df.to_csv(path, index=False)
+
+        records = pd.read_csv(path).to_dict("records")
+
+        assert isinstance(records[0][HAND_CODEC_COLUMN], str)
+        assert hand_from_record(records[0]) == decode_hand(encode_hand(OPEN_HAND))
+        # エンコードできない手牌は hand_* 列に保存される
+        assert hand_from_record(records[1]).tiles == ["10m"]
@@ -0,0 +1,80 @@
+"""Test scoring one hand shape under many winning conditions"""
+
+import pytest
+
+from entity.entity import Hand, MeldInfo
+from llmmj.llmmj import calculate_score, score_conditions, sweep_conditions
+from tools.calculation import sweep_hand_conditions
+
+CLOSED = Hand(
+    tiles="2m 3m 4m 5m 6m 7m 2p 3p 4p 6s 7s 8s 9s 9s".split(),
+    win_tile="4p",
+)
+OPEN = Hand(
+    tiles="2m 3m 4m 5m 6m 7m 2p 3p 4p 6s 7s 8s 9s 9s".split(),
+    melds=[MeldInfo(tiles=["2m", "3m", "4m"], is_open=True)],
+    win_tile="4p",
+)
+GRID = {
+    "is_riichi": [False, True],
+    "is_tsumo": [False, True],
+    "dora_indicators": [[], ["8s"], ["8s", "1m"]],
+}
+
+
+@pytest.mark.parametrize("hand", [CLOSED, OPEN])
+def test_sweep_matches_calculate_score(hand):
+    rows = sweep_conditions(hand, GRID)
+
+    assert len(rows) == 12
+    assert rows[1].conditions == {
+        "is_riichi": False,
+        "is_tsumo": False,
+        "dora_indicators": ["8s"],
+    }
+    for row in rows:
+        variant = hand.model_copy(update=row.conditions)
+        if row.error:
+            # e.g. riichi with an open hand or no yaku
+            continue
+        expected = calculate_score(variant)
+        assert (row.han, row.fu, row.score, list(row.yaku)) == (
+            expected.han,
+            expected.fu,
+            expected.score,
+            expected.yaku,
+        )
+
+
+def test_invalid_conditions_are_reported_per_row():
+    (row,) = score_conditions(OPEN, [{"is_riichi": True}])
+    assert row.error
+    assert row.han == 0
+
+
+def test_unknown_condition():
+    with pytest.raises(ValueError):
+        score_conditions(CLOSED, [{"tiles": []}])
+    with pytest.raises(ValueError):
+        score_conditions(CLOSED, [{"dora_indicators": ["0m"]}])
+
+
+def test_sweep_hand_conditions_tool():
+    result = sweep_hand_conditions(
+        tiles=CLOSED.tiles,
+        win_tile="4p",
+        melds=None,
+        target_han=4,
+        target_fu=30,
+        dora_indicator_sets=[[], ["8s"], ["8s", "1m"]],
+    )
+
+    assert result["status"] == "success"
+    assert result["matches"]
+    for conditions in result["matches"]:
+        score = calculate_score(CLOSED.model_copy(update=conditions))
+        assert (score.han, score.fu) == (4, 30)
+    assert (4, 30) in result["reachable"]
+
+    error = sweep_hand_conditions(["1m"], "1m", None, 1, 30)
+    assert error["status"] == "error"
@@ -0,0 +1,56 @@
+"""Tests for bulk hand JSON decoding."""
+
+import json
+
+import pytest
+from pydantic import ValidationError
+
+from entity.decoding import (
+    decode_hand_array,
+    decode_hand_json,
+    is_json_syntax_error,
+)
+
+HAND = {
+    "tiles": [
+        "1m",
+        "2m",
+        "3m",
+        "4m",
+        "5m",
+        "6m",
+        "7m",
+        "8m",
+        "9m",
+        "1p",
+        "1p",
+        "1p",
+        "2s",
+        "2s",
+    ],
+    "win_tile": "2s",
+    "is_tsumo": True,
+}
+
+
+def test_decode_hand_json():
+    assert decode_hand_json(json.dumps(HAND)).win_tile == "2s"
+
+
+def test_json_syntax_error_is_distinguished():
+    with pytest.raises(ValidationError) as syntax_error:
+        decode_hand_json("{not json")
+    with pytest.raises(ValidationError) as format_error:
+        decode_hand_json(json.dumps({"tiles": ["1m"]}))
+
+    assert is_json_syntax_error(syntax_error.value)
+    assert not is_json_syntax_error(format_error.value)
+
+
+def test_decode_hand_array():
+    hands = decode_hand_array(json.dumps([HAND, HAND]))
+
+    assert len(hands) == 2
+
+    with pytest.raises(ValidationError):
+        decode_hand_array(json.dumps([HAND, {"tiles": []}]))
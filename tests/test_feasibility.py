@@ -0,0 +1,79 @@
+"""Test the (han, fu) feasibility table"""
+
+import pytest
+
+from entity.entity import Hand
+from evaluator.libs import check_target_feasibility
+from exceptions import InfeasibleTargetError
+from llmmj.feasibility import find_structure, is_feasible, load_table
+from llmmj.llmmj import calculate_score
+from tools.calculation import check_han_fu_feasibility
+
+
+@pytest.mark.parametrize(
+    "han,fu,conditions,expected",
+    [
+        (1, 20, {}, False),
+        (2, 20, {}, True),
+        (2, 20, {"is_open": True}, False),
+        (2, 20, {"is_tsumo": False}, False),
+        (2, 25, {}, True),
+        (2, 25, {"is_tsumo": True}, False),
+        (3, 25, {"is_tsumo": True}, True),
+        (2, 25, {"allow_chiitoitsu": False}, False),
+        (1, 30, {"is_open": True}, True),
+        (4, 70, {}, True),
+        (1, 35, {}, False),
+    ],
+)
+def test_is_feasible(han, fu, conditions, expected):
+    assert is_feasible(han, fu, **conditions) is expected
+
+
+def test_yakuman_entries_need_exact_han():
+    """Test that dora cannot raise the han of a yakuman structure."""
+    entry = find_structure(13, 140, is_open=True)
+    assert entry is not None
+    assert entry["min_han"] == 13
+    assert find_structure(14, 140, is_open=True) is None
+
+
+def test_find_structure_prefers_least_han():
+    structure = find_structure(3, 30)
+    assert structure["min_han"] == 1
+    assert structure["fu"] == 30
+
+
+def test_table_examples_match_scoring():
+    """Test that every stored example still scores to its entry.
+
+    Fails when the scoring code or the mahjong library changes the result;
+    rebuild the table with `python -m llmmj.feasibility build`.
+    """
+    for key, entry in load_table().items():
+        score = calculate_score(Hand(**entry["example"]))
+        assert (score.han, score.fu) == (entry["min_han"], key.fu), key
+
+
+def test_check_target_feasibility_marks_impossible_items():
+    data = {"query": "q", "answer": {"han": 1, "fu": 20}}
+    result = check_target_feasibility(data, "model")
+
+    assert result is not None
+    assert result.is_error is True
+    assert result.error_type == InfeasibleTargetError.__name__
+    assert check_target_feasibility({"answer": {"han": 2, "fu": 20}}, "m") is None
+
+
+def test_check_target_feasibility_uses_conditions():
+    data = {"answer": {"han": 2, "fu": 20}, "conditions": {"is_open": True}}
+    assert check_target_feasibility(data, "model") is not None
+
+
+def test_check_han_fu_feasibility_tool():
+    assert check_han_fu_feasibility(1, 20)["feasible"] is False
+
+    result = check_han_fu_feasibility(2, 40, is_open=False)
+    assert result["feasible"] is True
+    assert result["is_open"] is False
+    assert Hand(**result["example"]).tiles
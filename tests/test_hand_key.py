@@ -0,0 +1,91 @@
+"""Tests for the slotted HandKey value type."""
+
+import pickle
+
+import pytest
+
+from entity.entity import Hand, MeldInfo
+from entity.hand_key import HandKey
+from exceptions import HandValidationError
+from llmmj.llmmj import calculate_score, validate_hand
+
+OPEN_HAND = Hand(
+    tiles=[
+        "2m",
+        "3m",
+        "4m",
+        "7z",
+        "7z",
+        "7z",
+        "5p",
+        "6p",
+        "7p",
+        "1z",
+        "1z",
+        "1z",
+        "1z",
+        "9s",
+        "9s",
+    ],
+    melds=[
+        MeldInfo(tiles=["7z", "7z", "7z"], is_open=True),
+        MeldInfo(tiles=["5p", "6p", "7p"], is_open=True),
+        MeldInfo(tiles=["1z", "1z", "1z", "1z"], is_open=False),
+    ],
+    win_tile="9s",
+    dora_indicators=["1m"],
+    is_tsumo=True,
+    player_wind="east",
+    round_wind="east",
+)
+
+
+class TestHandKey:
+    def test_hash_and_equality(self):
+        shuffled = OPEN_HAND.model_copy(update={"tiles": OPEN_HAND.tiles[::-1]})
+
+        key = HandKey.from_hand(OPEN_HAND)
+
+        assert key == HandKey.from_hand(shuffled)
+        assert len({key, HandKey.from_hand(shuffled)}) == 1
+        assert key != HandKey.from_hand(
+            OPEN_HAND.model_copy(update={"is_tsumo": False})
+        )
+
+    def test_round_trip(self):
+        key = HandKey.from_hand(OPEN_HAND)
+
+        assert HandKey.from_hand(key.to_hand()) == key
+        assert sorted(key.to_hand().tiles) == sorted(OPEN_HAND.tiles)
+
+    def test_immutable(self):
+        key = HandKey.from_hand(OPEN_HAND)
+
+        with pytest.raises(AttributeError):
+            key.win_tile = 0
+
+    def test_pickle(self):
+        key = HandKey.from_hand(OPEN_HAND)
+
+        assert pickle.loads(pickle.dumps(key)) == key
+
+    def test_invalid_tile(self):
+        with pytest.raises(ValueError):
+            HandKey.from_hand(Hand(tiles=["10m"], win_tile="10m"))
+
+
+class TestScoringWithHandKey:
+    def test_same_score_as_hand(self):
+        key = HandKey.from_hand(OPEN_HAND)
+
+        assert calculate_score(key) == calculate_score(OPEN_HAND)
+
+    def test_validation_errors_match(self):
+        hand = OPEN_HAND.model_copy(update={"win_tile": "1s"})
+
+        with pytest.raises(HandValidationError) as from_hand:
+            validate_hand(hand)
+        with pytest.raises(HandValidationError) as from_key:
+            validate_hand(HandKey.from_hand(hand))
+
+        assert str(from_key.value) == str(from_hand.value)
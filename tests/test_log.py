@@ -0,0 +1,40 @@
+"""Tests for the structured, sampled logging setup."""
+
+import json
+import logging
+
+from llmmj.log import JsonFormatter, RouteSamplingFilter, parse_sample_rates
+
+
+def _record(level=logging.INFO, **extra):
+    record = logging.LogRecord("apimcp", level, __file__, 1, "hello %s", ("x",), None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_parse_sample_rates():
+    rates = parse_sample_rates("/calculate=0.01, /health=0,")
+    assert rates == {"/calculate": 0.01, "/health": 0.0}
+
+
+def test_json_formatter_includes_extra_fields():
+    data = json.loads(JsonFormatter().format(_record(route="/calculate", tiles=14)))
+
+    assert data["message"] == "hello x"
+    assert data["level"] == "INFO"
+    assert data["route"] == "/calculate"
+    assert data["tiles"] == 14
+
+
+class TestRouteSamplingFilter:
+    sampling_filter = RouteSamplingFilter({"/calculate": 1.0, "/health": 0.0})
+
+    def test_sampled_routes(self):
+        assert self.sampling_filter.filter(_record(route="/calculate"))
+        assert not self.sampling_filter.filter(_record(route="/health"))
+
+    def test_records_without_route_are_kept(self):
+        assert self.sampling_filter.filter(_record())
+
+    def test_warnings_are_always_kept(self):
+        assert self.sampling_filter.filter(_record(logging.ERROR, route="/health"))
@@ -0,0 +1,53 @@
+"""Tests for the direct MCP server over the scoring tools."""
+
+import asyncio
+import json
+
+from apimcp.mcp_server import create_server
+
+HAND_ARGS = {
+    "tiles": [
+        "1m",
+        "2m",
+        "3m",
+        "4m",
+        "5m",
+        "6m",
+        "7m",
+        "8m",
+        "9m",
+        "1p",
+        "1p",
+        "1p",
+        "2s",
+        "2s",
+    ],
+    "win_tile": "2s",
+    "melds": None,
+    "dora_indicators": ["1m"],
+    "is_riichi": True,
+    "is_tsumo": True,
+    "player_wind": "east",
+    "round_wind": "east",
+}
+
+
+def test_registered_tools():
+    tools = asyncio.run(create_server().list_tools())
+
+    assert {tool.name for tool in tools} == {
+        "calculate_mahjong_score",
+        "check_hand_validity",
+        "analyze_hand_waits",
+        "final_output_message_check",
+    }
+
+
+def test_calculate_mahjong_score():
+    result = asyncio.run(
+        create_server().call_tool("calculate_mahjong_score", HAND_ARGS)
+    )
+
+    score = json.loads(result[0].text)
+    assert score["han"] == 5
+    assert score["fu"] == 40
@@ -0,0 +1,57 @@
+"""Tests for the Prometheus-style metrics registry."""
+
+from entity.entity import Hand
+from llmmj.llmmj import calculate_score
+from llmmj.metrics import STAGE_SECONDS, Counter, Histogram, Registry
+from llmmj.workers import forkserver_executor, map_with_metrics
+
+
+def test_histogram_render_is_cumulative():
+    histogram = Histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+    histogram.observe(0.05)
+    histogram.observe(0.5)
+    histogram.observe(5.0)
+
+    lines = histogram.render()
+    assert 'latency_seconds_bucket{le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{le="1"} 2' in lines
+    assert 'latency_seconds_bucket{le="+Inf"} 3' in lines
+    assert "latency_seconds_count 3" in lines
+
+
+def test_drain_and_merge():
+    def make_registry():
+        registry = Registry()
+        errors = registry.register(
+            Counter("errors_total", "Errors", labelnames=("type",))
+        )
+        stages = registry.register(
+            Histogram("stage_seconds", "Stages", labelnames=("stage",))
+        )
+        return registry, errors, stages
+
+    worker, worker_errors, worker_stages = make_registry()
+    parent, parent_errors, parent_stages = make_registry()
+
+    worker_errors.inc(type="HandValidationError")
+    worker_stages.observe(0.001, stage="validate_hand")
+    parent_errors.inc(type="HandValidationError")
+
+    parent.merge(worker.drain())
+
+    assert parent_errors.value(type="HandValidationError") == 2
+    assert parent_stages.count(stage="validate_hand") == 1
+    assert worker_errors.value(type="HandValidationError") == 0
+
+
+def test_map_with_metrics_merges_worker_metrics():
+    hand = Hand(
+        tiles="2m 3m 4m 5m 6m 7m 2p 3p 4p 5p 6p 7p 8s 8s".split(), win_tile="7p"
+    )
+    before = STAGE_SECONDS.count(stage="estimate_hand_value")
+
+    with forkserver_executor(1, ["llmmj.llmmj"]) as executor:
+        results = list(map_with_metrics(executor, calculate_score, [hand, hand]))
+
+    assert [result.han for result in results] == [2, 2]
+    assert STAGE_SECONDS.count(stage="estimate_hand_value") == before + 2
@@ -0,0 +1,86 @@
+"""Test the lazy prompt registry"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from prompts.registry import PromptRegistry, Section, estimate_tokens
+
+NOTATION = "\n## Tile Notation\nMan tiles are denoted by m.\n"
+JSON_FORMAT = '\n## Required JSON Format\n{{"tiles": list[str]}}\n'
+
+
+@pytest.fixture
+def registry(tmp_path):
+    (tmp_path / "rule.md").write_text("# Rules\nRiichi needs a closed hand.\n")
+    registry = PromptRegistry(tmp_path)
+    registry.add_asset("rule", "rule.md")
+    registry.add_section("notation", NOTATION)
+    registry.add_section("json", JSON_FORMAT)
+    registry.add_template(
+        "question", "Intro\n", Section("rule"), Section("notation"), "{query}\n"
+    )
+    registry.add_template("json", Section("json"), "{query}\n")
+    return registry
+
+
+def test_assets_are_read_on_first_use(registry, tmp_path):
+    assert not registry.is_loaded("rule")
+
+    text = registry.template("question")
+
+    assert registry.is_loaded("rule")
+    assert text == (
+        "Intro\n# Rules\nRiichi needs a closed hand.\n" + NOTATION + "{query}\n"
+    )
+    # 2回目以降はファイルを読まない
+    (tmp_path / "rule.md").unlink()
+    assert registry.template("question") is text
+
+
+def test_sections_are_shared(registry):
+    assert registry.section("rule") is registry.section("rule")
+    assert registry.compose("other", Section("notation")) is registry.section(
+        "notation"
+    )
+
+
+def test_stats(registry):
+    rows = {row.name: row for row in registry.stats()}
+
+    question = rows["question"]
+    assert question.chars == len(registry.template("question"))
+    assert question.tokens == estimate_tokens(registry.template("question"))
+    assert question.sections == ("rule", "notation")
+    assert question.section_chars == len(registry.section("rule")) + len(NOTATION)
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("abcde") == 2
+
+
+def test_unknown_names(registry):
+    with pytest.raises(KeyError):
+        registry.template("missing")
+    registry.add_template("broken", Section("missing"))
+    with pytest.raises(KeyError):
+        registry.template("broken")
+
+
+def test_import_does_not_read_sources():
+    code = (
+        "from prompts.registry import PROMPTS\n"
+        "import prompts.prompts, prompts.parts\n"
+        "assert not PROMPTS.is_loaded('rule') and not PROMPTS.is_loaded('cot')\n"
+        "text = prompts.prompts.generate_question_with_cot_and_rule_prompt_template\n"
+        "assert PROMPTS.is_loaded('rule') and PROMPTS.is_loaded('cot')\n"
+        "assert prompts.parts.rule_str in text and prompts.parts.cot_str in text\n"
+        "assert '{query}' in text\n"
+    )
+    completed = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=Path(__file__).parent.parent,
+        capture_output=True,
+        text=True,
+    )
+    assert completed.returncode == 0, completed.stderr
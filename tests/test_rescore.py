@@ -0,0 +1,110 @@
+"""Test re-grading stored evaluation results"""
+
+import pandas as pd
+import pytest
+
+from entity.entity import Hand
+from evaluator.libs import (
+    HAND_CODEC_COLUMN,
+    create_error_result,
+    hand_2_result,
+    result_to_df,
+)
+from evaluator.rescore import rescore_files, rescore_frames
+from exceptions import JSONParseError
+
+PINFU_TSUMO = Hand(
+    tiles=[
+        "1m",
+        "2m",
+        "3m",
+        "4m",
+        "5m",
+        "6m",
+        "7m",
+        "8m",
+        "9m",
+        "1p",
+        "1p",
+        "2s",
+        "3s",
+        "4s",
+    ],
+    win_tile="4s",
+    is_riichi=True,
+    is_tsumo=True,
+)
+DATA = {"query": "q", "answer": {"han": 5, "fu": 20}}
+
+
+def _results():
+    return [
+        hand_2_result(PINFU_TSUMO, DATA, "model-a"),
+        hand_2_result(PINFU_TSUMO, {"answer": {"han": 1, "fu": 30}}, "model-a"),
+        create_error_result("model-b", JSONParseError("bad"), "JSONParseError", DATA),
+    ]
+
+
+@pytest.fixture
+def stored_csv(tmp_path):
+    """An evaluation result CSV as written by the notebooks."""
+    path = tmp_path / "dist" / "zeroshot" / "evals.csv"
+    path.parent.mkdir(parents=True)
+    result_to_df(_results()).to_csv(path, index=False)
+    return path
+
+
+def test_unchanged_results_have_no_diff(stored_csv):
+    (output,) = rescore_frames({"evals": pd.read_csv(stored_csv)})
+
+    assert output.rescored == 2
+    assert output.diff.empty
+    assert list(output.results["correct"]) == [1, 0, 0]
+
+
+def test_changed_verdicts_are_reported(stored_csv):
+    df = pd.read_csv(stored_csv)
+    # Simulate a verdict stored before the scoring logic changed
+    df.loc[0, ["correct", "got_answer_han"]] = [0, 4]
+    (output,) = rescore_frames({"evals": df})
+
+    assert len(output.diff) == 1
+    row = output.diff.iloc[0]
+    assert row["row"] == 0
+    assert row["old_correct"] == 0 and row["new_correct"] == 1
+    assert row["old_got_answer_han"] == 4 and row["new_got_answer_han"] == 5
+
+
+def test_rows_without_hand_are_kept(stored_csv):
+    df = pd.read_csv(stored_csv)
+    (output,) = rescore_frames({"evals": df})
+
+    kept = output.results.iloc[2]
+    assert kept["error_type"] == "JSONParseError"
+    assert kept["reason"] == df.iloc[2]["reason"]
+
+
+def test_compact_hand_layout(tmp_path):
+    path = tmp_path / "compact.csv"
+    result_to_df(_results(), compact_hand=True).to_csv(path, index=False)
+    (output,) = rescore_frames({"compact": pd.read_csv(path)})
+
+    assert output.rescored == 2
+    assert HAND_CODEC_COLUMN in output.results.columns
+    assert output.diff.empty
+
+
+def test_rescore_files_in_parallel(stored_csv, tmp_path):
+    # Enough rows to be split across several workers
+    df = pd.concat([pd.read_csv(stored_csv)] * 200, ignore_index=True)
+    df.loc[3, "correct"] = 0
+    df.to_csv(stored_csv, index=False)
+    output_dir = tmp_path / "rescored"
+
+    diff = rescore_files([str(stored_csv)], output_dir, workers=2)
+
+    assert list(diff["row"]) == [3]
+    rescored = pd.read_csv(output_dir / "evals.csv")
+    assert len(rescored) == len(df)
+    assert rescored.loc[3, "correct"] == 1
+    assert list(output_dir.glob("rescore-diff-*.csv"))
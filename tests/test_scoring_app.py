@@ -0,0 +1,108 @@
+"""Tests for the scoring-only API server and its import footprint."""
+
+import json
+
+import pytest
+from starlette.testclient import TestClient
+
+from apimcp.scoring_app import app
+from benchmarks.importtime import heavy_imports, import_profile
+from entity.codec import HAND_CODEC_MEDIA_TYPE, encode_hand
+from entity.entity import Hand
+from tests.test_api import INVALID_HAND, VALID_HAND
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(app) as client:
+        yield client
+
+
+def test_calculate(client):
+    response = client.post("/calculate", json={"hand": VALID_HAND})
+
+    assert response.status_code == 200
+    assert response.json()["han"] > 0
+
+
+def test_calculate_binary_hand(client):
+    response = client.post(
+        "/calculate",
+        content=encode_hand(Hand(**VALID_HAND)),
+        headers={"content-type": HAND_CODEC_MEDIA_TYPE},
+    )
+
+    assert response.status_code == 200
+    assert response.json()["han"] > 0
+
+
+def test_calculate_non_utf8_binary_hand(client):
+    response = client.post(
+        "/calculate",
+        content=b"\x80\x81\xff",
+        headers={"content-type": HAND_CODEC_MEDIA_TYPE},
+    )
+
+    assert response.status_code == 422
+    error = response.json()["detail"][0]
+    assert error["type"] == "hand_codec"
+    assert "input" not in error
+
+
+def test_invalid_hand(client):
+    response = client.post("/calculate", json={"hand": INVALID_HAND})
+
+    assert response.status_code == 400
+    assert "less than 14" in response.json()["detail"]
+
+
+def test_malformed_request(client):
+    response = client.post("/calculate", json={"tiles": []})
+
+    assert response.status_code == 422
+
+
+def test_batch(client):
+    response = client.post("/calculate/batch", json=[VALID_HAND, INVALID_HAND])
+    rows = [json.loads(line) for line in response.text.splitlines()]
+
+    assert response.status_code == 200
+    assert rows[0]["han"] > 0
+    assert "less than 14" in rows[1]["error"]
+
+
+def test_batch_binary_hands(client):
+    hands = [Hand(**VALID_HAND), Hand(**INVALID_HAND)]
+    response = client.post(
+        "/calculate/batch",
+        content=b"".join(encode_hand(hand) for hand in hands),
+        headers={"content-type": HAND_CODEC_MEDIA_TYPE},
+    )
+    rows = [json.loads(line) for line in response.text.splitlines()]
+
+    assert response.status_code == 200
+    assert rows[0]["han"] > 0
+    assert "less than 14" in rows[1]["error"]
+
+    response = client.post(
+        "/calculate/batch",
+        content=b"\x80\x81\xff",
+        headers={"content-type": HAND_CODEC_MEDIA_TYPE},
+    )
+    assert response.status_code == 400
+
+
+def test_routes(client):
+    assert client.get("/health").json() == {"status": "ok"}
+    assert client.get("/calculate").status_code == 405
+    assert client.get("/missing").status_code == 404
+
+
+@pytest.mark.parametrize(
+    "module", ["apimcp.scoring_app", "tools.calculation", "evaluator.libs"]
+)
+def test_scoring_entry_points_skip_heavy_imports(module):
+    profile = import_profile(module)
+
+    assert module in profile
+    assert heavy_imports(profile) == ()
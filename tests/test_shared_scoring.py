@@ -0,0 +1,92 @@
+"""Test the shared-memory batch scoring transport"""
+
+import random
+
+import numpy as np
+
+from entity.entity import Hand, MeldInfo
+from entity.hand_key import HandKey
+from generator.synthetic import random_hand
+from llmmj.llmmj import calculate_score
+from llmmj.shared_scoring import (
+    ERROR_INVALID_HAND,
+    HAND_DTYPE,
+    RESULT_DTYPE,
+    SCORE_ERRORS,
+    describe_results,
+    pack_hands,
+    score_batch,
+    unpack_hand,
+)
+
+PINFU = Hand(
+    tiles="2m 3m 4m 5m 6m 7m 2p 3p 4p 5p 6p 7p 8s 8s".split(),
+    win_tile="7p",
+    is_riichi=True,
+    dora_indicators=["1m"],
+    player_wind="south",
+    round_wind="east",
+)
+ANKAN = Hand(
+    tiles="1m 2m 3m 4m 5m 6m 7m 8m 9m 1s 1s 1z 1z 1z 1z".split(),
+    win_tile="1s",
+    melds=[MeldInfo(tiles=["1z", "1z", "1z", "1z"], is_open=False)],
+)
+NO_YAKU = Hand(
+    tiles="2m 3m 4m 5m 6m 7m 2p 3p 4p 5p 6p 7p 1z 1z".split(),
+    win_tile="7p",
+    melds=[MeldInfo(tiles=["2m", "3m", "4m"], is_open=True)],
+)
+
+
+def _random_hands(count, seed=0):
+    rng = random.Random(seed)
+    return [Hand(**random_hand(rng)) for _ in range(count)]
+
+
+def test_pack_round_trip():
+    hands = [PINFU, ANKAN, NO_YAKU]
+    packed = pack_hands(hands)
+
+    assert packed.dtype == HAND_DTYPE
+    for row, hand in zip(packed, hands):
+        assert unpack_hand(row) == HandKey.from_hand(hand)
+
+
+def test_scores_match_calculate_score():
+    hands = [PINFU, ANKAN, NO_YAKU] + _random_hands(100)
+    results = score_batch(hands)
+
+    assert results.dtype == RESULT_DTYPE
+    for hand, row, error in zip(hands, results, describe_results(results)):
+        expected = calculate_score(hand)
+        assert (row["han"], row["fu"], row["score"]) == (
+            expected.han or 0,
+            expected.fu or 0,
+            expected.score or 0,
+        )
+        assert (error is None) == bool(expected.score)
+    assert describe_results(results)[2] == "no_yaku"
+
+
+def test_invalid_hands_are_marked():
+    invalid = Hand.model_construct(**{**PINFU.model_dump(), "tiles": ["1x"] * 14})
+    unknown_wind = PINFU.model_copy(update={"player_wind": "up"})
+    results = score_batch([invalid, PINFU, unknown_wind])
+
+    assert describe_results(results) == [ERROR_INVALID_HAND, None, ERROR_INVALID_HAND]
+    assert results["han"].tolist()[::2] == [0, 0]
+
+
+def test_shared_memory_workers_match_serial():
+    hands = _random_hands(300, seed=1) + [PINFU, NO_YAKU]
+    serial = score_batch(hands)
+    shared = score_batch(hands, workers=2, chunk_size=64)
+
+    assert np.array_equal(serial, shared)
+    assert (shared["error"] < len(SCORE_ERRORS)).all()
+
+
+def test_empty_batch():
+    assert score_batch([]).shape == (0,)
+    assert score_batch([], workers=2, chunk_size=1).shape == (0,)
@@ -0,0 +1,185 @@
+"""Test speculative parallel candidate generation (first-valid-wins)"""
+
+import asyncio
+
+import pytest
+
+from entity.entity import Hand
+from exceptions import AgentSetupError, JSONParseError
+from generator.speculative import (
+    STATUS_CANCELLED,
+    STATUS_ERROR,
+    STATUS_INVALID,
+    STATUS_MATCHED,
+    STATUS_MISMATCH,
+    check_candidate,
+    first_valid,
+    parse_target,
+    run_sync,
+    sampling_temperatures,
+)
+from llmmj import metrics
+from llmmj.llmmj import calculate_score
+
+# 立直・平和・断么九・ドラ1 (4飜30符、ロン)
+PINFU = Hand(
+    tiles="2m 3m 4m 5m 6m 7m 2p 3p 4p 5p 6p 7p 8s 8s".split(),
+    win_tile="7p",
+    is_riichi=True,
+    dora_indicators=["1m"],
+)
+# 立直のみ
+RIICHI = PINFU.model_copy(update={"dora_indicators": []})
+# 13枚しかない
+INVALID = PINFU.model_copy(update={"tiles": PINFU.tiles[1:]})
+# 14枚あるが和了形でない
+NOT_WINNING = Hand(
+    tiles="1m 2m 4m 5m 7m 8m 1p 3p 5p 7p 9p 1s 3s 5s".split(), win_tile="5s"
+)
+
+TARGET = (calculate_score(PINFU).han, calculate_score(PINFU).fu)
+
+
+def _candidate(result, delay):
+    async def generate():
+        await asyncio.sleep(delay)
+        if isinstance(result, BaseException):
+            raise result
+        return result
+
+    return generate
+
+
+def test_parse_target():
+    query = (
+        "Please create a mahjong scoring calculation problem with an answer of "
+        "2 han 30 fu"
+    )
+    assert parse_target(query) == (2, 30)
+    assert parse_target("13 Han 40 Fu") == (13, 40)
+    assert parse_target("no target") is None
+
+
+def test_sampling_temperatures():
+    assert sampling_temperatures(1) == [None]
+    assert sampling_temperatures(2) == [None, 0.3]
+    assert sampling_temperatures(4) == [None, 0.3, 0.65, 1.0]
+
+
+def test_check_candidate():
+    assert check_candidate(0, PINFU, TARGET, 0.1).status == STATUS_MATCHED
+    assert check_candidate(0, PINFU.model_dump(), TARGET, 0.1).status == STATUS_MATCHED
+    assert (
+        check_candidate(0, PINFU.model_dump_json(), TARGET, 0.1).status
+        == STATUS_MATCHED
+    )
+    mismatch = check_candidate(1, RIICHI, TARGET, 0.1)
+    assert mismatch.status == STATUS_MISMATCH
+    assert (mismatch.han, mismatch.fu) == (TARGET[0] - 1, TARGET[1])
+    assert check_candidate(2, INVALID, TARGET, 0.1).status == STATUS_INVALID
+    assert check_candidate(3, "not json", TARGET, 0.1).status == STATUS_INVALID
+    assert check_candidate(4, None, TARGET, 0.1).status == STATUS_INVALID
+    not_winning = check_candidate(6, NOT_WINNING, TARGET, 0.1)
+    assert not_winning.status == STATUS_INVALID
+    assert not_winning.han is None
+    # 目標がなければ検証を通った候補を一致とみなす
+    assert check_candidate(5, RIICHI, None, 0.1).status == STATUS_MATCHED
+
+
+def test_first_valid_cancels_the_rest():
+    saved = metrics.SPECULATIVE_SAVED_SECONDS.count()
+    cancelled = metrics.SPECULATIVE_CANDIDATES.value(outcome=STATUS_CANCELLED)
+    candidates = [
+        _candidate(RIICHI, 0.01),
+        _candidate(INVALID, 0.02),
+        _candidate(PINFU, 0.05),
+        _candidate(PINFU, 10),
+        _candidate(RIICHI, 10),
+    ]
+
+    result = asyncio.run(first_valid(candidates, TARGET))
+
+    assert result.winner == 2
+    assert result.selected.result == PINFU
+    assert [o.status for o in result.outcomes] == [
+        STATUS_MISMATCH,
+        STATUS_INVALID,
+        STATUS_MATCHED,
+        STATUS_CANCELLED,
+        STATUS_CANCELLED,
+    ]
+    assert result.elapsed < 1
+    # 届いた3つの候補を直列に生成した場合との差
+    assert result.serial_seconds == pytest.approx(
+        sum(o.elapsed for o in result.outcomes[:3])
+    )
+    assert result.saved_seconds == pytest.approx(
+        result.serial_seconds - result.elapsed, abs=0.01
+    )
+    assert metrics.SPECULATIVE_SAVED_SECONDS.count() == saved + 1
+    assert (
+        metrics.SPECULATIVE_CANDIDATES.value(outcome=STATUS_CANCELLED) == cancelled + 2
+    )
+
+
+def test_first_valid_without_match_returns_the_closest():
+    too_many_han = PINFU.model_copy(update={"dora_indicators": ["1m", "1p"]})
+    candidates = [
+        _candidate(JSONParseError("broken"), 0.01),
+        _candidate(too_many_han, 0.02),
+        _candidate(RIICHI, 0.03),
+        _candidate(INVALID, 0.04),
+    ]
+
+    result = asyncio.run(first_valid(candidates, (TARGET[0] + 2, TARGET[1])))
+
+    assert result.winner is None
+    assert result.selected.result == too_many_han
+    assert result.outcomes[0].status == STATUS_ERROR
+    assert isinstance(result.outcomes[0].result, JSONParseError)
+    assert STATUS_CANCELLED not in [o.status for o in result.outcomes]
+
+
+def test_first_valid_skips_non_winning_hands():
+    candidates = [_candidate(NOT_WINNING, 0.01), _candidate(PINFU, 0.02)]
+
+    result = asyncio.run(first_valid(candidates, (TARGET[0] + 1, TARGET[1])))
+
+    assert result.winner is None
+    assert result.selected.result == PINFU
+    assert [o.status for o in result.outcomes] == [STATUS_INVALID, STATUS_MISMATCH]
+
+
+def test_first_valid_all_errors():
+    candidates = [_candidate(JSONParseError("broken"), 0), _candidate(None, 0)]
+
+    result = asyncio.run(first_valid(candidates, TARGET))
+
+    assert result.winner is None
+    assert result.selected.status == STATUS_INVALID
+    result = asyncio.run(first_valid(candidates[:1], TARGET))
+    assert result.selected is None
+
+
+def test_first_valid_raises_fatal_errors():
+    cancelled = []
+
+    async def slow():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    candidates = [_candidate(AgentSetupError("no api key"), 0.01), slow]
+    with pytest.raises(AgentSetupError):
+        asyncio.run(first_valid(candidates, TARGET, fatal=(AgentSetupError,)))
+    assert cancelled == [True]
+
+
+def test_run_sync_inside_event_loop():
+    async def inner():
+        return run_sync(first_valid([_candidate(PINFU, 0)], TARGET)).winner
+
+    assert run_sync(first_valid([_candidate(PINFU, 0)], TARGET)).winner == 0
+    assert asyncio.run(inner()) == 0
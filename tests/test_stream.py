@@ -0,0 +1,235 @@
+"""Test streaming evaluation: lazy datasets, as-completed mapping and result sinks"""
+
+import asyncio
+import json
+
+import pytest
+
+from entity.entity import Hand
+from evaluator.libs import hand_from_record
+from evaluator.result import EvalResult
+from evaluator.stream import (
+    JournalSink,
+    ParquetSink,
+    ResultSink,
+    SummarySink,
+    aenumerate,
+    amap_as_completed,
+    awrite_results,
+    read_journal,
+    result_record,
+    write_results,
+)
+from generator.synthetic import iter_dataset, load_dataset
+
+HAND = Hand(
+    tiles="2m 3m 4m 5m 6m 7m 2p 3p 4p 5p 6p 7p 8s 8s".split(),
+    win_tile="7p",
+    is_riichi=True,
+)
+
+
+def _result(correct=True, error_type=None, model="model-a"):
+    return EvalResult(
+        model=model,
+        correct=correct,
+        is_error=error_type is not None,
+        error_type=error_type,
+        reason="Correct" if correct else "Incorrect got",
+        hand=HAND,
+        got_answer_han=1,
+        got_answer_fu=30,
+        expected_han=1,
+        expected_fu=30,
+    )
+
+
+def _collect(async_iterator):
+    async def collect():
+        return [item async for item in async_iterator]
+
+    return asyncio.run(collect())
+
+
+def test_iter_dataset_reads_jsonl_lazily(tmp_path):
+    path = tmp_path / "dataset.jsonl"
+    path.write_text('{"query": "q1"}\n\n{"query": "q2"}\n')
+
+    items = iter_dataset(path)
+    assert next(items) == {"query": "q1"}
+    assert list(items) == [{"query": "q2"}]
+    assert load_dataset(path) == [{"query": "q1"}, {"query": "q2"}]
+
+
+def test_iter_dataset_reads_json(tmp_path):
+    path = tmp_path / "queries.json"
+    path.write_text(json.dumps([{"query": "q1"}, {"query": "q2"}]))
+
+    assert [d["query"] for d in iter_dataset(path)] == ["q1", "q2"]
+
+
+def test_amap_as_completed_yields_in_completion_order():
+    async def slow_echo(item):
+        await asyncio.sleep(0.01 * item)
+        return item
+
+    assert _collect(amap_as_completed(slow_echo, [3, 1, 2], concurrency=3)) == [
+        1,
+        2,
+        3,
+    ]
+    assert _collect(amap_as_completed(slow_echo, [3, 1, 2])) == [3, 1, 2]
+
+
+def test_aenumerate_identifies_results_in_completion_order():
+    async def slow_echo(item):
+        index, value = item
+        await asyncio.sleep(0.01 * value)
+        return index, value
+
+    async def items():
+        for value in [3, 1, 2]:
+            yield value
+
+    results = _collect(amap_as_completed(slow_echo, aenumerate(items()), concurrency=3))
+    assert results == [(1, 1), (2, 2), (0, 3)]
+    assert _collect(aenumerate(["a", "b"])) == [(0, "a"), (1, "b")]
+
+
+def test_amap_as_completed_reads_items_lazily():
+    running = 0
+    max_running = 0
+    consumed = []
+
+    async def items():
+        for item in range(20):
+            consumed.append(item)
+            yield item
+
+    async def work(item):
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0)
+        running -= 1
+        return item
+
+    assert sorted(_collect(amap_as_completed(work, items(), concurrency=4))) == list(
+        range(20)
+    )
+    assert max_running == 4
+    assert consumed == list(range(20))
+
+
+def test_amap_as_completed_cancels_pending_on_error():
+    cancelled = []
+
+    async def work(item):
+        if item == 0:
+            raise RuntimeError("setup failed")
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(item)
+            raise
+
+    async def run():
+        async for _ in amap_as_completed(work, range(3), concurrency=3):
+            pass
+
+    with pytest.raises(RuntimeError, match="setup failed"):
+        asyncio.run(run())
+    assert sorted(cancelled) == [1, 2]
+
+    with pytest.raises(ValueError):
+        _collect(amap_as_completed(work, [], concurrency=0))
+
+
+def test_journal_round_trip(tmp_path):
+    path = tmp_path / "journal" / "results.jsonl"
+    results = [_result(), _result(correct=False), _result(False, "JSONParseError")]
+    for index, result in enumerate(results):
+        result.item_index = index
+
+    assert write_results(iter(results), [JournalSink(path)]) == 3
+    # 追記する
+    write_results([_result(model="model-b")], [JournalSink(path)])
+
+    read_back = list(read_journal(path))
+    assert read_back[:3] == results
+    assert read_back[3].model == "model-b"
+
+
+def test_summary_sink():
+    summary = SummarySink(every=2)
+    write_results(
+        [_result(), _result(correct=False), _result(False, "HandValidationError")],
+        [summary],
+    )
+
+    stats = summary.summary()
+    assert (stats["total"], stats["correct"]) == (3, 1)
+    assert stats["accuracy"] == pytest.approx(1 / 3)
+    assert stats["errors"] == {"HandValidationError": 1}
+    assert stats["models"] == {"model-a": 3}
+
+
+def test_sinks_are_closed_on_error():
+    class RecordingSink(ResultSink):
+        def __init__(self):
+            self.written = 0
+            self.closed = False
+
+        def write(self, result):
+            self.written += 1
+
+        def close(self):
+            self.closed = True
+
+    def results():
+        yield _result()
+        raise RuntimeError("generator failed")
+
+    sink = RecordingSink()
+    with pytest.raises(RuntimeError):
+        write_results(results(), [sink])
+    assert (sink.written, sink.closed) == (1, True)
+
+    async def aresults():
+        for result in [_result(), _result()]:
+            yield result
+
+    sink = RecordingSink()
+    assert asyncio.run(awrite_results(aresults(), [sink])) == 2
+    assert sink.closed
+
+
+def test_result_sink_requires_write():
+    class NoWriteSink(ResultSink):
+        pass
+
+    with pytest.raises(TypeError):
+        NoWriteSink()
+
+
+def test_result_record_rebuilds_hand():
+    record = result_record(_result())
+
+    assert record["correct"] is True
+    assert record["canonical_hand"]
+    assert hand_from_record(record) == HAND
+
+
+def test_parquet_sink(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+
+    path = tmp_path / "results.parquet"
+    results = [_result(), _result(correct=False), _result(False, "JSONParseError")]
+    write_results(results, [ParquetSink(path, batch_size=2)])
+
+    table = pq.read_table(path)
+    assert table.num_rows == 3
+    assert pq.ParquetFile(path).num_row_groups == 2
+    rows = table.to_pylist()
+    assert [row["correct"] for row in rows] == [True, False, False]
+    assert hand_from_record(rows[2]) == HAND
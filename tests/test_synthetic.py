@@ -0,0 +1,116 @@
+"""Test the synthetic dataset generator"""
+
+import json
+import random
+
+import pytest
+
+from entity.entity import Hand
+from generator import synthetic
+from generator.synthetic import (
+    fill_cell,
+    generate_chunk,
+    generate_dataset,
+    load_dataset,
+    random_hand,
+    reachable_cells,
+)
+from llmmj.llmmj import calculate_score, validate_hand
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    """Use small chunks so that a dataset is generated quickly."""
+    monkeypatch.setattr(synthetic, "CHUNK_SIZE", 16)
+    monkeypatch.setattr(synthetic, "WINDOW_CHUNKS", 4)
+
+
+def test_random_hand_is_complete_shape():
+    """Test that random hands are valid hands with melds included in tiles."""
+    rng = random.Random(0)
+    for _ in range(200):
+        hand = Hand(**random_hand(rng))
+        validate_hand(hand)
+        kans = sum(len(meld.tiles) == 4 for meld in hand.melds)
+        assert len(hand.tiles) == 14 + kans
+        assert len(hand.dora_indicators) == 1 + kans
+        if any(meld.is_open for meld in hand.melds):
+            assert not hand.is_riichi
+
+
+def test_chunk_records_are_verified():
+    """Test that every record's reference hand scores to its answer."""
+    records = generate_chunk(seed=0, chunk=0, size=32)
+
+    assert records
+    for record in records:
+        score = calculate_score(Hand(**record["reference"]))
+        assert record["answer"] == {"han": score.han, "fu": score.fu}
+        assert score.han > 0
+        assert f"{score.han} han {score.fu} fu" in record["query"]
+
+
+def test_chunk_is_reproducible():
+    """Test that the same seed and chunk give the same records."""
+    assert generate_chunk(1, 3, size=16) == generate_chunk(1, 3, size=16)
+    assert generate_chunk(1, 3, size=16) != generate_chunk(2, 3, size=16)
+
+
+def test_dataset_is_stratified(small_chunks):
+    """Test that (han, fu) cells are covered evenly."""
+    dataset = generate_dataset(30, seed=0, max_candidates=1000)
+    assert len(dataset) == 30
+
+    cells = {}
+    for record in dataset:
+        cell = (record["answer"]["han"], record["answer"]["fu"])
+        cells[cell] = cells.get(cell, 0) + 1
+    # 30 items should be spread over many (han, fu) cells
+    assert len(cells) >= 10
+    assert max(cells.values()) <= 3
+
+
+def test_reachable_cells_come_from_the_feasibility_table():
+    cells = reachable_cells()
+
+    assert (1, 30) in cells and (2, 25) in cells and (12, 30) in cells
+    # 1飜20符・1飜25符は存在しない
+    assert (1, 20) not in cells and (1, 25) not in cells
+    assert max(han for han, _ in cells) == 12
+
+
+def test_fill_cell_builds_hands_for_rare_cells():
+    """Test that targeted hands score exactly to the requested cell."""
+    for cell in [(12, 30), (5, 110), (2, 25)]:
+        records = fill_cell(seed=0, cell=cell, attempts=4)
+        assert records
+        for record in records:
+            score = calculate_score(Hand(**record["reference"]))
+            assert (score.han, score.fu) == cell
+
+
+def test_dataset_covers_every_cell(small_chunks):
+    """Test that cells random hands do not reach are still filled."""
+    cells = reachable_cells()
+    dataset = generate_dataset(len(cells), seed=0, max_candidates=64)
+
+    assert {
+        (record["answer"]["han"], record["answer"]["fu"]) for record in dataset
+    } == set(cells)
+
+
+def test_dataset_is_reproducible(small_chunks):
+    """Test that the same seed gives the same dataset."""
+    assert generate_dataset(10, seed=5) == generate_dataset(10, seed=5)
+
+
+def test_load_dataset(tmp_path):
+    """Test loading JSON and JSONL datasets."""
+    records = [{"query": "q", "answer": {"han": 1, "fu": 30}}]
+    json_path = tmp_path / "queries.json"
+    json_path.write_text(json.dumps(records))
+    jsonl_path = tmp_path / "synthetic.jsonl"
+    jsonl_path.write_text("\n".join(json.dumps(r) for r in records * 2) + "\n")
+
+    assert load_dataset(json_path) == records
+    assert load_dataset(jsonl_path) == records * 2
@@ -0,0 +1,135 @@
+"""Test the fused validate-and-score tool in tools.py"""
+
+import asyncio
+import json
+from unittest.mock import patch
+
+import pytest
+from pydantic import ValidationError
+
+from llmmj import tools
+from llmmj.tools import (
+    CalculateMahjongScoreTool,
+    CheckWinningHandTool,
+    ValidateAndScoreHandTool,
+)
+
+WINNING_HAND = {
+    "tiles": [
+        "1m",
+        "2m",
+        "3m",
+        "4m",
+        "5m",
+        "6m",
+        "7m",
+        "8m",
+        "9m",
+        "1p",
+        "1p",
+        "2s",
+        "3s",
+        "4s",
+    ],
+    "win_tile": "4s",
+    "is_riichi": True,
+    "is_tsumo": True,
+}
+
+
+@pytest.fixture
+def tool():
+    """Create ValidateAndScoreHandTool instance."""
+    return ValidateAndScoreHandTool(verbosity="full")
+
+
+def test_winning_hand(tool):
+    """Test that validation and score are returned together."""
+    result = tool.invoke(WINNING_HAND)
+
+    assert result["valid"] is True
+    assert result["is_winning"] is True
+    assert result["errors"] == []
+    assert result["han"] == 5
+    assert result["fu"] == 20
+    assert "Riichi" in result["yaku"]
+
+
+def test_json_string_input(tool):
+    """Test that a ReAct-style JSON string input gives the same result."""
+    assert tool.invoke(json.dumps(WINNING_HAND)) == tool.invoke(WINNING_HAND)
+
+
+def test_invalid_json_string_input(tool):
+    """Test that an unparsable string is reported as an error."""
+    result = tool.invoke("{not json")
+
+    assert result["valid"] is False
+    assert result["is_winning"] is False
+    assert result["errors"][0].startswith("Invalid input:")
+
+
+def test_invalid_hand_is_not_scored(tool):
+    """Test that scoring is skipped when validation fails."""
+    hand = {**WINNING_HAND, "tiles": WINNING_HAND["tiles"][:-1] + ["1z"]}
+    with patch.object(tools, "calculate_score") as calculate_score:
+        result = tool.invoke(hand)
+
+    assert result["valid"] is False
+    assert result["is_winning"] is False
+    assert "Win tile is not in the hand" in result["errors"]
+    calculate_score.assert_not_called()
+
+
+def test_valid_hand_without_yaku(tool):
+    """Test a valid hand that is not a winning hand."""
+    tiles = ["1m", "1m", "1m", "2p", "3p", "4p", "5s", "6s", "7s", "8s", "8s"]
+    hand = {"tiles": tiles + ["7z", "7z", "7z"], "win_tile": "8s"}
+    result = tool.invoke(hand)
+
+    assert result["valid"] is True
+    assert result["is_winning"] is True
+    assert result["yaku"] == ["Yakuhai (chun)"]
+
+    result = tool.invoke({**hand, "tiles": tiles + ["9p", "9p", "9p"]})
+
+    assert result["valid"] is True
+    assert result["is_winning"] is False
+    assert not result["han"]
+
+
+def test_validates_and_scores_once(tool):
+    """Test that the hand is validated and scored exactly once."""
+    with (
+        patch.object(tools, "validate_hand", wraps=tools.validate_hand) as validate,
+        patch.object(tools, "calculate_score", wraps=tools.calculate_score) as score,
+    ):
+        tool.invoke(WINNING_HAND)
+
+    validate.assert_called_once()
+    score.assert_called_once()
+
+
+def test_async_run(tool):
+    """Test that the async implementation returns the same result."""
+    assert asyncio.run(tool.ainvoke(WINNING_HAND)) == tool.invoke(WINNING_HAND)
+
+
+def test_check_winning_hand_uses_single_pass():
+    """Test that CheckWinningHandTool keeps its output shape."""
+    with patch.object(tools, "validate_hand", wraps=tools.validate_hand) as validate:
+        result = CheckWinningHandTool().invoke(WINNING_HAND)
+
+    validate.assert_called_once()
+    assert result["is_winning"] is True
+    assert result["reason"] == "Valid winning hand"
+    assert result["score_info"]["han"] == 3
+
+
+@pytest.mark.parametrize(
+    "tool_class", [CalculateMahjongScoreTool, ValidateAndScoreHandTool]
+)
+def test_invalid_verbosity_is_rejected(tool_class):
+    """Test that an unknown verbosity fails instead of falling back to minimal."""
+    with pytest.raises(ValidationError):
+        tool_class(verbosity="verbose")
@@ -0,0 +1,184 @@
+"""Test the table-driven tenpai and wait analyzer"""
+
+import random
+
+import pytest
+from mahjong.agari import Agari
+
+from entity.codec import TILE_INDEX, TILES_34
+from entity.entity import Hand, MeldInfo
+from exceptions import HandValidationError
+from generator.synthetic import random_hand
+from llmmj.llmmj import calculate_score, score_all_waits
+from llmmj.waits import (
+    WAIT_KANCHAN,
+    WAIT_KOKUSHI,
+    WAIT_PENCHAN,
+    WAIT_RYANMEN,
+    WAIT_SHANPON,
+    WAIT_TANKI,
+    analyze_waits,
+)
+from tools.calculation import analyze_hand_waits
+
+
+def _waits(tiles, melds=None):
+    analysis = analyze_waits(tiles.split(), melds)
+    return {wait.tile: wait.wait_types for wait in analysis.waits}
+
+
+@pytest.mark.parametrize(
+    "tiles,expected",
+    [
+        # ryanmen
+        (
+            "1m 2m 3m 4m 5m 6m 7m 8m 9m 1p 1p 3s 4s",
+            {"2s": (WAIT_RYANMEN,), "5s": (WAIT_RYANMEN,)},
+        ),
+        # kanchan
+        ("1m 2m 3m 4m 5m 6m 7m 8m 9m 1p 1p 3s 5s", {"4s": (WAIT_KANCHAN,)}),
+        # penchan on both edges
+        ("1m 2m 3m 4m 5m 6m 7m 8m 9m 1p 1p 1s 2s", {"3s": (WAIT_PENCHAN,)}),
+        ("1m 2m 3m 4m 5m 6m 7m 8m 9m 1p 1p 8s 9s", {"7s": (WAIT_PENCHAN,)}),
+        # shanpon
+        (
+            "1m 2m 3m 4m 5m 6m 7m 8m 9m 1p 1p 5z 5z",
+            {"1p": (WAIT_SHANPON,), "5z": (WAIT_SHANPON,)},
+        ),
+        # nobetan: tanki on both ends of 2345
+        (
+            "1m 2m 3m 4m 5m 6m 7m 8m 9m 2p 3p 4p 5p",
+            {"2p": (WAIT_TANKI,), "5p": (WAIT_TANKI,)},
+        ),
+        # seven pairs
+        ("1m 1m 3m 3m 5p 5p 7p 7p 9s 9s 2z 2z 7z", {"7z": (WAIT_TANKI,)}),
+    ],
+)
+def test_wait_types(tiles, expected):
+    assert _waits(tiles) == expected
+
+
+def test_several_decompositions_are_reported():
+    # 1112: 2 completes 111 + 22 (tanki), 3 completes 11 + 123 (penchan)
+    waits = _waits("1m 1m 1m 2m 4p 5p 6p 7s 8s 9s 2z 2z 2z")
+    assert waits["2m"] == (WAIT_TANKI,)
+    assert waits["3m"] == (WAIT_PENCHAN,)
+
+    # Nine gates: every man tile wins, some in several ways
+    waits = _waits("1m 1m 1m 2m 3m 4m 5m 6m 7m 8m 9m 9m 9m")
+    assert list(waits) == [f"{n}m" for n in range(1, 10)]
+    assert waits["3m"] == (WAIT_PENCHAN, WAIT_RYANMEN)
+
+
+def test_kokushi():
+    waits = _waits("1m 9m 1p 9p 1s 9s 1z 2z 3z 4z 5z 6z 7z")
+    assert len(waits) == 13
+    assert set(waits.values()) == {(WAIT_KOKUSHI,)}
+
+
+def test_melds_and_karaten():
+    melds = [
+        MeldInfo(tiles=["7p", "7p", "7p", "7p"], is_open=False),
+        MeldInfo(tiles=["5z", "5z", "5z"], is_open=True),
+    ]
+    assert _waits("1m 2m 3m 7p 7p 7p 7p 5z 5z 5z 8s 8s 6s 6s", melds) == {
+        "8s": (WAIT_SHANPON,),
+        "6s": (WAIT_SHANPON,),
+    }
+    # 4p is held four times in the kan (karaten), only 1p is left
+    kan = [MeldInfo(tiles=["4p", "4p", "4p", "4p"], is_open=False)]
+    assert _waits("4p 4p 4p 4p 2p 3p 5m 6m 7m 1s 2s 3s 9s 9s", kan) == {
+        "1p": (WAIT_RYANMEN,)
+    }
+
+
+def test_shanten_when_not_tenpai():
+    analysis = analyze_waits("1m 4m 7m 1p 4p 7p 1s 4s 7s 1z 2z 3z 4z".split())
+    assert not analysis.is_tenpai
+    assert analysis.shanten > 0
+    assert analysis.waits == []
+
+
+def test_invalid_tile_count():
+    with pytest.raises(HandValidationError):
+        analyze_waits("1m 2m 3m".split())
+
+
+def test_matches_brute_force_agari():
+    """Test that the waits are exactly the tiles that complete the hand."""
+    agari = Agari()
+    rng = random.Random(0)
+    for _ in range(100):
+        hand = random_hand(rng)
+        melds = [MeldInfo(**meld) for meld in hand.get("melds") or []]
+        tiles = list(hand["tiles"])
+        tiles.remove(hand["win_tile"])
+        if len(tiles) - sum(len(meld.tiles) for meld in melds) != 13 - 3 * len(melds):
+            continue
+
+        counts = [0] * 34
+        for tile in tiles:
+            counts[TILE_INDEX[tile]] += 1
+        meld_tiles = [[TILE_INDEX[tile] for tile in meld.tiles] for meld in melds]
+        expected = set()
+        for index in range(34):
+            if counts[index] == 4:
+                continue
+            counts[index] += 1
+            if agari.is_agari(counts, meld_tiles):
+                expected.add(TILES_34[index])
+            counts[index] -= 1
+
+        assert set(_waits(" ".join(tiles), melds)) == expected, hand
+
+
+def test_analyze_hand_waits_tool():
+    result = analyze_hand_waits(
+        tiles="1m 2m 3m 4m 5m 6m 7m 8m 9m 1p 1p 3s 5s".split(), melds=None
+    )
+    assert result["tenpai"] is True
+    assert result["waits"] == [{"tile": "4s", "wait_types": ("kanchan",), "fu": 2}]
+
+    assert analyze_hand_waits(tiles=["1m"])["status"] == "error"
+
+
+def test_score_all_waits_matches_calculate_score():
+    rng = random.Random(1)
+    checked = 0
+    for _ in range(60):
+        hand = Hand(**random_hand(rng))
+        tiles = list(hand.tiles)
+        tiles.remove(hand.win_tile)
+        config = hand.model_dump(
+            include={"is_riichi", "player_wind", "round_wind", "is_ippatsu"}
+        )
+        rows = score_all_waits(tiles, hand.melds, hand.dora_indicators, config)
+
+        assert {(row.tile, row.is_tsumo) for row in rows} >= {
+            (hand.win_tile, False),
+            (hand.win_tile, True),
+        }
+        for row in rows:
+            if row.error:
+                continue
+            expected = calculate_score(
+                hand.model_copy(
+                    update={
+                        "tiles": tiles + [row.tile],
+                        "win_tile": row.tile,
+                        "is_tsumo": row.is_tsumo,
+                    }
+                )
+            )
+            assert (row.han, row.fu, row.score, list(row.yaku)) == (
+                expected.han,
+                expected.fu,
+                expected.score,
+                expected.yaku,
+            )
+            checked += 1
+    assert checked > 100
+
+
+def test_score_all_waits_not_tenpai():
+    assert score_all_waits("1m 4m 7m 1p 4p 7p 1s 4s 7s 1z 2z 3z 4z".split()) == []
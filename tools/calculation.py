@@ -1,19 +1,108 @@
-import json
 import logging
-from typing import Any, Dict, List, Optional
+import os
+from typing import Any, Dict, List, Literal, Optional
 
 from mahjong.hand_calculating.hand import HandCalculator
 from mahjong.hand_calculating.hand_config import HandConfig
 from pydantic import ValidationError
 
+from entity.decoding import decode_hand_json, is_json_syntax_error
+from entity.codec import WINDS
 from entity.entity import Hand, MeldInfo
+from exceptions import HandValidationError
+from llmmj import log
+from llmmj.feasibility import find_structure
 from llmmj.llmmj import (
     convert_melds_to_mahjong_format,
     convert_tiles_to_136_array,
+    sweep_conditions,
     validate_hand,
 )
+from llmmj.waits import analyze_waits
+
+logger = logging.getLogger(__name__)
+
+# ツールが返す結果の詳細度。エージェントのコンテキストに毎ターン積まれるため、
+# デフォルトでは必要最低限の情報のみ返す
+VERBOSITY_MINIMAL = "minimal"
+VERBOSITY_STANDARD = "standard"
+VERBOSITY_FULL = "full"
+VERBOSITY_LEVELS = (VERBOSITY_MINIMAL, VERBOSITY_STANDARD, VERBOSITY_FULL)
+Verbosity = Literal["minimal", "standard", "full"]
+
+
+def _verbosity_from_env() -> str:
+    """Read LLMMJ_TOOL_VERBOSITY, falling back to "standard" if it is invalid."""
+    verbosity = os.environ.get("LLMMJ_TOOL_VERBOSITY", VERBOSITY_STANDARD)
+    if verbosity not in VERBOSITY_LEVELS:
+        logger.warning(
+            f"Invalid LLMMJ_TOOL_VERBOSITY: {verbosity}. Must be one of "
+            f"{VERBOSITY_LEVELS}; using {VERBOSITY_STANDARD}"
+        )
+        return VERBOSITY_STANDARD
+    return verbosity
+
+
+_tool_verbosity = _verbosity_from_env()
+
+
+def set_tool_verbosity(verbosity: str) -> None:
+    """Set the default verbosity of score results returned by the tools.
+
+    Args:
+        verbosity (str): One of "minimal", "standard" or "full"
+    """
+    global _tool_verbosity
+    if verbosity not in VERBOSITY_LEVELS:
+        raise ValueError(
+            f"Invalid verbosity: {verbosity}. Must be one of {VERBOSITY_LEVELS}"
+        )
+    _tool_verbosity = verbosity
+
+
+def get_tool_verbosity() -> str:
+    """Return the default verbosity of score results returned by the tools."""
+    return _tool_verbosity
 
-logging.basicConfig(level=logging.INFO)
+
+def format_fu_details(fu_details: Optional[List[Dict[str, Any]]]) -> str:
+    """Format fu details into a compact string (e.g. "base 30, closed_kan 16")."""
+    if not fu_details:
+        return ""
+    return ", ".join(f"{detail['reason']} {detail['fu']}" for detail in fu_details)
+
+
+def compact_score_result(
+    result: Dict[str, Any], verbosity: Optional[str] = None
+) -> Dict[str, Any]:
+    """Shrink a score result according to the verbosity level.
+
+    - minimal: han, fu, main cost and error
+    - standard: minimal + yaku names and a compact fu breakdown
+    - full: the result as is
+
+    Args:
+        result (dict): Score result containing han, fu, cost (or score), yaku, fu_details and error
+        verbosity (str): Verbosity level. Defaults to the value set by set_tool_verbosity
+
+    Returns:
+        dict: Compacted score result
+    """
+    verbosity = verbosity or _tool_verbosity
+    if verbosity == VERBOSITY_FULL or "han" not in result:
+        return result
+
+    compact: Dict[str, Any] = {"han": result["han"], "fu": result["fu"]}
+    if "cost" in result:
+        cost = result["cost"]
+        compact["cost"] = {"main": cost["main"]} if cost else cost
+    if "score" in result:
+        compact["score"] = result["score"]
+    if verbosity == VERBOSITY_STANDARD:
+        compact["yaku"] = result.get("yaku") or []
+        compact["fu_details"] = format_fu_details(result.get("fu_details"))
+    compact["error"] = result.get("error")
+    return compact
 
 
 def calculate_mahjong_score(
@@ -48,9 +137,10 @@ def calculate_mahjong_score(
         round_wind (str): Round wind (east, south, west, north)
 
     Returns:
-        dict: Score calculation result
+        dict: Score calculation result. The amount of detail depends on the tool verbosity (see set_tool_verbosity)
     """
-    logging.info("hello calculate_mahjong_score!!!")
+    if log.HOT_PATH_DEBUG:
+        logger.debug("calculate_mahjong_score called")
 
     check_hand_validity_result = check_hand_validity(tiles, melds, win_tile)
     if check_hand_validity_result["status"] == "error":
@@ -119,13 +209,162 @@ def calculate_mahjong_score(
         return {"status": "error", "error": f"Invalid result: {e!s}"}
 
     # HandResponseオブジェクトをdictに変換
+    return compact_score_result(
+        {
+            "han": result.han,
+            "fu": result.fu,
+            "cost": result.cost,
+            "yaku": [str(yaku) for yaku in result.yaku] if result.yaku else [],
+            "fu_details": result.fu_details,
+            "error": result.error,
+        }
+    )
+
+
+def check_han_fu_feasibility(
+    han: int,
+    fu: int,
+    is_open: Optional[bool] = None,
+    is_tsumo: Optional[bool] = None,
+) -> dict:
+    """Check whether a target han and fu can be reached before building a hand.
+
+    Args:
+        han (int): Target han
+
+        fu (int): Target fu
+
+        is_open (bool): True to require an open hand, False to require a closed hand, None for either
+
+        is_tsumo (bool): True to require tsumo, False to require ron, None for either
+
+    Returns:
+        dict: "feasible" and, if feasible, the minimum structure: the least han reachable at this fu, its yaku and an example hand to build on (add dora indicators to raise han)
+    """
+    if log.HOT_PATH_DEBUG:
+        logger.debug("check_han_fu_feasibility called")
+
+    structure = find_structure(han, fu, is_open, is_tsumo)
+    if structure is None:
+        return {
+            "feasible": False,
+            "reason": f"No hand satisfying the conditions has {han} han {fu} fu",
+        }
+    return {"feasible": True, **structure}
+
+
+def _convert_meld_dicts(
+    melds: Optional[List[Dict[str, Any]]],
+) -> Optional[List[MeldInfo]]:
+    """ツールの引数の鳴き (dict) を MeldInfo に変換する"""
+    if not melds:
+        return None
+    converted = []
+    for meld in melds:
+        if not isinstance(meld, dict) or "tiles" not in meld:
+            raise ValueError(
+                "melds must be in MeldInfo format: {'tiles': [...], 'is_open': bool}"
+            )
+        converted.append(
+            MeldInfo(tiles=meld["tiles"], is_open=meld.get("is_open", True))
+        )
+    return converted
+
+
+def analyze_hand_waits(
+    tiles: List[str],
+    melds: Optional[List[Dict[str, Any]]] = None,
+) -> dict:
+    """Find the winning tiles of a hand before the winning tile and the wait type of each. Use it to choose a wait that adds the fu you need.
+
+    Args:
+        tiles (list[str]): The 13 tiles before the winning tile, including the tiles of melds (a kan has 4 tiles). Example: ['1m', '2m', '3m', '4m', '5m', '6m', '7m', '8m', '9m', '1p', '1p', '3s', '5s'] waits on 4s (kanchan).
+
+        melds list[MeldInfo] format: {'tiles': [...], 'is_open': bool}
+                - tiles: Meld tiles (136 format). These tiles must also be included in the tiles field.
+                - is_open: True=open meld (minkan, pon, chi), False=closed meld (ankan)
+
+    Returns:
+        dict: "tenpai", "shanten" (0 when tenpai) and "waits": each winning tile with its wait types and the fu the wait adds (kanchan, penchan and tanki add 2 fu; ryanmen and shanpon add 0 fu)
+    """
+    if log.HOT_PATH_DEBUG:
+        logger.debug("analyze_hand_waits called")
+
+    try:
+        analysis = analyze_waits(tiles, _convert_meld_dicts(melds))
+    except (HandValidationError, ValueError) as e:
+        return {"status": "error", "error": str(e)}
+
     return {
-        "han": result.han,
-        "fu": result.fu,
-        "cost": result.cost,
-        "yaku": [str(yaku) for yaku in result.yaku] if result.yaku else [],
-        "fu_details": result.fu_details,
-        "error": result.error,
+        "status": "success",
+        "tenpai": analysis.is_tenpai,
+        "shanten": analysis.shanten,
+        "waits": [wait._asdict() for wait in analysis.waits],
+    }
+
+
+# sweep_hand_conditions で返す条件の最大数（コンテキストを圧迫しないため）
+MAX_SWEEP_MATCHES = 5
+
+
+def sweep_hand_conditions(
+    tiles: List[str],
+    win_tile: str,
+    melds: Optional[List[Dict[str, Any]]],
+    target_han: int,
+    target_fu: int,
+    dora_indicator_sets: Optional[List[List[str]]] = None,
+) -> dict:
+    """Score one hand under every combination of riichi, tsumo, winds and dora indicator sets at once, and return the combinations that reach the target han and fu. Use it before changing tiles.
+
+    Args:
+        tiles (list[str]): All tiles of the winning hand including the tiles of melds and the winning tile.
+
+        win_tile (str): The winning tile
+
+        melds list[MeldInfo] format: {'tiles': [...], 'is_open': bool}
+                - tiles: Meld tiles (136 format). These tiles must also be included in the tiles field.
+                - is_open: True=open meld (minkan, pon, chi), False=closed meld (ankan)
+
+        target_han (int): Target han
+
+        target_fu (int): Target fu
+
+        dora_indicator_sets (list[list[str]]): Candidate dora indicator sets to try, e.g. [[], ['1m'], ['1m', '4p']]. Defaults to no dora.
+
+    Returns:
+        dict: "matches" (up to 5 combinations reaching the target) and "reachable", every (han, fu) reached by some combination
+    """
+    if log.HOT_PATH_DEBUG:
+        logger.debug("sweep_hand_conditions called")
+
+    try:
+        converted_melds = _convert_meld_dicts(melds)
+        hand = Hand(tiles=tiles, melds=converted_melds, win_tile=win_tile)
+        validate_hand(hand)
+        is_open = any(meld.is_open for meld in converted_melds or ())
+        rows = sweep_conditions(
+            hand,
+            {
+                # 副露している場合はリーチできない
+                "is_riichi": [False] if is_open else [False, True],
+                "is_tsumo": [False, True],
+                "player_wind": list(WINDS[1:]),
+                "round_wind": list(WINDS[1:3]),
+                "dora_indicators": dora_indicator_sets or [[]],
+            },
+        )
+    except (HandValidationError, ValueError) as e:
+        return {"status": "error", "error": str(e)}
+
+    scored = [row for row in rows if not row.error]
+    matches = [
+        row.conditions for row in scored if (row.han, row.fu) == (target_han, target_fu)
+    ]
+    return {
+        "status": "success",
+        "matches": matches[:MAX_SWEEP_MATCHES],
+        "reachable": sorted({(row.han, row.fu) for row in scored}),
     }
 
 
@@ -146,21 +385,14 @@ def check_hand_validity(
     Returns:
         dict: Hand validity check result
     """
-    logging.info("hello check_hand_validity!!!")
+    if log.HOT_PATH_DEBUG:
+        logger.debug("check_hand_validity called")
 
     # Convert dict melds to MeldInfo for validation
-    converted_melds = None
-    if melds:
-        converted_melds = []
-        for meld in melds:
-            if not isinstance(meld, dict) or "tiles" not in meld:
-                return {
-                    "status": "error",
-                    "error": "melds must be in MeldInfo format: {'tiles': [...], 'is_open': bool}",
-                }
-            converted_melds.append(
-                MeldInfo(tiles=meld["tiles"], is_open=meld.get("is_open", True))
-            )
+    try:
+        converted_melds = _convert_meld_dicts(melds)
+    except ValueError as e:
+        return {"status": "error", "error": str(e)}
 
     # If win_tile is provided, create Hand object and use centralized validation
     if win_tile:
@@ -203,16 +435,15 @@ def final_output_message_check(message: str) -> dict:
     Returns:
         dict: Message validity check result
     """
-    logging.info("hello final_output_message_check!!!")
-
-    try:
-        json.loads(message)
-    except json.JSONDecodeError as e:
-        return {"status": "error", "error": f"Invalid JSON format: {e!s}"}
+    if log.HOT_PATH_DEBUG:
+        logger.debug("final_output_message_check called")
 
+    # JSONのパースと検証を1回で行う
     try:
-        Hand.model_validate_json(message)
+        decode_hand_json(message)
     except ValidationError as e:
+        if is_json_syntax_error(e):
+            return {"status": "error", "error": f"Invalid JSON format: {e!s}"}
         return {"status": "error", "error": f"Invalid message format: {e!s}"}
 
     return {"status": "success"}